@@ -0,0 +1,107 @@
+"""
+Compare export formats by throughput and output size.
+
+Feeds the same synthetic expense rows, shaped like the ``values_list`` rows
+the expense export streams, through every registered export format, and
+through the per-row ``csv.writer`` loop with f-string formatting that exports
+used before ``bookkeeping.export_formats``. Arrow and Parquet are included
+when pyarrow is installed. Needs no database.
+
+Usage:
+    python benchmarks/export_formats.py [--rows 200000] [--repeat 3]
+"""
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mtdify.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bookkeeping.export_formats import EXPORT_FORMATS  # noqa: E402
+from bookkeeping.exporting import EXPENSE_EXPORT_COLUMNS  # noqa: E402
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def legacy_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column.header for column in columns]).encode()
+    for day, description, supplier, amount, vat, category in rows:
+        yield writer.writerow(
+            [
+                day.strftime("%d/%m/%Y"),
+                description,
+                supplier or "",
+                f"{amount:.2f}",
+                f"{vat:.2f}",
+                category or "",
+            ]
+        ).encode()
+
+
+def make_rows(count):
+    rng = random.Random(42)
+    first_day = date(2015, 4, 6)
+    suppliers = ["Great Western Railway", "Screwfix", "Amazon", "", "Tesco"]
+    categories = ["Travel", "Tools", "Office", "Subsistence", None]
+    return [
+        (
+            first_day + timedelta(days=rng.randrange(10 * 365)),
+            f"Expense {index} ref {rng.randrange(10**6):06d}",
+            rng.choice(suppliers),
+            Decimal(rng.randrange(100, 500_000)) / 100,
+            Decimal(rng.randrange(0, 10_000)) / 100,
+            rng.choice(categories),
+        )
+        for index in range(count)
+    ]
+
+
+def measure(write, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in write(EXPENSE_EXPORT_COLUMNS, iter(rows)))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    writers = {"legacy csv": legacy_csv}
+    writers.update(
+        (name, export_format.write) for name, export_format in EXPORT_FORMATS.items()
+    )
+
+    print(f"{args.rows:,} rows, median of {args.repeat} runs")
+    for name, write in writers.items():
+        seconds, size = measure(write, rows, args.repeat)
+        print(
+            f"{name:<12} {args.rows / seconds:>12,.0f} rows/s  "
+            f"{size / 1024:>10,.0f} KiB  ({size / args.rows:.1f} bytes/row)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Concurrent read/write throughput with stock and tuned SQLite settings.
+
+Mirrors a gunicorn deployment of several worker processes with several
+threads each. Every thread loops for a fixed time, mostly reading dashboard
+figures and occasionally saving an Income row, against a throwaway
+database. "stock" drops the connection OPTIONS from settings; "tuned" uses
+them as configured.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--processes 2] [--threads 4]
+        [--seconds 10] [--write-ratio 0.2]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mtdify.settings")
+
+SEED_ROWS = 20_000
+USERS = 10
+
+
+def setup_django(db_path, tuned):
+    import django
+    from django.conf import settings
+
+    database = settings.DATABASES["default"]
+    database["NAME"] = db_path
+    if not tuned:
+        database["OPTIONS"] = {}
+    django.setup()
+
+
+def prepare(db_path, tuned):
+    """Migrate a fresh database and seed it with transactions."""
+    setup_django(db_path, tuned)
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import transaction
+
+    from bookkeeping.models import Category, Income
+    from bookkeeping.signals import transactions_created
+
+    call_command("migrate", verbosity=0)
+
+    users = [
+        get_user_model().objects.create_user(email=f"user{n}@example.com")
+        for n in range(USERS)
+    ]
+    category = Category.objects.create(name="Benchmark", category_type="income")
+
+    rng = random.Random(1)
+    incomes = []
+    for n in range(SEED_ROWS):
+        income = Income(
+            user=rng.choice(users),
+            date=date(2024, 4, 6) + timedelta(days=rng.randrange(365)),
+            description=f"Invoice {n}",
+            amount=Decimal(rng.randint(100, 100000)) / 100,
+            category=category,
+        )
+        income.assign_periods()
+        incomes.append(income)
+
+    with transaction.atomic():
+        Income.objects.bulk_create(incomes, batch_size=500)
+        transactions_created(Income, incomes)
+
+
+def worker(db_path, tuned, threads, seconds, write_ratio, seed):
+    """Run ``threads`` client threads and return (reads, writes, errors)."""
+    setup_django(db_path, tuned)
+
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connection
+
+    from bookkeeping.dashboard import build_dashboard_summary
+    from bookkeeping.models import Category, Income
+
+    users = list(get_user_model().objects.all())
+    category = Category.objects.get(name="Benchmark")
+    connection.close()
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(thread_seed):
+        rng = random.Random(thread_seed)
+        reads = writes = errors = 0
+
+        while time.monotonic() < deadline:
+            user = rng.choice(users)
+            try:
+                if rng.random() < write_ratio:
+                    Income.objects.create(
+                        user=user,
+                        date=date(2024, 4, 6) + timedelta(days=rng.randrange(365)),
+                        description="Benchmark write",
+                        amount=Decimal("10.00"),
+                        category=category,
+                    )
+                    writes += 1
+                else:
+                    build_dashboard_summary(user, "2024-2025", date(2025, 3, 1))
+                    list(
+                        Income.objects.filter(user=user)
+                        .order_by("-date")
+                        .values_list("date", "amount")[:25]
+                    )
+                    reads += 1
+            except OperationalError:
+                errors += 1
+
+        connection.close()
+        with lock:
+            counts["reads"] += reads
+            counts["writes"] += writes
+            counts["errors"] += errors
+
+    pool = [
+        threading.Thread(target=client, args=(seed * 100 + n,))
+        for n in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    return counts["reads"], counts["writes"], counts["errors"]
+
+
+def run_config(tuned, args):
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "benchmark.sqlite3")
+
+        with context.Pool(1) as pool:
+            pool.apply(prepare, (db_path, tuned))
+
+        with context.Pool(args.processes) as pool:
+            results = pool.starmap(
+                worker,
+                [
+                    (db_path, tuned, args.threads, args.seconds, args.write_ratio, n)
+                    for n in range(args.processes)
+                ],
+            )
+
+    reads, writes, errors = (sum(column) for column in zip(*results))
+    return reads, writes, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(
+        f"{args.processes} processes x {args.threads} threads, "
+        f"{args.seconds:g}s, {args.write_ratio:.0%} writes"
+    )
+    for label, tuned in (("stock", False), ("tuned", True)):
+        reads, writes, errors = run_config(tuned, args)
+        print(
+            f"{label:>6}: {reads / args.seconds:8.1f} reads/s "
+            f"{writes / args.seconds:8.1f} writes/s "
+            f"{errors:6d} lock errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Time a bank statement import against saving the same lines one by one.
+
+Builds a throwaway SQLite database, writes a synthetic CSV statement, then
+times ``bookkeeping.importing`` importing it, importing it again (every line
+a duplicate), and the per-row ``save()`` path that form entry takes, on a
+sample of the lines.
+
+Usage:
+    python benchmarks/statement_import.py [--lines 50000] [--sample 2000]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mtdify.settings")
+
+
+def setup_django(db_path):
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    django.setup()
+
+
+def make_statement(lines):
+    """A CSV statement of ``lines`` rows with separate paid in/out columns."""
+    rng = random.Random(42)
+    first_day = date(2021, 4, 6)
+    payees = ["SCREWFIX", "GWR TRAVEL", "AMAZON MKTPLACE", "TESCO STORES", "EE LTD"]
+
+    out = io.StringIO()
+    out.write("Date,Description,Paid out,Paid in,Balance\n")
+    for n in range(lines):
+        day = first_day + timedelta(days=rng.randrange(4 * 365))
+        amount = f"{rng.randint(100, 500000) / 100:.2f}"
+        if n % 5 == 0:
+            out.write(f"{day:%d/%m/%Y},INVOICE {n} CLIENT,,{amount},0.00\n")
+        else:
+            payee = rng.choice(payees)
+            out.write(f"{day:%d/%m/%Y},{payee} {rng.randrange(10**4)},{amount},,0.00\n")
+
+    return out.getvalue().encode()
+
+
+def upload(content):
+    statement = io.BytesIO(content)
+    statement.name = "statement.csv"
+    return statement
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    print(f"{label:<28} {seconds:>8.2f} s")
+    return result, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(str(Path(tmp) / "benchmark.sqlite3"))
+
+        from django.contrib.auth import get_user_model
+        from django.core.management import call_command
+
+        from bookkeeping.importing import import_statement, parse_statement
+        from bookkeeping.models import Category, Expense
+
+        call_command("migrate", verbosity=0)
+        user = get_user_model().objects.create_user(email="owner@example.com")
+        sales = Category.objects.create(name="Sales", category_type="income")
+        other = Category.objects.create(name="Other", category_type="expense")
+        Category.objects.create(name="Travel", category_type="expense")
+
+        statement = make_statement(args.lines)
+        print(f"{args.lines:,} statement lines")
+
+        result, seconds = timed(
+            "import",
+            lambda: import_statement(
+                user, parse_statement(upload(statement)), sales, other
+            ),
+        )
+        print(f"  {result.created:,} created, {args.lines / seconds:,.0f} lines/s")
+
+        result, _ = timed(
+            "re-import (all duplicates)",
+            lambda: import_statement(
+                user, parse_statement(upload(statement)), sales, other
+            ),
+        )
+        print(f"  {result.duplicates:,} duplicates, {result.created} created")
+
+        sample = list(Expense.objects.filter(user=user)[: args.sample])
+        for expense in sample:
+            expense.pk = None
+
+        def save_each():
+            for expense in sample:
+                expense.save()
+
+        _, seconds = timed(f"save() x {len(sample):,}", save_each)
+        print(
+            f"  {len(sample) / seconds:,.0f} lines/s, about "
+            f"{args.lines * seconds / len(sample):,.0f} s for the whole statement"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Time the per-row tax period mapping used by exports, imports and totals.
+
+Compares the string-based helpers the app used before ``bookkeeping.periods``
+(month/day comparison chains, labels rebuilt and re-split per call) with the
+lookup-table mapping and memoised ``TaxPeriod``/``Quarter`` objects. Needs no
+database.
+
+Usage:
+    python benchmarks/tax_periods.py [--rows 1000000] [--repeat 5]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from bookkeeping.periods import Quarter, TaxPeriod, period_for_date  # noqa: E402
+
+
+def legacy_tax_year(d):
+    if d.month < 4 or (d.month == 4 and d.day < 6):
+        return f"{d.year - 1}-{d.year}"
+    return f"{d.year}-{d.year + 1}"
+
+
+def legacy_quarter(d):
+    year = d.year if d.month > 4 or (d.month == 4 and d.day >= 6) else d.year - 1
+    if (d.month == 4 and d.day >= 6) or d.month in [5, 6] or (
+        d.month == 7 and d.day <= 5
+    ):
+        return f"{year}-Q1"
+    if (d.month == 7 and d.day >= 6) or d.month in [8, 9] or (
+        d.month == 10 and d.day <= 5
+    ):
+        return f"{year}-Q2"
+    if (d.month == 10 and d.day >= 6) or d.month in [11, 12] or (
+        d.month == 1 and d.day <= 5
+    ):
+        return f"{year}-Q3"
+    return f"{year}-Q4"
+
+
+def legacy_bounds(label):
+    start_year = int(label.split("-")[0])
+    end_year = int(label.split("-")[1])
+    return date(start_year, 4, 6), date(end_year, 4, 5)
+
+
+CASES = {
+    "tax year label per row": (
+        lambda days: [legacy_tax_year(d) for d in days],
+        lambda days: [TaxPeriod.for_date(d).label for d in days],
+    ),
+    "quarter code per row": (
+        lambda days: [legacy_quarter(d) for d in days],
+        lambda days: [Quarter.for_date(d).code for d in days],
+    ),
+    "(tax_year, quarter_no) per row": (
+        lambda days: [
+            (int(q[:4]), int(q[-1])) for q in (legacy_quarter(d) for d in days)
+        ],
+        lambda days: [period_for_date(d) for d in days],
+    ),
+    "bounds from label per row": (
+        lambda days: [legacy_bounds(legacy_tax_year(d)) for d in days],
+        lambda days: [TaxPeriod.from_label(legacy_tax_year(d)).bounds for d in days],
+    ),
+}
+
+
+def timed(func, days, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(days)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    first_day = date(2015, 1, 1)
+    days = [
+        first_day + timedelta(days=rng.randrange(15 * 365)) for _ in range(args.rows)
+    ]
+
+    for label, (legacy, current) in CASES.items():
+        assert legacy(days[:1000]) == current(days[:1000]), label
+        legacy_ms = timed(legacy, days, args.repeat)
+        current_ms = timed(current, days, args.repeat)
+        print(
+            f"{label:<32} legacy {legacy_ms:8.1f} ms  periods {current_ms:8.1f} ms  "
+            f"({legacy_ms / current_ms:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
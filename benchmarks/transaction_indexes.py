@@ -0,0 +1,190 @@
+"""
+Compare query plans and timings for the Income/Expense composite indexes.
+
+Builds a throwaway SQLite database migrated to just before the index
+migration, fills it with synthetic transactions, then runs the queries the
+views issue before and after applying ``0004_transaction_indexes``.
+
+Usage:
+    python benchmarks/transaction_indexes.py [--rows 1000000] [--users 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mtdify.settings")
+
+BEFORE = "0003_periodtotal"
+AFTER = "0004_transaction_indexes"
+
+
+def setup_django(db_path):
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    django.setup()
+
+
+def populate(rows, users):
+    """Insert ``rows`` transactions, split between income and expenses."""
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+
+    from bookkeeping.models import Category
+    from bookkeeping.utils import get_tax_period_from_date
+
+    user_ids = [
+        get_user_model().objects.create_user(email=f"user{n}@example.com").pk
+        for n in range(users)
+    ]
+    income_categories = [
+        Category.objects.create(name=f"Income {n}", category_type="income").pk
+        for n in range(3)
+    ]
+    expense_categories = [
+        Category.objects.create(name=f"Expense {n}", category_type="expense").pk
+        for n in range(20)
+    ]
+
+    first_day = date(2021, 4, 6)
+    days = [first_day + timedelta(days=n) for n in range(4 * 365)]
+    quarters = {day: "%d-Q%d" % get_tax_period_from_date(day) for day in days}
+    now = "2025-01-01 00:00:00"
+
+    rng = random.Random(42)
+    income_rows, expense_rows = [], []
+    for n in range(rows):
+        day = rng.choice(days)
+        amount = f"{rng.randint(100, 500000) / 100:.2f}"
+        if n % 2 == 0:
+            income_rows.append(
+                (rng.choice(user_ids), day.isoformat(), f"Invoice {n}", amount,
+                 rng.choice(income_categories), "", "", quarters[day], "", now, now)
+            )
+        else:
+            vat = f"{Decimal(amount) / 6:.2f}"
+            expense_rows.append(
+                (rng.choice(user_ids), day.isoformat(), f"Purchase {n}", amount,
+                 rng.choice(expense_categories), vat, "0.00", "", quarters[day],
+                 "", now, now)
+            )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO bookkeeping_income (user_id, date, description, amount,"
+            " category_id, client_name, invoice_number, quarter, notes,"
+            " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            income_rows,
+        )
+        cursor.executemany(
+            "INSERT INTO bookkeeping_expense (user_id, date, description, amount,"
+            " category_id, vat_amount, vat_rate, supplier_name, quarter, notes,"
+            " created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            expense_rows,
+        )
+        cursor.execute("ANALYZE")
+
+    return user_ids[0], income_categories[0], expense_categories[0]
+
+
+def benchmark_queries(user_id, income_category, expense_category):
+    """The Income/Expense queries the dashboard, lists and exports issue."""
+    from django.db.models import Sum
+
+    from bookkeeping.models import Expense, Income
+
+    start, end = date(2023, 4, 6), date(2024, 4, 5)
+    return {
+        "income total for tax year": Income.objects.filter(
+            user_id=user_id, date__gte=start, date__lte=end
+        )
+        .values("user_id")
+        .annotate(total=Sum("amount"))
+        .order_by(),
+        "expense totals for tax year": Expense.objects.filter(
+            user_id=user_id, date__gte=start, date__lte=end
+        )
+        .values("user_id")
+        .annotate(total=Sum("amount"), vat=Sum("vat_amount"))
+        .order_by(),
+        "income for quarter": Income.objects.filter(
+            user_id=user_id, quarter="2023-Q2"
+        ).values_list("date", "amount"),
+        "expenses for category and year": Expense.objects.filter(
+            user_id=user_id,
+            category_id=expense_category,
+            date__gte=start,
+            date__lte=end,
+        ).values_list("date", "description", "amount"),
+        # Named columns, since later migrations add fields this schema lacks
+        "income list page": Income.objects.filter(
+            user_id=user_id, category_id=income_category
+        )
+        .order_by("-date")
+        .values_list("id", "date", "description", "amount")[:25],
+    }
+
+
+def run(queries, repeat):
+    from django.db import connection
+
+    results = {}
+    with connection.cursor() as cursor:
+        for label, queryset in queries.items():
+            sql, params = queryset.query.sql_with_params()
+
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                timings.append(time.perf_counter() - started)
+
+            results[label] = (plan, statistics.median(timings) * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(str(Path(tmp) / "benchmark.sqlite3"))
+
+        from django.core.management import call_command
+
+        call_command("migrate", "bookkeeping", BEFORE, verbosity=0)
+        print(f"Inserting {args.rows:,} transactions for {args.users} users...")
+        queries = benchmark_queries(*populate(args.rows, args.users))
+
+        before = run(queries, args.repeat)
+        call_command("migrate", "bookkeeping", AFTER, verbosity=0)
+        after = run(queries, args.repeat)
+
+        for label in queries:
+            (plan_before, ms_before), (plan_after, ms_after) = before[label], after[label]
+            print(f"\n{label}: {ms_before:.2f} ms -> {ms_after:.2f} ms")
+            print("  before: " + "; ".join(plan_before))
+            print("  after:  " + "; ".join(plan_after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare icontains and FTS5 search on a synthetic ledger.
+
+Builds a throwaway SQLite database with every migration applied, fills it
+with synthetic transactions and times the list-view search for one user
+with both search backends.
+
+Usage:
+    python benchmarks/transaction_search.py [--rows 500000] [--users 50]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from transaction_indexes import populate, setup_django
+
+QUERIES = ["Invoice 4242", "purch", "invoice 1"]
+
+
+def run(backend, queryset, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = list(backend.search(queryset, query).order_by("-date")[:21])
+        timings.append(time.perf_counter() - started)
+    return len(rows), statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(str(Path(tmp) / "benchmark.sqlite3"))
+
+        from django.core.management import call_command
+
+        from bookkeeping.models import Expense, Income
+        from bookkeeping.search import ContainsSearchBackend, SQLiteFTSSearchBackend
+
+        call_command("migrate", verbosity=0)
+        print(f"Inserting {args.rows:,} transactions for {args.users} users...")
+        user_id, _, _ = populate(args.rows, args.users)
+
+        for model in (Income, Expense):
+            queryset = model.objects.filter(user_id=user_id)
+            for query in QUERIES:
+                found, contains_ms = run(
+                    ContainsSearchBackend(), queryset, query, args.repeat
+                )
+                _, fts_ms = run(SQLiteFTSSearchBackend(), queryset, query, args.repeat)
+                print(
+                    f"{model.__name__:<8} {query!r:<16} {found:>3} rows  "
+                    f"icontains {contains_ms:8.2f} ms  fts5 {fts_ms:8.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,15 @@ from django.db import models
 from django.template.response import TemplateResponse
 from django.urls import path
 
-from .models import Category, Income, Expense, ProfitAndLoss, RecurringRunLog
+from .models import (
+    Category,
+    Income,
+    Expense,
+    PeriodTotal,
+    ProfitAndLoss,
+    RecurringRunLog,
+    ReportJob,
+)
 
 # ===========================
 # CATEGORY ADMIN
@@ -227,12 +235,12 @@ class ProfitAndLossAdmin(admin.ModelAdmin):
         return custom + urls
 
     def summary_view(self, request):
-        income_total = (
-            Income.objects.aggregate(total=models.Sum("amount"))["total"] or 0
-        )
-        expense_total = (
-            Expense.objects.aggregate(total=models.Sum("amount"))["total"] or 0
+        totals = PeriodTotal.objects.aggregate(
+            income=models.Sum("amount_total", filter=models.Q(kind="income")),
+            expenses=models.Sum("amount_total", filter=models.Q(kind="expense")),
         )
+        income_total = totals["income"] or 0
+        expense_total = totals["expenses"] or 0
         profit = income_total - expense_total
 
         context = dict(
@@ -255,3 +263,13 @@ admin.site.register(ProfitAndLoss, ProfitAndLossAdmin)
 class RecurringRunLogAdmin(admin.ModelAdmin):
     list_display = ["user", "last_run_date"]
     readonly_fields = ["last_run_date"]
+
+
+# ===========================
+# BACKGROUND REPORT JOBS
+# ===========================
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ["filename", "user", "status", "created_at", "finished_at"]
+    list_filter = ["status", "report"]
+    readonly_fields = ["created_at", "started_at", "heartbeat_at", "finished_at"]
@@ -0,0 +1,423 @@
+# bookkeeping/backups.py
+"""
+Online backups of the SQLite database.
+
+Backups use SQLite's backup API, copying the database a few pages at a time
+so writers are never blocked for long and the copy is always consistent,
+even in WAL mode. A lock file next to the backups makes sure only one
+process backs up at a time, and startup backups run in a background thread
+so worker boot time does not depend on the size of the database.
+
+Snapshots are split into fixed-size chunks and kept in a content-addressed
+store: each chunk is gzip-compressed and written once under its SHA-256, and
+a small JSON manifest per day lists the chunks that make up that day's
+database. Unchanged regions of the database cost nothing after the first
+backup, so disk use grows with the pages that change rather than the size of
+the database.
+
+In WAL mode the live database file is chunked in place. The WAL is
+checkpointed and a read transaction opened; if the WAL is still empty, the
+reader reads the database file alone, and SQLite will not checkpoint into
+it until the transaction ends, so the file is a consistent snapshot for as
+long as it is held. Each backup then reads the database once and writes
+only the chunks that changed. If writers got in first, or the database is
+not in WAL mode, it is copied with the backup API and the copy chunked
+instead, which costs a full extra write and read.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+
+# Pages copied per step; the source is unlocked between steps
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_SLEEP = 0.005
+BACKUP_DAYS_TO_KEEP = 90
+
+# Store chunk size; a multiple of every SQLite page size, so a changed page
+# only ever dirties one chunk
+BACKUP_CHUNK_SIZE = 64 * 1024
+
+# A WAL file no larger than its header holds no frames
+WAL_HEADER_SIZE = 32
+WAL_CHECKPOINT_TIMEOUT_MS = 1000
+
+_startup_backup_started = False
+
+
+def get_database_path():
+    """
+    Return the path to the SQLite database file.
+
+    Uses Django's settings to get the actual database location,
+    which works correctly for both PyInstaller and Docker/self-hosted.
+    """
+    db_name = settings.DATABASES.get("default", {}).get("NAME")
+
+    if db_name:
+        return Path(db_name)
+
+    # Fallback for legacy PyInstaller builds
+    if hasattr(sys, "_MEIPASS") or getattr(sys, "frozen", False):
+        return Path(sys.executable).parent / "db.sqlite3"
+
+    return settings.BASE_DIR / "db.sqlite3"
+
+
+def get_backup_dir():
+    """Backups live in a 'backups' folder alongside the database."""
+    return get_database_path().parent / "backups"
+
+
+def manifest_path_for(day, backup_dir=None):
+    return (backup_dir or get_backup_dir()) / "manifests" / f"db-{day:%Y-%m-%d}.json"
+
+
+def _chunk_path(backup_dir, digest):
+    return backup_dir / "chunks" / digest[:2] / f"{digest}.gz"
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    partial.write_bytes(data)
+    os.replace(partial, path)
+
+
+@contextmanager
+def backup_lock(backup_dir):
+    """
+    Hold an exclusive, non-blocking lock on ``backup_dir``.
+
+    Yields ``True`` if the lock was acquired and ``False`` if another process
+    already holds it. The operating system releases the lock if the process
+    dies, so a crashed backup never leaves a stale lock behind.
+    """
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    handle = open(backup_dir / ".backup.lock", "a+b")
+
+    try:
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            if os.name == "nt":
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    finally:
+        handle.close()
+
+
+def copy_database(source_path, target_path):
+    """
+    Copy a live database to ``target_path`` with the SQLite backup API.
+
+    The copy is written to a temporary file first and moved into place once
+    complete, so a half-written backup is never mistaken for a good one.
+    """
+    partial = target_path.with_name(target_path.name + ".partial")
+
+    source = sqlite3.connect(source_path, timeout=30)
+    try:
+        target = sqlite3.connect(partial)
+        try:
+            source.backup(
+                target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP
+            )
+        finally:
+            target.close()
+    except Exception:
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+
+    os.replace(partial, target_path)
+    return target_path
+
+
+@contextmanager
+def frozen_database(db_path):
+    """
+    Yield the live database file opened for reading, held unchanged by a
+    read transaction, or ``None`` if that cannot be guaranteed.
+
+    Only a WAL database whose WAL is empty once the read transaction has
+    started qualifies: that reader reads the database file alone, and no
+    checkpoint can write to the file while it is open. Writers carry on
+    appending to the WAL meanwhile.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            yield None
+            return
+
+        # Emptying the WAL waits for readers; give up quickly and copy
+        conn.execute(f"PRAGMA busy_timeout={WAL_CHECKPOINT_TIMEOUT_MS}")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+        try:
+            wal_path = db_path.with_name(db_path.name + "-wal")
+            if wal_path.exists() and wal_path.stat().st_size > WAL_HEADER_SIZE:
+                yield None
+            else:
+                with open(db_path, "rb") as database:
+                    yield database
+        finally:
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+
+def _latest_chunks(backup_dir):
+    """Chunk digests of the most recent backup, known to be in the store."""
+    backups = list_backups(backup_dir)
+    if not backups:
+        return set()
+    manifest = json.loads(manifest_path_for(backups[-1], backup_dir).read_bytes())
+    return set(manifest["chunks"])
+
+
+def store_stream(source, manifest_path):
+    """
+    Add the database read from the binary file ``source`` to the chunk
+    store and write its manifest.
+
+    Chunks in the previous backup are skipped without touching the store;
+    others are written only if missing. Returns ``(chunks_written,
+    bytes_written)`` for the chunks written.
+    """
+    backup_dir = manifest_path.parent.parent
+    previous = _latest_chunks(backup_dir)
+    whole_file = hashlib.sha256()
+    digests = []
+    size = chunks_written = bytes_written = 0
+
+    while chunk := source.read(BACKUP_CHUNK_SIZE):
+        size += len(chunk)
+        whole_file.update(chunk)
+        digest = hashlib.sha256(chunk).hexdigest()
+        digests.append(digest)
+
+        if digest in previous:
+            continue
+
+        chunk_path = _chunk_path(backup_dir, digest)
+        if not chunk_path.exists():
+            compressed = gzip.compress(chunk, compresslevel=6, mtime=0)
+            _write_atomic(chunk_path, compressed)
+            chunks_written += 1
+            bytes_written += len(compressed)
+
+    manifest = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "size": size,
+        "sha256": whole_file.hexdigest(),
+        "chunk_size": BACKUP_CHUNK_SIZE,
+        "chunks": digests,
+    }
+    _write_atomic(manifest_path, json.dumps(manifest, indent=1).encode())
+
+    return chunks_written, bytes_written
+
+
+def store_snapshot(snapshot_path, manifest_path):
+    """Add a database snapshot file to the chunk store; see ``store_stream``."""
+    with open(snapshot_path, "rb") as snapshot:
+        return store_stream(snapshot, manifest_path)
+
+
+def store_database(db_path, manifest_path):
+    """
+    Back up the live database at ``db_path`` into the chunk store.
+
+    Chunks the database file in place when it can be read as a consistent
+    snapshot, and otherwise copies it with the backup API first. Returns
+    ``(chunks_written, bytes_written)``.
+    """
+    with frozen_database(db_path) as database:
+        if database is not None:
+            return store_stream(database, manifest_path)
+
+    snapshot_path = manifest_path.parent.parent / "snapshot.sqlite3"
+    snapshot = copy_database(db_path, snapshot_path)
+    try:
+        return store_snapshot(snapshot, manifest_path)
+    finally:
+        snapshot.unlink(missing_ok=True)
+
+
+def restore_snapshot(manifest_path, target_path):
+    """
+    Rebuild the database described by ``manifest_path`` at ``target_path``.
+
+    Raises ``ValueError`` if the rebuilt file does not match the checksum
+    recorded when the backup was taken.
+    """
+    backup_dir = manifest_path.parent.parent
+    manifest = json.loads(manifest_path.read_bytes())
+    whole_file = hashlib.sha256()
+    partial = target_path.with_name(target_path.name + ".partial")
+
+    try:
+        with open(partial, "wb") as target:
+            for digest in manifest["chunks"]:
+                chunk = gzip.decompress(_chunk_path(backup_dir, digest).read_bytes())
+                whole_file.update(chunk)
+                target.write(chunk)
+
+        if whole_file.hexdigest() != manifest["sha256"]:
+            raise ValueError(f"Checksum mismatch restoring {manifest_path.name}")
+    except Exception:
+        partial.unlink(missing_ok=True)
+        raise
+
+    os.replace(partial, target_path)
+    return target_path
+
+
+def list_backups(backup_dir=None):
+    """Dates with a restorable backup, oldest first."""
+    backup_dir = backup_dir or get_backup_dir()
+    days = []
+
+    for manifest in (backup_dir / "manifests").glob("db-*.json"):
+        try:
+            days.append(datetime.strptime(manifest.stem, "db-%Y-%m-%d").date())
+        except ValueError:
+            continue
+
+    return sorted(days)
+
+
+def collect_garbage(backup_dir):
+    """Delete chunks no manifest refers to. Returns the number removed."""
+    referenced = set()
+    for manifest in (backup_dir / "manifests").glob("db-*.json"):
+        referenced.update(json.loads(manifest.read_bytes())["chunks"])
+
+    removed = 0
+    for chunk_path in (backup_dir / "chunks").glob("*/*.gz"):
+        if chunk_path.name[: -len(".gz")] not in referenced:
+            chunk_path.unlink()
+            removed += 1
+
+    return removed
+
+
+def cleanup_old_backups(backup_dir, days_to_keep=BACKUP_DAYS_TO_KEEP):
+    """Remove backups older than specified days and their unused chunks."""
+    cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+
+    # Manifests, plus full copies written before the chunk store existed
+    for backup_file in [
+        *(backup_dir / "manifests").glob("db-*.json"),
+        *backup_dir.glob("db-*.sqlite3"),
+    ]:
+        try:
+            file_date = datetime.strptime(backup_file.stem, "db-%Y-%m-%d")
+
+            if file_date < cutoff_date:
+                backup_file.unlink()
+                print(f"Deleted old backup: {backup_file.name}")
+
+        except Exception:
+            continue
+
+    # Left behind by a process that exited mid-backup
+    for partial in backup_dir.rglob("*.partial"):
+        partial.unlink(missing_ok=True)
+
+    removed = collect_garbage(backup_dir)
+    if removed:
+        print(f"Deleted {removed} unused backup chunks")
+
+
+def run_daily_backup(force=False):
+    """
+    Create today's backup unless it already exists.
+
+    Returns the path of the new manifest, or ``None`` if nothing was written.
+    """
+    db_path = get_database_path()
+    backup_dir = get_backup_dir()
+
+    if not db_path.exists():
+        print(f"⚠️ No database file found at {db_path}. Backup skipped.")
+        return None
+
+    # Check if database is empty before backing up
+    if db_path.stat().st_size == 0:
+        print("Database file is empty (0 KB). Backup skipped.")
+        return None
+
+    manifest_path = manifest_path_for(datetime.now(), backup_dir)
+
+    with backup_lock(backup_dir) as acquired:
+        if not acquired:
+            print("Another process is already backing up. Backup skipped.")
+            return None
+
+        if manifest_path.exists() and not force:
+            print(f"Backup already exists for today: {manifest_path.name}")
+            return None
+
+        chunks, size = store_database(db_path, manifest_path)
+
+        print(
+            f"✅ Backup created: {manifest_path.name} "
+            f"({chunks} new chunks, {size / 1024:.0f} KB)"
+        )
+
+        cleanup_old_backups(backup_dir)
+
+    return manifest_path
+
+
+def _run_backup_safely():
+    try:
+        run_daily_backup()
+    except Exception as e:
+        print(f"⚠️  Backup failed: {e}")
+
+
+def start_background_backup():
+    """Run today's backup in a daemon thread, once per process."""
+    global _startup_backup_started
+
+    if _startup_backup_started:
+        return None
+
+    _startup_backup_started = True
+    thread = threading.Thread(
+        target=_run_backup_safely, name="daily-backup", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,207 @@
+# bookkeeping/categories.py
+"""
+Category slug allocation, bulk import, and cached lookups.
+
+Categories rarely change, so every process keeps them all in memory in a
+``CategoryRegistry``. Saving or deleting a category bumps a version held in
+the shared cache once the change commits (see signals.py), and each process
+reloads its registry the next time it sees a version it has not loaded.
+
+The registry hands the same ``Category`` instances to every caller, so they
+are frozen: setting an attribute or saving one raises ``AttributeError``.
+Fetch a category from the database to change it.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+CATEGORY_VERSION_KEY = "bookkeeping:categories:version"
+
+# Base slugs matched per query when looking for collisions, keeping the
+# OR'd startswith conditions well inside SQLite's expression depth limit
+SLUG_QUERY_BATCH = 200
+
+
+def _existing_categories(category_model, names, bases):
+    """
+    (name, category_type, slug) for rows that share a name with ``names`` or
+    whose slug starts with one of ``bases``.
+    """
+    names = list(names)
+    bases = sorted(set(bases))
+    rows = []
+
+    for start in range(0, max(len(bases), 1), SLUG_QUERY_BATCH):
+        condition = Q(name__in=names)
+        for base in bases[start : start + SLUG_QUERY_BATCH]:
+            condition |= Q(slug__startswith=base)
+        rows.extend(
+            category_model.objects.filter(condition).values_list(
+                "name", "category_type", "slug"
+            )
+        )
+
+    return rows
+
+
+def _next_free_slug(base_slug, taken):
+    """Base slug, then -1, -2, ... until one is not in ``taken``."""
+    slug = base_slug
+    counter = 1
+    while slug in taken:
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    taken.add(slug)
+    return slug
+
+
+def allocate_slug(category_model, name):
+    """
+    A free slug for ``name``, found with a single query.
+
+    Every slug starting with the base slug is fetched at once and the
+    first free suffix picked in memory, rather than probing one candidate
+    per query.
+    """
+    base_slug = slugify(name)
+    taken = category_model.objects.filter(slug__startswith=base_slug).values_list(
+        "slug", flat=True
+    )
+    return _next_free_slug(base_slug, set(taken))
+
+
+def import_categories(category_model, rows):
+    """
+    Create categories from ``(name, category_type)`` pairs in bulk.
+
+    Pairs that already exist, or repeat within ``rows``, are skipped.
+    Existing names and colliding slugs are read up front, slugs for every
+    new category allocated in memory, and the rows inserted with one
+    ``bulk_create``. Takes the model as an argument so data migrations can
+    pass their historical model. Returns the created categories.
+    """
+    rows = [(name.strip(), category_type) for name, category_type in rows]
+    rows = [(name, category_type) for name, category_type in rows if name]
+
+    existing = _existing_categories(
+        category_model,
+        {name for name, _ in rows},
+        {slugify(name) for name, _ in rows},
+    )
+    present = {(name, category_type) for name, category_type, _ in existing}
+    taken = {slug for _, _, slug in existing if slug}
+
+    created = []
+    for name, category_type in rows:
+        if (name, category_type) in present:
+            continue
+        present.add((name, category_type))
+
+        created.append(
+            category_model(
+                name=name,
+                category_type=category_type,
+                slug=_next_free_slug(slugify(name), taken),
+            )
+        )
+
+    if not created:
+        return []
+
+    # bulk_create sends no post_save, so invalidate the registry here
+    created = category_model.objects.bulk_create(created)
+    invalidate_categories()
+    return created
+
+
+class CategoryRegistry:
+    """All categories, loaded with one query and indexed by id, slug and type."""
+
+    def __init__(self):
+        self.version = None
+        self.by_id = {}
+        self.by_slug = {}
+        self.by_type = {}
+
+    def load(self, version):
+        from bookkeeping.models import Category
+
+        categories = list(Category.objects.order_by("id"))
+        for category in categories:
+            category.freeze()
+
+        self.by_id = {category.pk: category for category in categories}
+        self.by_slug = {}
+        self.by_type = {}
+        for category in categories:
+            if category.slug:
+                self.by_slug.setdefault(category.slug, category)
+            self.by_type.setdefault(category.category_type, []).append(category)
+
+        self.version = version
+
+    def all(self):
+        return list(self.by_id.values())
+
+    def of_type(self, category_type, active_only=False):
+        categories = self.by_type.get(category_type, [])
+        if active_only:
+            return [category for category in categories if category.is_active]
+        return list(categories)
+
+
+_registry = CategoryRegistry()
+
+
+def category_version():
+    """The shared category version; changes whenever any category does."""
+    version = cache.get(CATEGORY_VERSION_KEY)
+    if version is None:
+        # First use, or evicted: start a new version so every process reloads
+        version = time.time_ns()
+        if not cache.add(CATEGORY_VERSION_KEY, version, None):
+            version = cache.get(CATEGORY_VERSION_KEY, version)
+    return version
+
+
+def get_category_registry():
+    """The process registry, reloaded if categories changed anywhere."""
+    version = category_version()
+    if _registry.version != version:
+        _registry.load(version)
+    return _registry
+
+
+def category_choices(category_type, active_only=False):
+    """Categories of ``category_type`` in creation order."""
+    return get_category_registry().of_type(category_type, active_only)
+
+
+def get_category(pk):
+    return get_category_registry().by_id.get(pk)
+
+
+def get_category_by_slug(slug):
+    return get_category_registry().by_slug.get(slug)
+
+
+def _bump_category_version():
+    _registry.version = None
+    cache.set(CATEGORY_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_categories():
+    """
+    Make every process reload its categories on next use.
+
+    This process reloads straight away, so a writer sees its own change
+    inside its transaction. The shared version only moves once the change
+    commits: bumped earlier, another process reading in between would cache
+    the old categories under the new version and keep them.
+    """
+    _registry.version = None
+    transaction.on_commit(_bump_category_version)
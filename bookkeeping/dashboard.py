@@ -0,0 +1,204 @@
+# bookkeeping/dashboard.py
+"""
+Dashboard figures for a single user and tax year.
+
+Year, quarter and previous-month figures are read from the PeriodTotal
+table in a single query and folded together in Python, so their cost
+depends on the number of categories and periods rather than the number of
+transactions. This month's figures run from the 1st to today, which a
+whole-month PeriodTotal bucket cannot answer, so they come from one small
+date-bounded aggregate per table instead.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+from bookkeeping.models import Expense, Income, PeriodTotal
+from bookkeeping.periods import TaxPeriod, month_start, previous_month_start
+from bookkeeping.utils import get_current_tax_year
+
+ZERO = Decimal("0.00")
+
+KIND_MODELS = {"income": Income, "expense": Expense}
+
+
+@dataclass
+class LedgerTotals:
+    """Aggregated figures for one table (income or expenses)."""
+
+    ytd: Decimal = ZERO
+    month: Decimal = ZERO
+    previous_month: Decimal = ZERO
+    month_count: int = 0
+    top_category: str = "N/A"
+    quarters: dict = field(default_factory=dict)
+
+    @property
+    def latest_quarter(self):
+        # Quarter codes ("2024-Q3") sort chronologically
+        return max(self.quarters) if self.quarters else None
+
+    def quarter_total(self, quarter_code):
+        return self.quarters.get(quarter_code, ZERO)
+
+
+@dataclass
+class DashboardSummary:
+    """Everything the dashboard template needs, apart from recent items."""
+
+    tax_year: str
+    current_quarter: str
+    days_elapsed: int
+    income: LedgerTotals
+    expenses: LedgerTotals
+
+    @property
+    def quarter_income(self):
+        return self.income.quarter_total(self.current_quarter)
+
+    @property
+    def quarter_expenses(self):
+        return self.expenses.quarter_total(self.current_quarter)
+
+    @property
+    def quarter_profit(self):
+        return self.quarter_income - self.quarter_expenses
+
+    @property
+    def ytd_profit(self):
+        return self.income.ytd - self.expenses.ytd
+
+    @property
+    def month_profit(self):
+        return self.income.month - self.expenses.month
+
+    @property
+    def avg_daily_income(self):
+        return self.income.month / self.days_elapsed
+
+    @property
+    def avg_daily_expenses(self):
+        return self.expenses.month / self.days_elapsed
+
+    @property
+    def month_change(self):
+        """Month-over-month income change as a percentage."""
+        if self.income.previous_month > 0:
+            return (
+                (self.income.month - self.income.previous_month)
+                / self.income.previous_month
+            ) * 100
+        return 0 if self.income.month == 0 else 100
+
+    @property
+    def total_transactions(self):
+        return self.income.month_count + self.expenses.month_count
+
+    def as_context(self):
+        """Flatten the summary into the dashboard template context."""
+        return {
+            "selected_tax_year": self.tax_year,
+            "tax_year": self.tax_year,
+            # Quarter
+            "current_quarter": self.current_quarter,
+            "quarter_income": self.quarter_income,
+            "quarter_expenses": self.quarter_expenses,
+            "quarter_profit": self.quarter_profit,
+            # Year-to-date
+            "ytd_income": self.income.ytd,
+            "ytd_expenses": self.expenses.ytd,
+            "ytd_profit": self.ytd_profit,
+            # Monthly Review
+            "month_income": self.income.month,
+            "month_expenses": self.expenses.month,
+            "month_profit": self.month_profit,
+            "avg_daily_income": self.avg_daily_income,
+            "avg_daily_expenses": self.avg_daily_expenses,
+            "month_change": self.month_change,
+            "top_income_category": self.income.top_category,
+            "top_expense_category": self.expenses.top_category,
+            "total_transactions": self.total_transactions,
+            # Existing fields
+            "total_income": self.income.ytd,
+            "total_expenses": self.expenses.ytd,
+        }
+
+
+def _ledger_totals(user, tax_year, this_month, today):
+    """
+    Fold the user's PeriodTotal rows into income and expense totals, then
+    add this month's figures up to ``today``.
+
+    Only PeriodTotal rows for ``tax_year`` and the previous calendar month
+    are read; the month may fall in another tax year.
+    """
+    previous_month = previous_month_start(this_month)
+
+    rows = PeriodTotal.objects.filter(
+        Q(tax_year=tax_year) | Q(month=previous_month), user=user
+    ).values_list("kind", "tax_year", "quarter", "month", "amount_total")
+
+    ledgers = {"income": LedgerTotals(), "expense": LedgerTotals()}
+    quarters = {kind: defaultdict(lambda: ZERO) for kind in ledgers}
+
+    for kind, row_tax_year, quarter, month, amount in rows:
+        totals = ledgers[kind]
+
+        if row_tax_year == tax_year:
+            totals.ytd += amount
+            quarters[kind][quarter] += amount
+
+        if month == previous_month:
+            totals.previous_month += amount
+
+    for kind, totals in ledgers.items():
+        totals.quarters = dict(quarters[kind])
+        _add_month_to_date(totals, KIND_MODELS[kind], user, this_month, today)
+
+    return ledgers["income"], ledgers["expense"]
+
+
+def _add_month_to_date(totals, model, user, this_month, today):
+    """Set this month's total, count and top category, up to ``today``."""
+    rows = (
+        model.objects.filter(user=user, date__gte=this_month, date__lte=today)
+        .values("category__name")
+        .annotate(total=Sum("amount"), entries=Count("id"))
+        .order_by()
+    )
+
+    month_by_category = {}
+    for row in rows:
+        totals.month += row["total"]
+        totals.month_count += row["entries"]
+        month_by_category[row["category__name"]] = row["total"]
+
+    if month_by_category:
+        totals.top_category = max(month_by_category, key=month_by_category.get)
+
+
+def build_dashboard_summary(user, tax_year, today):
+    """
+    Build the dashboard summary for ``user`` in ``tax_year`` as of ``today``.
+    """
+    this_month = month_start(today)
+
+    income, expenses = _ledger_totals(user, tax_year, this_month, today)
+
+    if tax_year == get_current_tax_year():
+        # Quarter of the most recent transaction, income first
+        current_quarter = income.latest_quarter or expenses.latest_quarter or "N/A"
+    else:
+        # For historical years, show Q4 as the "last quarter"
+        current_quarter = TaxPeriod.from_label(tax_year).quarter(4).code
+
+    return DashboardSummary(
+        tax_year=tax_year,
+        current_quarter=current_quarter,
+        days_elapsed=(today - this_month).days + 1,
+        income=income,
+        expenses=expenses,
+    )
@@ -0,0 +1,373 @@
+# bookkeeping/export_formats.py
+"""
+Writers that turn export rows into CSV, XLSX, Arrow or Parquet files.
+
+An export is described once, as a sequence of typed ``Column``s, and fed one
+iterable of row tuples straight from ``values_list``. Every format turns those
+rows into a stream of ``bytes`` chunks, one per ``EXPORT_CHUNK_SIZE`` rows, so
+responses and files are written while rows are still being fetched and memory
+use stays flat.
+
+CSV writes each chunk with a single ``writerows`` call. XLSX is a minimal
+workbook streamed through ``zipfile``, and Arrow IPC and Parquet are built from
+columnar record batches. Those three keep dates and amounts typed, so
+spreadsheets and analysis tools load them as dates and numbers rather than
+text. Arrow and Parquet are only offered when pyarrow is installed.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from dataclasses import dataclass
+from xml.sax.saxutils import escape
+
+from bookkeeping.utils import chunked
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Rows fetched from the database per round trip, and written per chunk
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_ROW_GROUP_SIZE = 50_000
+
+# Column kinds
+TEXT = "text"
+DATE = "date"
+DECIMAL = "decimal"
+INTEGER = "integer"
+
+
+@dataclass(frozen=True)
+class Column:
+    header: str
+    kind: str = TEXT
+    # Format spec CSV writes the value with, e.g. "%d/%m/%Y" or ".2f";
+    # values are written as they come when unset
+    text_format: str = None
+
+
+class ChunkSink(io.RawIOBase):
+    """
+    Write-only, unseekable file that collects bytes until they are drained.
+
+    ``zipfile`` and pyarrow write into it, and each drain hands back what
+    they have written since, ready to send.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ExportFormat:
+    name = None
+    label = None
+    extension = None
+    content_type = None
+
+    def write(self, columns, rows):
+        """Yield the export as ``bytes`` chunks."""
+        raise NotImplementedError
+
+
+# ===========================================
+# CSV
+# ===========================================
+
+
+class CSVFormat(ExportFormat):
+    name = "csv"
+    label = "CSV"
+    extension = "csv"
+    content_type = "text/csv"
+
+    def write(self, columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.header for column in columns])
+
+        formatted = [
+            (index, column.text_format)
+            for index, column in enumerate(columns)
+            if column.text_format
+        ]
+        if formatted:
+            rows = self._format_values(formatted, rows)
+
+        for chunk in chunked(rows, EXPORT_CHUNK_SIZE):
+            writer.writerows(chunk)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # Header only, when there are no rows
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def _format_values(formatted, rows):
+        for row in rows:
+            row = list(row)
+            for index, spec in formatted:
+                if row[index] is not None:
+                    row[index] = format(row[index], spec)
+            yield row
+
+
+# ===========================================
+# XLSX
+# ===========================================
+
+# Excel counts days from 30 December 1899
+EXCEL_EPOCH_ORDINAL = 693594
+
+# Characters XML 1.0 does not allow, even escaped
+ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        "</Relationships>"
+    ),
+    # Cell styles: 0 general, 1 bold header, 2 date, 3 two decimal places
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/>'
+        "</border></borders>"
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+        "</cellStyleXfs>"
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" '
+        'applyNumberFormat="1"/>'
+        '<xf numFmtId="2" fontId="0" fillId="0" borderId="0" xfId="0" '
+        'applyNumberFormat="1"/>'
+        "</cellXfs>"
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/>'
+        "</cellStyles></styleSheet>"
+    ),
+}
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+SHEET_END = "</sheetData></worksheet>"
+
+
+def _text_cell(value, style=""):
+    value = ILLEGAL_XML_CHARS.sub("", escape(str(value)))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{value}</t></is></c>'
+
+
+def _date_cell(value):
+    return f'<c s="2"><v>{value.toordinal() - EXCEL_EPOCH_ORDINAL}</v></c>'
+
+
+def _decimal_cell(value):
+    return f'<c s="3"><v>{value}</v></c>'
+
+
+def _integer_cell(value):
+    return f"<c><v>{value}</v></c>"
+
+
+XLSX_CELLS = {
+    TEXT: _text_cell,
+    DATE: _date_cell,
+    DECIMAL: _decimal_cell,
+    INTEGER: _integer_cell,
+}
+
+
+class XLSXFormat(ExportFormat):
+    name = "xlsx"
+    label = "Excel"
+    extension = "xlsx"
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def write(self, columns, rows):
+        sink = ChunkSink()
+        cells = [XLSX_CELLS[column.kind] for column in columns]
+
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as workbook:
+            for name, content in XLSX_PARTS.items():
+                workbook.writestr(name, content)
+
+            with workbook.open("xl/worksheets/sheet1.xml", "w") as sheet:
+                header = "".join(
+                    _text_cell(column.header, ' s="1"') for column in columns
+                )
+                sheet.write(f"{SHEET_START}<row>{header}</row>".encode())
+
+                for chunk in chunked(rows, EXPORT_CHUNK_SIZE):
+                    sheet.write(
+                        "".join(
+                            "<row>"
+                            + "".join(
+                                "<c/>" if value is None else cell(value)
+                                for cell, value in zip(cells, row)
+                            )
+                            + "</row>"
+                            for row in chunk
+                        ).encode()
+                    )
+                    yield sink.drain()
+
+                sheet.write(SHEET_END.encode())
+
+        yield sink.drain()
+
+
+# ===========================================
+# ARROW IPC / PARQUET (pyarrow)
+# ===========================================
+
+
+def arrow_schema(columns):
+    types = {
+        TEXT: pyarrow.string(),
+        DATE: pyarrow.date32(),
+        DECIMAL: pyarrow.decimal128(14, 2),
+        INTEGER: pyarrow.int64(),
+    }
+    return pyarrow.schema(
+        [pyarrow.field(column.header, types[column.kind]) for column in columns]
+    )
+
+
+def record_batches(schema, rows, size=EXPORT_CHUNK_SIZE):
+    """Transpose each chunk of rows into a typed Arrow record batch."""
+    for chunk in chunked(rows, size):
+        values = list(zip(*chunk))
+        yield pyarrow.record_batch(
+            [
+                pyarrow.array(column, type=field.type)
+                for column, field in zip(values, schema)
+            ],
+            schema=schema,
+        )
+
+
+class ArrowFormat(ExportFormat):
+    name = "arrow"
+    label = "Arrow IPC"
+    extension = "arrow"
+    content_type = "application/vnd.apache.arrow.file"
+    batch_size = EXPORT_CHUNK_SIZE
+
+    def open_writer(self, sink, schema):
+        return pyarrow.ipc.new_file(
+            sink, schema, options=pyarrow.ipc.IpcWriteOptions(compression="zstd")
+        )
+
+    def write(self, columns, rows):
+        sink = ChunkSink()
+        schema = arrow_schema(columns)
+
+        with self.open_writer(sink, schema) as writer:
+            for batch in record_batches(schema, rows, self.batch_size):
+                writer.write_batch(batch)
+                yield sink.drain()
+
+        yield sink.drain()
+
+
+class ParquetFormat(ArrowFormat):
+    name = "parquet"
+    label = "Parquet"
+    extension = "parquet"
+    content_type = "application/vnd.apache.parquet"
+    batch_size = PARQUET_ROW_GROUP_SIZE
+
+    def open_writer(self, sink, schema):
+        return pyarrow.parquet.ParquetWriter(sink, schema)
+
+
+# ===========================================
+# REGISTRY
+# ===========================================
+
+EXPORT_FORMATS = {
+    export_format.name: export_format
+    for export_format in (CSVFormat(), XLSXFormat())
+}
+
+if pyarrow is not None:
+    EXPORT_FORMATS.update(
+        (export_format.name, export_format)
+        for export_format in (ArrowFormat(), ParquetFormat())
+    )
+
+
+def get_export_format(name):
+    """The registered format called ``name``, or ``None``."""
+    return EXPORT_FORMATS.get(name or "csv")
+
+
+def format_choices():
+    return [(name, export_format.label) for name, export_format in EXPORT_FORMATS.items()]
@@ -1,11 +1,85 @@
 # bookkeeping/forms.py
 
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
+from django.forms.models import ModelChoiceIterator
+from .categories import get_category, get_category_registry
 from .models import Income, Expense, Category, RecurringEntry
+from .export_formats import format_choices
+from .importing import STATEMENT_EXTENSIONS
+from .report_jobs import REPORT_TYPES, report_choices
+from .utils import get_available_tax_years
 from decimal import Decimal
 from secure_uploads.forms import SecureUploadMixin
 
 
+# ============================================================
+# CATEGORY CHOICES
+# ============================================================
+
+
+class CategoryChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for category in self.field.categories():
+            yield self.choice(category)
+
+    def __len__(self):
+        return len(self.field.categories()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.categories())
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """
+    A category select served from the category registry, so rendering and
+    validating the form make no Category queries.
+    """
+
+    iterator = CategoryChoiceIterator
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limit = None
+
+    def limit_to(self, category_type, active_only=False):
+        """Offer only ``category_type``; ``None`` offers no categories."""
+        self.limit = (category_type, active_only)
+        queryset = Category.objects.filter(category_type=category_type)
+        if active_only:
+            queryset = queryset.filter(is_active=True)
+        self.queryset = queryset
+
+    def categories(self):
+        registry = get_category_registry()
+        if self.limit is None:
+            return registry.all()
+        return registry.of_type(*self.limit)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, Category):
+            value = value.pk
+
+        try:
+            category = get_category(int(value))
+        except (TypeError, ValueError):
+            category = None
+
+        if category is None or category not in self.categories():
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return category
+
+
 # ============================================================
 # CATEGORY FORM
 # ============================================================
@@ -34,6 +108,7 @@ class CategoryForm(forms.ModelForm):
 class IncomeForm(forms.ModelForm):
     class Meta:
         model = Income
+        field_classes = {"category": CategoryChoiceField}
         fields = [
             "date",
             "description",
@@ -89,9 +164,7 @@ class IncomeForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
         # Filter categories for income
-        self.fields["category"].queryset = Category.objects.filter(
-            category_type="income"
-        )
+        self.fields["category"].limit_to("income")
 
         # Existing date automatically handled by Django — no overrides needed
 
@@ -128,6 +201,7 @@ class ExpenseForm(SecureUploadMixin, forms.ModelForm):
 
     class Meta:
         model = Expense
+        field_classes = {"category": CategoryChoiceField}
         fields = [
             "date",
             "description",
@@ -191,9 +265,7 @@ class ExpenseForm(SecureUploadMixin, forms.ModelForm):
         super().__init__(*args, **kwargs)
 
         # Filter categories for expenses
-        self.fields["category"].queryset = Category.objects.filter(
-            category_type="expense"
-        )
+        self.fields["category"].limit_to("expense")
         # Existing date automatically handled by Django — no overrides needed
 
     def clean(self):
@@ -247,6 +319,7 @@ class ExpenseForm(SecureUploadMixin, forms.ModelForm):
 class RecurringEntryForm(forms.ModelForm):
     class Meta:
         model = RecurringEntry
+        field_classes = {"category": CategoryChoiceField}
         fields = [
             "entry_type",
             "category",
@@ -295,7 +368,7 @@ class RecurringEntryForm(forms.ModelForm):
             {"class": "w-full border px-3 py-2 rounded"}
         )
         # CATEGORY SELECT (initially empty)
-        self.fields["category"].queryset = Category.objects.none()
+        self.fields["category"].limit_to(None)
         self.fields["category"].widget.attrs.update(
             {"class": "w-full border px-3 py-2 rounded"}
         )
@@ -313,14 +386,8 @@ class RecurringEntryForm(forms.ModelForm):
         entry_type = (entry_type or "").lower()
 
         # Apply category filtering
-        if entry_type == "income":
-            self.fields["category"].queryset = Category.objects.filter(
-                category_type="income", is_active=True
-            )
-        elif entry_type == "expense":
-            self.fields["category"].queryset = Category.objects.filter(
-                category_type="expense", is_active=True
-            )
+        if entry_type in ("income", "expense"):
+            self.fields["category"].limit_to(entry_type, active_only=True)
 
         # Optional fields
         self.fields["supplier_name"].required = False
@@ -364,3 +431,126 @@ class RecurringEntryForm(forms.ModelForm):
         if commit:
             obj.save()
         return obj
+
+
+# ============================================================
+# BACKGROUND REPORT FORM
+# ============================================================
+
+
+class ReportJobForm(forms.Form):
+    report = forms.ChoiceField(
+        choices=report_choices,
+        widget=forms.Select(attrs={"class": "w-full border px-3 py-2 rounded"}),
+    )
+    tax_year = forms.ChoiceField(
+        widget=forms.Select(attrs={"class": "w-full border px-3 py-2 rounded"}),
+    )
+    format = forms.ChoiceField(
+        choices=format_choices,
+        initial="csv",
+        help_text="Used for income and expense exports.",
+        widget=forms.Select(attrs={"class": "w-full border px-3 py-2 rounded"}),
+    )
+
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["tax_year"].choices = [
+            (year, year) for year in get_available_tax_years(user)
+        ] + [("all", "All tax years")]
+
+    def clean(self):
+        cleaned = super().clean()
+        report = REPORT_TYPES.get(cleaned.get("report"))
+
+        if report and cleaned.get("tax_year") == "all" and not report.all_years:
+            self.add_error("tax_year", f"{report.label} needs a single tax year.")
+
+        return cleaned
+
+
+# ============================================================
+# STATEMENT IMPORT
+# ============================================================
+
+
+class StatementImportForm(forms.Form):
+    statement = forms.FileField(
+        validators=[FileExtensionValidator(STATEMENT_EXTENSIONS)],
+        help_text="A CSV, OFX or QFX statement downloaded from your bank.",
+        widget=forms.ClearableFileInput(
+            attrs={
+                "class": "w-full border px-3 py-2 rounded",
+                "accept": ",".join(f".{ext}" for ext in STATEMENT_EXTENSIONS),
+            }
+        ),
+    )
+    income_category = CategoryChoiceField(
+        queryset=Category.objects.none(),
+        help_text="For money in that matches no earlier income or category name.",
+        widget=forms.Select(attrs={"class": "w-full border px-3 py-2 rounded"}),
+    )
+    expense_category = CategoryChoiceField(
+        queryset=Category.objects.none(),
+        help_text="For money out that matches no earlier expense or category name.",
+        widget=forms.Select(attrs={"class": "w-full border px-3 py-2 rounded"}),
+    )
+
+    # CSV column headings, for statements whose headings are not recognised
+    date_column = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={"class": "w-full border px-3 py-2 rounded", "placeholder": "Date"}
+        ),
+    )
+    description_column = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={
+                "class": "w-full border px-3 py-2 rounded",
+                "placeholder": "Description",
+            }
+        ),
+    )
+    amount_column = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={"class": "w-full border px-3 py-2 rounded", "placeholder": "Amount"}
+        ),
+    )
+    # Statements with separate paid in / paid out columns instead of amount
+    money_in_column = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={"class": "w-full border px-3 py-2 rounded", "placeholder": "Paid in"}
+        ),
+    )
+    money_out_column = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={
+                "class": "w-full border px-3 py-2 rounded",
+                "placeholder": "Paid out",
+            }
+        ),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["income_category"].limit_to("income", active_only=True)
+        self.fields["expense_category"].limit_to("expense", active_only=True)
+
+    def clean_statement(self):
+        statement = self.cleaned_data["statement"]
+        if statement.size > settings.STATEMENT_IMPORT_MAX_SIZE:
+            limit = settings.STATEMENT_IMPORT_MAX_SIZE // (1024 * 1024)
+            raise ValidationError(f"Statements can be at most {limit}MB.")
+        return statement
+
+    def column_names(self):
+        """Column headings given on the form, keyed as ``parse_statement`` expects."""
+        return {
+            column: self.cleaned_data[f"{column}_column"]
+            for column in ("date", "description", "amount", "money_in", "money_out")
+            if self.cleaned_data.get(f"{column}_column")
+        }
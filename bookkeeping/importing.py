@@ -0,0 +1,488 @@
+# bookkeeping/importing.py
+"""
+Bank statement import: parse, categorise, de-duplicate and bulk insert.
+
+A statement is read line by line from the uploaded file, as CSV (columns
+found from the header row, or named explicitly) or OFX/QFX. Money in becomes
+Income and money out becomes an Expense. Each line gets the category last
+used for the same description, else a category whose name appears in the
+description, else the fallback chosen for the import.
+
+Lines already in the ledger are skipped. Existing rows in the statement's
+date range are read with one query per model and counted by (date, amount,
+description), so re-importing an overlapping statement creates nothing new
+while genuinely repeated payments on the same day are kept. New rows have
+their tax periods assigned in memory and are inserted with chunked
+``bulk_create`` calls in one transaction, followed by one
+``transactions_created`` call per model to update PeriodTotal.
+"""
+
+import csv
+import io
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.db import transaction
+
+from bookkeeping.categories import get_category_registry
+from bookkeeping.models import Expense, Income
+from bookkeeping.signals import transactions_created
+from bookkeeping.utils import chunked
+
+# Transactions inserted per bulk_create call
+IMPORT_CHUNK_SIZE = 2000
+
+# Rows searched for the CSV header, past any preamble the bank adds
+HEADER_SEARCH_ROWS = 20
+
+# Upload extensions accepted; OFX and QFX are parsed the same way
+STATEMENT_EXTENSIONS = ("csv", "ofx", "qfx")
+
+# Line errors kept for display; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+DESCRIPTION_MAX_LENGTH = Income._meta.get_field("description").max_length
+
+# Amounts must fit the amount columns (max_digits=10, decimal_places=2)
+_AMOUNT_FIELD = Income._meta.get_field("amount")
+MAX_AMOUNT = Decimal(10) ** (_AMOUNT_FIELD.max_digits - _AMOUNT_FIELD.decimal_places)
+
+# Header names recognised for each column, compared case-insensitively
+COLUMN_ALIASES = {
+    "date": (
+        "date",
+        "transaction date",
+        "posted date",
+        "posting date",
+        "completed date",
+        "value date",
+    ),
+    "description": (
+        "description",
+        "transaction description",
+        "details",
+        "narrative",
+        "memo",
+        "payee",
+        "name",
+        "reference",
+    ),
+    "amount": ("amount", "value", "transaction amount", "amount (gbp)"),
+    "money_in": ("paid in", "money in", "credit", "credit amount", "in"),
+    "money_out": ("paid out", "money out", "debit", "debit amount", "out"),
+}
+
+# UK banks write the day first; two-digit years are tried last
+DATE_FORMATS = (
+    "%d/%m/%Y",
+    "%Y-%m-%d",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d %b %Y",
+    "%d-%b-%Y",
+    "%d %B %Y",
+    "%d/%m/%y",
+)
+
+NOT_AMOUNT_CHARS = re.compile(r"[^0-9.\-()]")
+NOT_WORD_CHARS = re.compile(r"[^a-z]+")
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+
+class StatementError(ValueError):
+    """The statement as a whole cannot be read, e.g. it has no date column."""
+
+
+class StatementLine(NamedTuple):
+    line: int
+    date: date
+    description: str
+    # Positive for money in, negative for money out
+    amount: Decimal
+
+
+class LineError(NamedTuple):
+    line: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    income: int = 0
+    expenses: int = 0
+    duplicates: int = 0
+    # Lines that fell back to the import's default categories
+    uncategorised: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def created(self):
+        return self.income + self.expenses
+
+    def add_error(self, error):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+
+# ===========================================
+# PARSING
+# ===========================================
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    """Parse a statement date; ``ValueError`` if no known format matches."""
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}")
+
+
+def parse_amount(value):
+    """
+    Parse an amount such as "£1,234.50", "-12.00" or "(12.00)".
+
+    Returns ``None`` for an empty cell; ``ValueError`` if it is not a number
+    or is too large to store.
+    """
+    cleaned = NOT_AMOUNT_CHARS.sub("", value)
+    if not cleaned:
+        return None
+
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    try:
+        amount = Decimal(cleaned.strip("()"))
+    except InvalidOperation:
+        raise ValueError(f"Unrecognised amount {value!r}")
+
+    # Rounding can carry past the limit, so check afterwards; anything far
+    # larger is rejected without rounding it at all
+    if abs(amount) < MAX_AMOUNT:
+        amount = amount.quantize(Decimal("0.01"))
+    amount = check_amount(amount, value)
+    return -amount if negative else amount
+
+
+def check_amount(amount, value):
+    """Return ``amount``, or raise ``ValueError`` if it does not fit the ledger."""
+    if abs(amount) >= MAX_AMOUNT:
+        raise ValueError(f"Amount {value!r} is too large")
+    return amount
+
+
+def clean_description(value):
+    return " ".join(value.split())[:DESCRIPTION_MAX_LENGTH]
+
+
+@dataclass(frozen=True)
+class ColumnMapping:
+    """Column indexes for a CSV statement; ``None`` when absent."""
+
+    date: int
+    description: int
+    amount: int = None
+    money_in: int = None
+    money_out: int = None
+
+    @classmethod
+    def detect(cls, header, names=None):
+        """
+        Map a header row to columns, or return ``None`` if it is not one.
+
+        ``names`` overrides the header name looked for per column, e.g.
+        ``{"date": "Posting Date"}`` or ``{"money_in": "Credits"}``.
+        """
+        positions = {name.strip().lower(): index for index, name in enumerate(header)}
+        found = {}
+
+        names = names or {}
+        # Naming separate money in/out columns means any "Amount" column
+        # (often a running balance) is not the one to use
+        columns = COLUMN_ALIASES
+        split_named = names.get("money_in") or names.get("money_out")
+        if split_named and not names.get("amount"):
+            columns = {
+                column: aliases
+                for column, aliases in COLUMN_ALIASES.items()
+                if column != "amount"
+            }
+
+        for column, aliases in columns.items():
+            wanted = names.get(column)
+            candidates = (wanted.strip().lower(),) if wanted else aliases
+            for alias in candidates:
+                if alias in positions:
+                    found[column] = positions[alias]
+                    break
+
+        has_amount = "amount" in found or "money_in" in found or "money_out" in found
+        if "date" not in found or "description" not in found or not has_amount:
+            return None
+        return cls(**found)
+
+    def amount_of(self, row):
+        if self.amount is not None:
+            return parse_amount(row[self.amount])
+
+        money_in = parse_amount(row[self.money_in]) if self.money_in is not None else None
+        money_out = (
+            parse_amount(row[self.money_out]) if self.money_out is not None else None
+        )
+        if money_in is None and money_out is None:
+            return None
+        amount = (money_in or 0) - abs(money_out or 0)
+        return check_amount(amount, str(amount))
+
+
+def parse_csv(stream, names=None):
+    """
+    Yield a ``StatementLine`` or ``LineError`` per row of a CSV statement.
+
+    Raises ``StatementError`` if no header row with date, description and
+    amount columns is found, or if the file is not valid CSV.
+    """
+    reader = csv.reader(stream)
+    rows = _csv_rows(reader)
+    mapping = None
+
+    for row in rows:
+        mapping = ColumnMapping.detect(row, names)
+        if mapping is not None or reader.line_num >= HEADER_SEARCH_ROWS:
+            break
+
+    if mapping is None:
+        raise StatementError(
+            "Could not find the date, description and amount columns. "
+            "Check the file is a CSV statement, or name the columns."
+        )
+
+    for row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+
+        try:
+            amount = mapping.amount_of(row)
+            if not amount:
+                continue
+            yield StatementLine(
+                reader.line_num,
+                parse_date(row[mapping.date]),
+                clean_description(row[mapping.description]),
+                amount,
+            )
+        except (ValueError, IndexError) as e:
+            yield LineError(reader.line_num, str(e) or "Missing columns")
+
+
+def _csv_rows(reader):
+    """Iterate ``reader``, turning malformed CSV into a ``StatementError``."""
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise StatementError(f"Line {reader.line_num} is not valid CSV: {e}")
+
+
+def parse_ofx(stream):
+    """
+    Yield a ``StatementLine`` or ``LineError`` per ``<STMTTRN>`` in an OFX
+    or QFX statement. Handles both SGML (OFX 1.x) and XML (OFX 2.x).
+    """
+    current = None
+    start = 0
+
+    for line_no, text in enumerate(stream, start=1):
+        for closing, tag, value in OFX_TAG.findall(text):
+            tag = tag.upper()
+
+            if tag == "STMTTRN":
+                if not closing:
+                    current, start = {}, line_no
+                elif current is not None:
+                    yield _ofx_line(start, current)
+                    current = None
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def _ofx_line(line_no, fields):
+    try:
+        posted = fields["DTPOSTED"]
+        day = date(int(posted[:4]), int(posted[4:6]), int(posted[6:8]))
+        amount = parse_amount(fields["TRNAMT"])
+    except (KeyError, ValueError) as e:
+        return LineError(line_no, f"Incomplete transaction: {e}")
+
+    parts = []
+    for key in ("NAME", "MEMO"):
+        if fields.get(key) and fields[key] not in parts:
+            parts.append(fields[key])
+
+    return StatementLine(line_no, day, clean_description(" ".join(parts)), amount)
+
+
+def parse_statement(uploaded, names=None):
+    """
+    Parse an uploaded statement file by its extension: .ofx/.qfx, else CSV.
+
+    The file is decoded and read line by line, never held in memory whole.
+    """
+    stream = io.TextIOWrapper(
+        uploaded, encoding="utf-8-sig", errors="replace", newline=""
+    )
+    if uploaded.name.lower().endswith((".ofx", ".qfx")):
+        return parse_ofx(stream)
+    return parse_csv(stream, names)
+
+
+# ===========================================
+# CATEGORISING
+# ===========================================
+
+
+def normalise(description):
+    """Lower-case words only, so "TESCO 1234 LONDON" matches "Tesco London"."""
+    return " ".join(NOT_WORD_CHARS.sub(" ", description.lower()).split())
+
+
+class Categoriser:
+    """
+    Choose categories for imported lines.
+
+    The user's history is read once: the category most recently used for
+    each normalised description, per kind. Active category names are then
+    matched as whole phrases in the description, before falling back.
+    """
+
+    def __init__(self, user, income_category, expense_category):
+        self.fallbacks = {"income": income_category.pk, "expense": expense_category.pk}
+        self.history = {"income": {}, "expense": {}}
+
+        for kind, model in (("income", Income), ("expense", Expense)):
+            rows = (
+                model.objects.filter(user=user)
+                .order_by("date", "pk")
+                .values_list("description", "category_id")
+                .iterator(chunk_size=IMPORT_CHUNK_SIZE)
+            )
+            history = self.history[kind]
+            for description, category_id in rows:
+                history[normalise(description)] = category_id
+
+        registry = get_category_registry()
+        self.keywords = {
+            kind: [
+                (f" {normalise(category.name)} ", category.pk)
+                for category in registry.of_type(kind, active_only=True)
+                if normalise(category.name)
+            ]
+            for kind in ("income", "expense")
+        }
+
+    def categorise(self, kind, description):
+        """Return ``(category_id, matched)`` for a line's description."""
+        key = normalise(description)
+
+        category_id = self.history[kind].get(key)
+        if category_id is not None:
+            return category_id, True
+
+        padded = f" {key} "
+        for phrase, category_id in self.keywords[kind]:
+            if phrase in padded:
+                # Later lines with the same description skip the scan
+                self.history[kind][key] = category_id
+                return category_id, True
+
+        return self.fallbacks[kind], False
+
+
+# ===========================================
+# IMPORTING
+# ===========================================
+
+
+def _existing_lines(user, first, last):
+    """Count the user's transactions between two dates by dedupe key."""
+    existing = Counter()
+    for kind, model in (("income", Income), ("expense", Expense)):
+        rows = (
+            model.objects.filter(user=user, date__gte=first, date__lte=last)
+            .values_list("date", "amount", "description")
+            .iterator(chunk_size=IMPORT_CHUNK_SIZE)
+        )
+        existing.update((kind, *row) for row in rows)
+    return existing
+
+
+def import_statement(user, lines, income_category, expense_category):
+    """
+    Import parsed statement ``lines`` into ``user``'s ledger.
+
+    ``income_category`` and ``expense_category`` are used for lines that
+    cannot be categorised otherwise. Returns an ``ImportResult``.
+    """
+    result = ImportResult()
+    statement = []
+
+    for line in lines:
+        if isinstance(line, LineError):
+            result.add_error(line)
+        else:
+            statement.append(line)
+
+    if not statement:
+        return result
+
+    existing = _existing_lines(
+        user,
+        min(line.date for line in statement),
+        max(line.date for line in statement),
+    )
+    categoriser = Categoriser(user, income_category, expense_category)
+    created = {Income: [], Expense: []}
+
+    for line in statement:
+        kind, model = ("income", Income) if line.amount > 0 else ("expense", Expense)
+        amount = abs(line.amount)
+
+        key = (kind, line.date, amount, line.description)
+        if existing[key]:
+            existing[key] -= 1
+            result.duplicates += 1
+            continue
+
+        category_id, matched = categoriser.categorise(kind, line.description)
+        if not matched:
+            result.uncategorised += 1
+
+        obj = model(
+            user=user,
+            date=line.date,
+            description=line.description,
+            amount=amount,
+            category_id=category_id,
+        )
+        # bulk_create skips save(), so set the periods up front
+        obj.assign_periods()
+        created[model].append(obj)
+
+    with transaction.atomic():
+        for model, objs in created.items():
+            for chunk in chunked(objs, IMPORT_CHUNK_SIZE):
+                model.objects.bulk_create(chunk)
+            if objs:
+                transactions_created(model, objs)
+
+    result.income = len(created[Income])
+    result.expenses = len(created[Expense])
+    return result
@@ -0,0 +1,121 @@
+# bookkeeping/ledger.py
+"""
+Ledger versions, and the report caching and conditional GETs built on them.
+
+Every Income/Expense write bumps the user's ``LedgerState`` version (see
+signals.py). Report and export responses carry an ETag and Last-Modified
+derived from it, so a repeat download of an unchanged report is answered
+with 304 Not Modified. Rendered report bodies are also cached under a key
+that includes the version, so a browser without a cached copy still gets the
+report without it being rebuilt. A write changes the version, so stale
+entries are never served and simply expire.
+
+Only views whose output is fully determined by that key use these. The print
+views show profile details and a generation time, and the yearly profit
+report a generation time, so they are not cached.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from bookkeeping.categories import category_version
+from bookkeeping.models import LedgerState
+from bookkeeping.utils import get_current_tax_year
+
+
+def bump_ledger_versions(user_ids):
+    """
+    Mark the ledgers of ``user_ids`` as changed.
+
+    Only existing rows are bumped. A user's row is created the first time
+    one of their reports is requested, so there is nothing to invalidate
+    before then; and a cascade delete of a user never re-creates it.
+    """
+    if user_ids:
+        LedgerState.objects.filter(user_id__in=user_ids).update(
+            version=F("version") + 1, updated_at=timezone.now()
+        )
+
+
+def get_ledger_state(request):
+    """The requesting user's ledger state, read once per request."""
+    if not hasattr(request, "_ledger_state"):
+        request._ledger_state, _ = LedgerState.objects.get_or_create(
+            user=request.user, defaults={"updated_at": timezone.now()}
+        )
+    return request._ledger_state
+
+
+def _response_key(request):
+    """
+    Everything a report response depends on: user, ledger and category
+    versions, the tax year in effect and the URL.
+
+    With no tax year selected, reports use the current one, so the key
+    changes when the tax year rolls over.
+    """
+    state = get_ledger_state(request)
+    parts = [
+        request.user.pk,
+        state.version,
+        category_version(),
+        request.session.get("selected_tax_year") or get_current_tax_year(),
+        request.get_full_path(),
+    ]
+    return hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def ledger_etag(request, *args, **kwargs):
+    return _response_key(request)
+
+
+def ledger_last_modified(request, *args, **kwargs):
+    return get_ledger_state(request).updated_at
+
+
+# ETag/Last-Modified headers and 304 responses for ledger-derived views;
+# apply below @login_required
+ledger_condition = condition(
+    etag_func=ledger_etag, last_modified_func=ledger_last_modified
+)
+
+
+def cached_report(view):
+    """
+    Cache a report view's rendered body per user, ledger version and URL.
+
+    Only complete, non-streaming 200 responses are stored.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = f"bookkeeping:report:{view.__name__}:{_response_key(request)}"
+
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+        response = view(request, *args, **kwargs)
+
+        if response.status_code == 200 and not response.streaming:
+            headers = {
+                header: response[header]
+                for header in ("Content-Type", "Content-Disposition")
+                if response.has_header(header)
+            }
+            cache.set(key, (response.content, headers), settings.REPORT_CACHE_TIMEOUT)
+
+        return response
+
+    return wrapper
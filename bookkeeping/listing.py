@@ -0,0 +1,69 @@
+# bookkeeping/listing.py
+"""
+Summary figures for the income and expense list screens.
+
+Totals, the result count and the quarter filter options all come from one
+grouped query over the filtered queryset, instead of an aggregate, a count
+and a ``distinct`` query each scanning the same rows.
+
+Quarter filtering and grouping use the integer ``tax_year``/``quarter_no``
+columns, which the (user, tax_year, quarter_no, date) index covers.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from bookkeeping.periods import Quarter, quarter
+
+ZERO = Decimal("0.00")
+
+
+@dataclass
+class ListSummary:
+    total: Decimal = ZERO
+    vat_total: Decimal = ZERO
+    count: int = 0
+    # Rows per quarter, newest quarter first
+    quarter_counts: dict = field(default_factory=dict)
+
+    @property
+    def quarters(self):
+        return list(self.quarter_counts)
+
+
+def summarise_list(queryset, vat=False):
+    """
+    Total, count and per-quarter facets for a filtered Income/Expense queryset.
+
+    Pass ``vat=True`` for expenses to total ``vat_amount`` as well.
+    """
+    extra = {"vat": Sum("vat_amount")} if vat else {}
+    rows = (
+        queryset.order_by()
+        .values("tax_year", "quarter_no")
+        .annotate(amount_sum=Sum("amount"), entries=Count("id"), **extra)
+    )
+
+    summary = ListSummary()
+    newest_first = sorted(
+        rows, key=lambda row: (row["tax_year"], row["quarter_no"]), reverse=True
+    )
+    for row in newest_first:
+        summary.total += row["amount_sum"] or ZERO
+        summary.vat_total += row.get("vat") or ZERO
+        summary.count += row["entries"]
+        code = quarter(row["tax_year"], row["quarter_no"]).code
+        summary.quarter_counts[code] = row["entries"]
+
+    return summary
+
+
+def filter_quarter(queryset, code):
+    """Limit a queryset to one quarter code such as "2024-Q3"."""
+    try:
+        selected = Quarter.from_code(code)
+    except ValueError:
+        return queryset.none()
+    return queryset.filter(tax_year=selected.tax_year, quarter_no=selected.number)
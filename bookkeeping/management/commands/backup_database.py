@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from bookkeeping.backups import get_backup_dir, run_daily_backup
+
+
+class Command(BaseCommand):
+    help = "Back up the SQLite database into the compressed backup store."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Replace today's backup if it already exists",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Backing up database to {get_backup_dir()}...")
+
+        manifest = run_daily_backup(force=options["force"])
+
+        if manifest:
+            self.stdout.write(self.style.SUCCESS(f"✓ Complete! Wrote {manifest}"))
+        else:
+            self.stdout.write("No backup written.")
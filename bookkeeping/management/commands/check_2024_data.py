@@ -3,7 +3,11 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from bookkeeping.models import Income, Expense
-from bookkeeping.utils import get_tax_year_from_date, get_available_tax_years
+from bookkeeping.utils import (
+    get_available_tax_years,
+    get_tax_year_bounds,
+    get_tax_year_from_date,
+)
 from datetime import date
 
 User = get_user_model()
@@ -57,9 +61,7 @@ class Command(BaseCommand):
             # Count by tax year
             self.stdout.write("\nIncome by TAX year:")
             for tax_year in ["2023-2024", "2024-2025"]:
-                start_year = int(tax_year.split("-")[0])
-                start = date(start_year, 4, 6)
-                end = date(start_year + 1, 4, 5)
+                start, end = get_tax_year_bounds(tax_year)
                 count = Income.objects.filter(
                     user=user, date__gte=start, date__lte=end
                 ).count()
@@ -101,9 +103,7 @@ class Command(BaseCommand):
             # Count by tax year
             self.stdout.write("\nExpenses by TAX year:")
             for tax_year in ["2023-2024", "2024-2025"]:
-                start_year = int(tax_year.split("-")[0])
-                start = date(start_year, 4, 6)
-                end = date(start_year + 1, 4, 5)
+                start, end = get_tax_year_bounds(tax_year)
                 count = Expense.objects.filter(
                     user=user, date__gte=start, date__lte=end
                 ).count()
@@ -0,0 +1,63 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookkeeping.categories import import_categories
+from bookkeeping.models import Category
+
+CATEGORY_TYPES = ("income", "expense")
+
+
+class Command(BaseCommand):
+    help = (
+        "Import categories from a CSV file with 'name' and 'category_type' "
+        "columns. Existing categories are left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file", help="Path to the CSV file")
+        parser.add_argument(
+            "--type",
+            choices=CATEGORY_TYPES,
+            help="Category type for rows without a category_type column",
+        )
+
+    def handle(self, *args, **options):
+        default_type = options.get("type")
+        rows = []
+
+        try:
+            with open(options["csv_file"], newline="", encoding="utf-8-sig") as f:
+                for line, row in enumerate(csv.DictReader(f), start=2):
+                    name = (row.get("name") or "").strip()
+                    category_type = (
+                        (row.get("category_type") or default_type or "").strip().lower()
+                    )
+
+                    if not name:
+                        continue
+                    if category_type not in CATEGORY_TYPES:
+                        raise CommandError(
+                            f"Line {line}: category_type must be 'income' or "
+                            f"'expense', got '{category_type}'."
+                        )
+
+                    rows.append((name, category_type))
+        except OSError as e:
+            raise CommandError(f"Could not read {options['csv_file']}: {e}")
+
+        self.stdout.write(f"Importing {len(rows)} categories...")
+
+        created = import_categories(Category, rows)
+
+        for category in created:
+            self.stdout.write(
+                self.style.SUCCESS(f"  ✓ {category.name} ({category.slug})")
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✓ Complete! Created {len(created)} categories, "
+                f"skipped {len(rows) - len(created)} existing or repeated."
+            )
+        )
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from bookkeeping.categories import get_category_by_slug
+from bookkeeping.importing import StatementError, import_statement, parse_statement
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a bank statement (CSV, OFX or QFX) into a user's income and "
+        "expenses. Lines already recorded are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("statement", help="Path to the statement file")
+        parser.add_argument("--user", required=True, help="Email of the user")
+        parser.add_argument(
+            "--income-category",
+            required=True,
+            help="Slug of the category for money in that cannot be categorised",
+        )
+        parser.add_argument(
+            "--expense-category",
+            required=True,
+            help="Slug of the category for money out that cannot be categorised",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}.")
+
+        fallbacks = []
+        for category_type in ("income", "expense"):
+            slug = options[f"{category_type}_category"]
+            category = get_category_by_slug(slug)
+            if category is None or category.category_type != category_type:
+                raise CommandError(f"No {category_type} category with slug '{slug}'.")
+            fallbacks.append(category)
+
+        self.stdout.write(f"Importing {options['statement']}...")
+
+        try:
+            with open(options["statement"], "rb") as f:
+                result = import_statement(user, parse_statement(f), *fallbacks)
+        except OSError as e:
+            raise CommandError(f"Could not read {options['statement']}: {e}")
+        except StatementError as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stdout.write(
+                self.style.ERROR(f"  ✗ Line {error.line}: {error.message}")
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✓ Complete! Created {result.income} income and "
+                f"{result.expenses} expenses, skipped {result.duplicates} "
+                f"duplicates and {result.skipped} unreadable lines "
+                f"({result.uncategorised} given the default categories)."
+            )
+        )
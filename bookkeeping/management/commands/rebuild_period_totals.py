@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from bookkeeping.signals import ledger_changed
+from bookkeeping.totals import rebuild_period_totals
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the PeriodTotal table from Income and Expense records."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=str,
+            help="Email of specific user to rebuild (optional)",
+        )
+
+    def handle(self, *args, **options):
+        user_email = options.get("user")
+
+        if user_email:
+            try:
+                users = [User.objects.get(email=user_email)]
+            except User.DoesNotExist:
+                self.stdout.write(
+                    self.style.ERROR(f"User with email '{user_email}' not found.")
+                )
+                return
+            self.stdout.write(f"Rebuilding period totals for {user_email}...")
+        else:
+            users = None
+            self.stdout.write("Rebuilding period totals for all users...")
+
+        created = rebuild_period_totals(users)
+
+        # Reports are cached per ledger version; make them pick up the
+        # rebuilt figures
+        if users is None:
+            user_ids = list(User.objects.values_list("pk", flat=True))
+        else:
+            user_ids = [user.pk for user in users]
+        ledger_changed(user_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Complete! Wrote {created} period total rows.")
+        )
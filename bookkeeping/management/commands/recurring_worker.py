@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from bookkeeping.services import process_due_recurring
+
+
+class Command(BaseCommand):
+    help = (
+        "Long-running worker that creates due recurring entries ahead of time, "
+        "so the dashboard never has to catch up inline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=900,
+            help="Seconds to wait between passes (default: 900)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single pass and exit",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        self.stdout.write(
+            f"Recurring worker started (interval {interval}s). Press Ctrl+C to stop."
+        )
+
+        try:
+            while True:
+                close_old_connections()
+                self.run_pass()
+
+                if options["once"]:
+                    break
+
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            self.stdout.write("\nRecurring worker stopped.")
+
+    def run_pass(self):
+        processed = process_due_recurring()
+
+        for user, results in processed:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  ✓ {user.email}: created {len(results)} recurring entries"
+                )
+            )
+
+        if processed:
+            total = sum(len(results) for _, results in processed)
+            self.stdout.write(
+                f"Processed {len(processed)} users, {total} entries created."
+            )
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from bookkeeping.models import ReportJob
+from bookkeeping.report_jobs import (
+    delete_expired_jobs,
+    requeue_stale_jobs,
+    run_pending_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Long-running worker that renders queued report jobs to files, so "
+        "large exports never tie up a web worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=5,
+            help="Seconds to wait between polls of the queue (default: 5)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run every queued job once and exit",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        self.stdout.write(
+            f"Report worker started (interval {interval}s). Press Ctrl+C to stop."
+        )
+
+        try:
+            while True:
+                close_old_connections()
+                self.run_pass()
+
+                if options["once"]:
+                    break
+
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            self.stdout.write("\nReport worker stopped.")
+
+    def run_pass(self):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} abandoned jobs.")
+
+        for job in run_pending_jobs():
+            if job.status == ReportJob.STATUS_DONE:
+                self.stdout.write(
+                    self.style.SUCCESS(f"  ✓ {job.user.email}: {job.filename}")
+                )
+            else:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"  ✗ {job.user.email}: {job.filename} failed: {job.error}"
+                    )
+                )
+
+        deleted = delete_expired_jobs()
+        if deleted:
+            self.stdout.write(f"Deleted {deleted} expired reports.")
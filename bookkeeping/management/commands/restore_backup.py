@@ -0,0 +1,78 @@
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookkeeping.backups import (
+    get_backup_dir,
+    list_backups,
+    manifest_path_for,
+    restore_snapshot,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the database as it was on a given day from the backup store. "
+        "The restored copy is written to a separate file; stop the app and "
+        "move it over db.sqlite3 to put it live."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "date",
+            nargs="?",
+            default="latest",
+            help="Day to restore (YYYY-MM-DD) or 'latest' (default)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Where to write the restored database "
+            "(default: backups/restored-db-YYYY-MM-DD.sqlite3)",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List the days that can be restored",
+        )
+
+    def handle(self, *args, **options):
+        backup_dir = get_backup_dir()
+        days = list_backups(backup_dir)
+
+        if options["list"]:
+            for day in days:
+                self.stdout.write(day.isoformat())
+            if not days:
+                self.stdout.write("No backups found.")
+            return
+
+        if not days:
+            raise CommandError(f"No backups found in {backup_dir}.")
+
+        if options["date"] == "latest":
+            day = days[-1]
+        else:
+            try:
+                day = datetime.strptime(options["date"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Date must be in YYYY-MM-DD format or 'latest'.")
+            if day not in days:
+                raise CommandError(f"No backup exists for {day.isoformat()}.")
+
+        output = Path(
+            options.get("output")
+            or backup_dir / f"restored-db-{day.isoformat()}.sqlite3"
+        )
+        if output.exists():
+            raise CommandError(f"{output} already exists; choose another --output.")
+
+        self.stdout.write(f"Restoring backup from {day.isoformat()}...")
+
+        try:
+            restore_snapshot(manifest_path_for(day, backup_dir), output)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Restore failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Complete! Restored to {output}"))
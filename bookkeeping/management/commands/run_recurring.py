@@ -1,9 +1,51 @@
-from django.core.management.base import BaseCommand
+import multiprocessing
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
-from bookkeeping.services import run_recurring_for_user
+from django.db import OperationalError, connections
+from django.utils import timezone
+from bookkeeping.services import run_recurring_for_user, users_with_due_recurring
 
 User = get_user_model()
 
+# SQLite allows one writer at a time, so a worker that loses the race for
+# the write lock retries the user rather than failing the whole run
+LOCK_RETRIES = 5
+
+
+def _init_worker():
+    """Give each worker process its own database connections."""
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+def _process_users(user_ids, today, since=None):
+    """
+    Run recurring entries for a chunk of users inside a worker process.
+
+    Returns a list of (email, results) tuples.
+    """
+    processed = []
+
+    for user in User.objects.filter(pk__in=user_ids).order_by("pk"):
+        for attempt in range(LOCK_RETRIES):
+            try:
+                results = run_recurring_for_user(user, today, since)
+                break
+            except OperationalError:
+                if attempt == LOCK_RETRIES - 1:
+                    raise
+                time.sleep(0.2 * (attempt + 1))
+
+        processed.append((user.email, results))
+
+    connections.close_all()
+    return processed
+
 
 class Command(BaseCommand):
     help = "Process recurring entries for all users (or a specific user) and catch up on missed entries."
@@ -14,14 +56,45 @@ class Command(BaseCommand):
             type=str,
             help="Email of specific user to process (optional)",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes to spread users across (default: 1)",
+        )
+        parser.add_argument(
+            "--since",
+            type=str,
+            help=(
+                "Incremental mode: only process entries whose next run falls "
+                "between this date (YYYY-MM-DD) and today. Every due "
+                "occurrence of those entries is created; entries overdue from "
+                "before this date wait for a full run"
+            ),
+        )
+        parser.add_argument(
+            "--summary",
+            action="store_true",
+            help="Only print totals, not every created entry",
+        )
 
     def handle(self, *args, **options):
         user_email = options.get("user")
+        workers = max(1, options["workers"])
+        summary_only = options["summary"]
+        today = timezone.localdate()
+
+        since = None
+        if options.get("since"):
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
 
         if user_email:
             try:
                 user = User.objects.get(email=user_email)
-                users = [user]
+                user_ids = [user.pk]
                 self.stdout.write(f"Processing recurring entries for {user.email}...")
             except User.DoesNotExist:
                 self.stdout.write(
@@ -29,27 +102,58 @@ class Command(BaseCommand):
                 )
                 return
         else:
-            users = User.objects.all()
+            if since:
+                users = users_with_due_recurring(today, since)
+            else:
+                users = User.objects.order_by("pk")
+
+            user_ids = list(users.values_list("pk", flat=True))
             self.stdout.write(
-                f"Processing recurring entries for all {users.count()} users..."
+                f"Processing recurring entries for {len(user_ids)} users "
+                f"with {workers} worker(s)..."
             )
 
+        if workers > 1 and len(user_ids) > 1:
+            processed = self.run_parallel(user_ids, workers, today, since)
+        else:
+            processed = _process_users(user_ids, today, since)
+
         total_processed = 0
 
-        for user in users:
-            self.stdout.write(f"\n--- Processing user: {user.email} ---")
+        for email, results in processed:
+            total_processed += len(results)
+
+            if summary_only:
+                continue
 
-            results = run_recurring_for_user(user)
+            self.stdout.write(f"\n--- Processing user: {email} ---")
 
             if results:
                 for result in results:
                     self.stdout.write(self.style.SUCCESS(f"  ✓ {result}"))
-                total_processed += len(results)
             else:
                 self.stdout.write("  No recurring entries due for this user.")
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"\n✓ Complete! Processed {total_processed} recurring entries total."
+                f"\n✓ Complete! Processed {total_processed} recurring entries "
+                f"total across {len(processed)} users."
             )
         )
+
+    def run_parallel(self, user_ids, workers, today, since=None):
+        """Partition users across a process pool and merge the results."""
+        workers = min(workers, len(user_ids))
+        chunks = [user_ids[index::workers] for index in range(workers)]
+
+        # Never share the parent's connections with forked children
+        connections.close_all()
+
+        with multiprocessing.get_context().Pool(
+            processes=workers, initializer=_init_worker
+        ) as pool:
+            chunk_results = pool.starmap(
+                _process_users, [(chunk, today, since) for chunk in chunks]
+            )
+
+        return [item for chunk in chunk_results for item in chunk]
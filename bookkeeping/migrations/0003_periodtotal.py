@@ -0,0 +1,73 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_period_totals(apps, schema_editor):
+    PeriodTotal = apps.get_model("bookkeeping", "PeriodTotal")
+
+    for model_name, kind in (("Income", "income"), ("Expense", "expense")):
+        model = apps.get_model("bookkeeping", model_name)
+        extra = {"vat_sum": Sum("vat_amount")} if kind == "expense" else {}
+        rows = (
+            model.objects.annotate(period_month=TruncMonth("date"))
+            .values("user_id", "quarter", "period_month", "category_id")
+            .annotate(amount_sum=Sum("amount"), entries=Count("id"), **extra)
+            .order_by()
+        )
+
+        objs = []
+        for row in rows:
+            start_year = int(row["quarter"].split("-")[0])
+            objs.append(
+                PeriodTotal(
+                    user_id=row["user_id"],
+                    kind=kind,
+                    tax_year=f"{start_year}-{start_year + 1}",
+                    quarter=row["quarter"],
+                    month=row["period_month"],
+                    category_id=row["category_id"],
+                    amount_total=row["amount_sum"] or 0,
+                    vat_total=row.get("vat_sum") or 0,
+                    entry_count=row["entries"],
+                )
+            )
+        PeriodTotal.objects.bulk_create(objs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0002_alter_expense_receipt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('tax_year', models.CharField(max_length=9)),
+                ('quarter', models.CharField(max_length=10)),
+                ('month', models.DateField()),
+                ('amount_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('vat_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookkeeping.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Period Total',
+                'verbose_name_plural': 'Period Totals',
+                'indexes': [models.Index(fields=['user', 'kind', 'tax_year'], name='bookkeeping_user_id_761207_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'tax_year', 'quarter', 'month', 'category'), name='unique_period_total')],
+            },
+        ),
+        migrations.RunPython(backfill_period_totals, migrations.RunPython.noop),
+    ]
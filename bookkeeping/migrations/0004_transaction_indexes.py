@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0003_periodtotal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date', 'amount', 'vat_amount'], name='bookkeeping_user_id_4519ab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'quarter', 'date'], name='bookkeeping_user_id_06ab87_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'category', 'date'], name='bookkeeping_user_id_27eccb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'date', 'amount'], name='bookkeeping_user_id_41a7fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'quarter', 'date'], name='bookkeeping_user_id_e4dffa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'category', 'date'], name='bookkeeping_user_id_8f883f_idx'),
+        ),
+    ]
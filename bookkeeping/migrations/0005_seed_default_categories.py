@@ -0,0 +1,75 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+# Frozen copy of the default catalogue as it stood when this migration was
+# written; later changes to bookkeeping.categories must not change it
+DEFAULT_EXPENSE_CATEGORIES = [
+    "Advertising & Marketing",
+    "Bank Charges",
+    "Car/Vehicle Expenses",
+    "Cost of Goods Sold",
+    "Insurance",
+    "Interest & Finance Charges",
+    "Legal & Professional Fees",
+    "Office Costs",
+    "Other Business Expenses",
+    "Premises Running Costs",
+    "Repairs & Maintenance",
+    "Staff Costs",
+    "Subcontractor Costs",
+    "Telephone, Mobile & Internet",
+    "Travel & Subsistence",
+    "Utilities",
+    "Capital Allowances",
+    "Computers & Laptops",
+    "Tools & Equipment",
+    "Plant & Machinery",
+]
+
+DEFAULT_INCOME_CATEGORIES = [
+    "Turnover - Sales",
+    "Other Business Income",
+    "Bank Interest",
+]
+
+
+def seed_categories(apps, schema_editor):
+    """Insert any default categories that are missing, with one bulk_create."""
+    Category = apps.get_model("bookkeeping", "Category")
+
+    existing = list(Category.objects.values_list("name", "category_type", "slug"))
+    present = {(name, category_type) for name, category_type, _ in existing}
+    taken = {slug for _, _, slug in existing if slug}
+
+    missing = []
+    for category_type, names in (
+        ("expense", DEFAULT_EXPENSE_CATEGORIES),
+        ("income", DEFAULT_INCOME_CATEGORIES),
+    ):
+        for name in names:
+            if (name, category_type) in present:
+                continue
+
+            # Same scheme as Category.save(): base slug, then -1, -2, ...
+            base_slug = slugify(name)
+            slug = base_slug
+            counter = 1
+            while slug in taken:
+                slug = f"{base_slug}-{counter}"
+                counter += 1
+            taken.add(slug)
+
+            missing.append(Category(name=name, category_type=category_type, slug=slug))
+
+    Category.objects.bulk_create(missing)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookkeeping", "0004_transaction_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_categories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,144 @@
+"""
+FTS5 full-text indexes over Income and Expense text fields (SQLite only).
+
+Each table gets an external-content FTS5 table kept in step by triggers, so
+every write path, including bulk_create and raw SQL, updates the index. On
+other databases, or SQLite builds without FTS5, nothing is created and
+search falls back to icontains.
+
+The unmanaged IncomeSearchEntry/ExpenseSearchEntry models map these tables
+so searches can join them through the ORM.
+"""
+
+import bookkeeping.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEARCH_TABLES = {
+    "bookkeeping_income": ["description", "client_name", "invoice_number"],
+    "bookkeeping_expense": ["description", "supplier_name"],
+}
+
+
+def fts5_available(connection):
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        except Exception:
+            return False
+        cursor.execute("DROP TABLE temp.fts5_probe")
+    return True
+
+
+def create_search_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite" or not fts5_available(connection):
+        return
+
+    for table, fields in SEARCH_TABLES.items():
+        fts = f"{table}_fts"
+        columns = ", ".join(fields)
+        new_values = ", ".join(f"new.{field}" for field in fields)
+        old_values = ", ".join(f"old.{field}" for field in fields)
+
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+            f"content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); "
+            f"END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); "
+            f"END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {columns} ON {table} "
+            f"BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); "
+            f"END"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for table in SEARCH_TABLES:
+        fts = f"{table}_fts"
+        for trigger in ("insert", "delete", "update"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookkeeping", "0005_seed_default_categories"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+        migrations.CreateModel(
+            name="ExpenseSearchEntry",
+            fields=[
+                (
+                    "expense",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="bookkeeping.expense",
+                    ),
+                ),
+                (
+                    "document",
+                    bookkeeping.models.SearchDocumentField(
+                        db_column="bookkeeping_expense_fts"
+                    ),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "bookkeeping_expense_fts",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="IncomeSearchEntry",
+            fields=[
+                (
+                    "income",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="bookkeeping.income",
+                    ),
+                ),
+                (
+                    "document",
+                    bookkeeping.models.SearchDocumentField(
+                        db_column="bookkeeping_income_fts"
+                    ),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "bookkeeping_income_fts",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 2000
+
+# Frozen copy of the period rules as they stood when this migration was
+# written: the tax year starts on 6 April and quarters start on 6 April,
+# 6 July, 6 October and 6 January.
+QUARTER_STARTS = ((4, 6), (7, 6), (10, 6), (1, 6))
+
+
+def tax_period_for_date(value):
+    """Return ``(tax_year, quarter_no)`` for a date."""
+    tax_year = value.year if (value.month, value.day) >= (4, 6) else value.year - 1
+    quarter_no = 1
+    for number, (month, day) in enumerate(QUARTER_STARTS, start=1):
+        start_year = tax_year + 1 if month < 4 else tax_year
+        if (value.year, value.month, value.day) >= (start_year, month, day):
+            quarter_no = number
+    return tax_year, quarter_no
+
+
+def backfill_periods(apps, schema_editor):
+    """Fill tax_year and quarter_no for existing rows in pk-ordered batches."""
+    for model_name in ("Income", "Expense"):
+        model = apps.get_model("bookkeeping", model_name)
+        last_pk = 0
+
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "date")[:BACKFILL_BATCH_SIZE]
+            )
+            if not batch:
+                break
+
+            for obj in batch:
+                obj.tax_year, obj.quarter_no = tax_period_for_date(obj.date)
+
+            model.objects.bulk_update(
+                batch, ["tax_year", "quarter_no"], batch_size=500
+            )
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0006_transaction_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='quarter_no',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='tax_year',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='quarter_no',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='tax_year',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'tax_year', 'quarter_no'], name='bookkeeping_user_id_a72127_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'tax_year', 'quarter_no'], name='bookkeeping_user_id_888ca9_idx'),
+        ),
+        migrations.RunPython(backfill_periods, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0009_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='format',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+    ]
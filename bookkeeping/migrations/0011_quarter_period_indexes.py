@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0010_reportjob_format'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='bookkeeping_user_id_06ab87_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='bookkeeping_user_id_a72127_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='bookkeeping_user_id_e4dffa_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='bookkeeping_user_id_888ca9_idx',
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'tax_year', 'quarter_no', 'date'], name='bookkeeping_user_id_8f1421_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'tax_year', 'quarter_no', 'date'], name='bookkeeping_user_id_a9740f_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:55
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_heartbeats(apps, schema_editor):
+    """Running jobs last showed signs of life when they started."""
+    ReportJob = apps.get_model("bookkeeping", "ReportJob")
+    ReportJob.objects.filter(status="running").update(heartbeat_at=F("started_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookkeeping', '0011_quarter_period_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_heartbeats, migrations.RunPython.noop),
+    ]
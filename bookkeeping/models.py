@@ -1,10 +1,13 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from datetime import datetime
 from datetime import date
-from django.utils.text import slugify
+from bookkeeping.categories import allocate_slug
+from bookkeeping.periods import Quarter
 
 User = get_user_model()
 
@@ -16,18 +19,27 @@ class Category(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     slug = models.SlugField(blank=True, null=True)
 
-    def save(self, *args, **kwargs):
-        base_slug = slugify(self.name)
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_read_only"):
+            raise AttributeError(
+                f"Category {self.pk} is shared by the category registry and "
+                "read-only; fetch it from the database to change it."
+            )
+        super().__setattr__(name, value)
 
-        if not self.slug:
-            slug = base_slug
-            counter = 1
+    def freeze(self):
+        """Make this instance read-only, as the category registry shares it."""
+        self.__dict__["_read_only"] = True
 
-            while Category.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
+    def save(self, *args, **kwargs):
+        if self.__dict__.get("_read_only"):
+            raise AttributeError(
+                f"Category {self.pk} is shared by the category registry and "
+                "read-only; fetch it from the database to change it."
+            )
 
-            self.slug = slug
+        if not self.slug:
+            self.slug = allocate_slug(Category, self.name)
 
         super().save(*args, **kwargs)
 
@@ -49,6 +61,10 @@ class Income(models.Model):
     invoice_number = models.CharField(max_length=100, blank=True)
 
     quarter = models.CharField(max_length=10, db_index=True, blank=True)
+    # Integer forms of the tax year (2024 for 2024-2025) and quarter (1-4),
+    # set with quarter by assign_periods(); queries filter and group on these
+    tax_year = models.PositiveSmallIntegerField(null=True, editable=False)
+    quarter_no = models.PositiveSmallIntegerField(null=True, editable=False)
     notes = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -56,43 +72,33 @@ class Income(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            # Date-range sums; amount is included so SQLite can answer them
+            # from the index alone
+            models.Index(fields=["user", "date", "amount"]),
+            models.Index(fields=["user", "category", "date"]),
+            # Quarter filters and per-quarter groupings, newest first
+            models.Index(fields=["user", "tax_year", "quarter_no", "date"]),
+        ]
 
     def save(self, *args, **kwargs):
-        self.quarter = self._calculate_quarter()
+        self.assign_periods()
         super().save(*args, **kwargs)
 
-    def _calculate_quarter(self):
+    def assign_periods(self):
+        """
+        Set quarter, tax_year and quarter_no from the date.
+
+        save() does this itself; bulk_create skips save(), so bulk insert
+        paths call it on each object first.
+        """
         date = self.date
         if isinstance(date, str):
             date = datetime.strptime(date, "%Y-%m-%d").date()
 
-        # Tax year handling
-        if date.month > 4 or (date.month == 4 and date.day >= 6):
-            year = date.year
-        else:
-            year = date.year - 1
-
-        # Quarter breakpoints
-        if (
-            (date.month == 4 and date.day >= 6)
-            or date.month in [5, 6]
-            or (date.month == 7 and date.day <= 5)
-        ):
-            return f"{year}-Q1"
-        elif (
-            (date.month == 7 and date.day >= 6)
-            or date.month in [8, 9]
-            or (date.month == 10 and date.day <= 5)
-        ):
-            return f"{year}-Q2"
-        elif (
-            (date.month == 10 and date.day >= 6)
-            or date.month in [11, 12]
-            or (date.month == 1 and date.day <= 5)
-        ):
-            return f"{year}-Q3"
-        else:
-            return f"{year}-Q4"
+        quarter = Quarter.for_date(date)
+        self.tax_year, self.quarter_no = quarter.tax_year, quarter.number
+        self.quarter = quarter.code
 
 
 class Expense(models.Model):
@@ -117,6 +123,10 @@ class Expense(models.Model):
     receipt = models.FileField(upload_to="receipts/%Y/%m/", blank=True, null=True)
 
     quarter = models.CharField(max_length=10, db_index=True, blank=True)
+    # Integer forms of the tax year (2024 for 2024-2025) and quarter (1-4),
+    # set with quarter by assign_periods(); queries filter and group on these
+    tax_year = models.PositiveSmallIntegerField(null=True, editable=False)
+    quarter_no = models.PositiveSmallIntegerField(null=True, editable=False)
     notes = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -124,9 +134,17 @@ class Expense(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            # Date-range sums; amount and VAT are included so SQLite can
+            # answer them from the index alone
+            models.Index(fields=["user", "date", "amount", "vat_amount"]),
+            models.Index(fields=["user", "category", "date"]),
+            # Quarter filters and per-quarter groupings, newest first
+            models.Index(fields=["user", "tax_year", "quarter_no", "date"]),
+        ]
 
     def save(self, *args, **kwargs):
-        self.quarter = self._calculate_quarter()
+        self.assign_periods()
         super().save(*args, **kwargs)
 
     def clean(self):
@@ -144,8 +162,133 @@ class Expense(models.Model):
                     }
                 )
 
-    def _calculate_quarter(self):
-        return Income._calculate_quarter(self)
+    def assign_periods(self):
+        Income.assign_periods(self)
+
+
+class PeriodTotal(models.Model):
+    """
+    Running totals per user, period, category and kind.
+
+    Maintained incrementally by bookkeeping.signals whenever an Income or
+    Expense is saved or deleted, and rebuilt from scratch with the
+    ``rebuild_period_totals`` management command.
+    """
+
+    KIND_CHOICES = [
+        ("income", "Income"),
+        ("expense", "Expense"),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="period_totals"
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    tax_year = models.CharField(max_length=9)
+    quarter = models.CharField(max_length=10)
+    # First day of the calendar month
+    month = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+
+    amount_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+    vat_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+    entry_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "kind", "tax_year", "quarter", "month", "category"],
+                name="unique_period_total",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "kind", "tax_year"]),
+        ]
+        verbose_name = "Period Total"
+        verbose_name_plural = "Period Totals"
+
+    def __str__(self):
+        return f"{self.kind.capitalize()} – {self.month:%b %Y} – {self.category}"
+
+
+class LedgerState(models.Model):
+    """
+    A per-user version number, bumped on every Income or Expense write.
+
+    Report caches and ETags are keyed on it, so they go stale exactly when
+    the user's ledger changes.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="ledger_state"
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user} – v{self.version}"
+
+
+class ReportJob(models.Model):
+    """
+    A report rendered to a file by the ``report_worker`` command.
+
+    Queued jobs are claimed oldest first; see bookkeeping.report_jobs.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Ready"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="report_jobs"
+    )
+    report = models.CharField(max_length=50)
+    # "2024-2025", or "all" for every tax year
+    tax_year = models.CharField(max_length=9)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    # Export format name (see bookkeeping.export_formats); blank for
+    # reports that only come in one format
+    format = models.CharField(max_length=10, blank=True)
+    file = models.FileField(upload_to="reports/", blank=True)
+    filename = models.CharField(max_length=255)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the job runs; a running job whose
+    # heartbeat has stopped is queued again
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+        verbose_name = "Report Job"
+        verbose_name_plural = "Report Jobs"
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def is_pending(self):
+        return self.status in (self.STATUS_QUEUED, self.STATUS_RUNNING)
 
 
 class ProfitAndLoss(models.Model):
@@ -157,6 +300,66 @@ class ProfitAndLoss(models.Model):
         return "Profit & Loss Summary"
 
 
+class SearchDocumentField(models.TextField):
+    """
+    The hidden FTS5 column named after its table; supports ``__match``.
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class IncomeSearchEntry(models.Model):
+    """
+    Row of the FTS5 index over Income text (see migration 0006).
+
+    Unmanaged and read-only: triggers keep the table in step with Income.
+    """
+
+    income = models.OneToOneField(
+        Income,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search_entry",
+    )
+    document = SearchDocumentField(db_column="bookkeeping_income_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "bookkeeping_income_fts"
+
+
+class ExpenseSearchEntry(models.Model):
+    """
+    Row of the FTS5 index over Expense text (see migration 0006).
+
+    Unmanaged and read-only: triggers keep the table in step with Expense.
+    """
+
+    expense = models.OneToOneField(
+        Expense,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search_entry",
+    )
+    document = SearchDocumentField(db_column="bookkeeping_expense_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "bookkeeping_expense_fts"
+
+
 class RecurringEntry(models.Model):
     ENTRY_TYPE_CHOICES = [
         ("income", "Income"),
@@ -0,0 +1,145 @@
+# bookkeeping/pagination.py
+"""
+Keyset (seek) pagination for transaction lists.
+
+Instead of OFFSET, each page is fetched with a WHERE clause that continues
+from the last row shown, keyed on the sort column plus ``id`` as a
+tie-breaker. With the (user, date) indexes every page costs the same,
+however deep into the ledger it is, and no COUNT(*) is needed. The list
+views count their rows in the summary query (see listing.py) and pass the
+figure in for display.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Orderings the list views accept in ?order_by=
+ORDERINGS = ["-date", "date", "-amount", "amount", "description", "-description"]
+DEFAULT_ORDERING = "-date"
+
+# Most relevant first; only available on search results (see search.py)
+RELEVANCE_ORDERING = "search_rank"
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the decoded cursor, or ``None`` if it is missing or invalid."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, dict) or {"value", "id", "back"} - values.keys():
+        return None
+    return values
+
+
+class KeysetPage:
+    """One page of results plus the cursors to reach its neighbours."""
+
+    def __init__(self, object_list, has_next, has_previous, paginator):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return self.paginator.cursor_for(self.object_list[-1], back=False)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return self.paginator.cursor_for(self.object_list[0], back=True)
+        return None
+
+    @property
+    def count(self):
+        return self.paginator.count
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering`` and ``id``.
+
+    ``ordering`` may be one of ``ORDERINGS``, or ``RELEVANCE_ORDERING`` when
+    the queryset carries a search rank. Anything else falls back to
+    ``DEFAULT_ORDERING``. Pass ``count`` when the caller has already
+    counted the rows, for the page to show; the paginator never counts.
+    """
+
+    def __init__(self, queryset, per_page, ordering=DEFAULT_ORDERING, count=None):
+        allowed = ORDERINGS
+        if RELEVANCE_ORDERING in queryset.query.annotations:
+            allowed = ORDERINGS + [RELEVANCE_ORDERING]
+        if ordering not in allowed:
+            ordering = DEFAULT_ORDERING
+
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.field = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+        self.count = count
+
+    def cursor_for(self, obj, back):
+        value = getattr(obj, self.field)
+        return encode_cursor({"value": str(value), "id": obj.pk, "back": back})
+
+    def _order(self, reverse):
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        return [f"{prefix}{self.field}", f"{prefix}id"]
+
+    def _seek(self, cursor, reverse):
+        """Rows strictly after the cursor in the (possibly reversed) order."""
+        annotation = self.queryset.query.annotations.get(self.field)
+        if annotation is not None:
+            field = annotation.output_field
+        else:
+            field = self.queryset.model._meta.get_field(self.field)
+        value = field.to_python(cursor["value"])
+        lookup = "lt" if self.descending != reverse else "gt"
+
+        return Q(**{f"{self.field}__{lookup}": value}) | Q(
+            **{self.field: value, f"id__{lookup}": cursor["id"]}
+        )
+
+    def get_page(self, cursor=None):
+        cursor = decode_cursor(cursor)
+        back = bool(cursor and cursor["back"])
+
+        queryset = self.queryset.order_by(*self._order(reverse=back))
+        if cursor:
+            try:
+                queryset = queryset.filter(self._seek(cursor, reverse=back))
+            except (ValidationError, ValueError, TypeError):
+                # A tampered cursor just shows the first page
+                cursor, back = None, False
+                queryset = self.queryset.order_by(*self._order(reverse=False))
+
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if back:
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_more, paginator=self)
+
+        return KeysetPage(
+            rows, has_next=has_more, has_previous=cursor is not None, paginator=self
+        )
@@ -0,0 +1,170 @@
+# bookkeeping/periods.py
+"""
+UK tax years, their quarters, and calendar month helpers.
+
+A tax year runs from 6 April to 5 April and is identified by the year it
+starts in; its quarters start on 6 April, 6 July, 6 October and 6 January.
+``TaxPeriod`` and ``Quarter`` are immutable and memoised, so parsing a label
+such as "2024-2025" or "2024-Q3", or formatting one, happens once per
+process. Mapping a date to
+its period is a lookup in a table indexed by (month, day), with no date
+arithmetic, which keeps the per-row cost low in exports and imports.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cached_property, lru_cache
+
+# Month and day each quarter starts on, in tax-year order
+QUARTER_STARTS = ((4, 6), (7, 6), (10, 6), (1, 6))
+
+
+def _build_day_table():
+    """``table[month][day]`` is ``(year_offset, quarter_no)`` for that day."""
+    table = [[None] * 32 for _ in range(13)]
+
+    for month in range(1, 13):
+        for day in range(1, 32):
+            year_offset = 0 if (month, day) >= QUARTER_STARTS[0] else -1
+
+            if QUARTER_STARTS[0] <= (month, day) < QUARTER_STARTS[1]:
+                quarter_no = 1
+            elif QUARTER_STARTS[1] <= (month, day) < QUARTER_STARTS[2]:
+                quarter_no = 2
+            elif QUARTER_STARTS[3] <= (month, day) < QUARTER_STARTS[0]:
+                quarter_no = 4
+            else:
+                quarter_no = 3
+
+            table[month][day] = (year_offset, quarter_no)
+
+    return tuple(tuple(row) for row in table)
+
+
+_DAY_TABLE = _build_day_table()
+
+
+def period_for_date(value):
+    """Return ``(tax_year, quarter_no)`` for a date, e.g. ``(2024, 3)``."""
+    year_offset, quarter_no = _DAY_TABLE[value.month][value.day]
+    return value.year + year_offset, quarter_no
+
+
+@dataclass(frozen=True)
+class TaxPeriod:
+    """One UK tax year, e.g. ``TaxPeriod(2024)`` for 2024-2025."""
+
+    start_year: int
+
+    @classmethod
+    def for_date(cls, value):
+        return tax_period(value.year + _DAY_TABLE[value.month][value.day][0])
+
+    @classmethod
+    def current(cls):
+        return cls.for_date(date.today())
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def from_label(label):
+        """Parse "2024-2025"; raises ``ValueError`` for anything else."""
+        start, _, end = label.partition("-")
+        if not (start.isdigit() and end.isdigit() and int(end) == int(start) + 1):
+            raise ValueError(f"Not a tax year: {label!r}")
+        return tax_period(int(start))
+
+    @cached_property
+    def label(self):
+        return f"{self.start_year}-{self.start_year + 1}"
+
+    @cached_property
+    def short_label(self):
+        return f"{self.start_year}/{str(self.start_year + 1)[-2:]}"
+
+    @cached_property
+    def start(self):
+        return date(self.start_year, 4, 6)
+
+    @cached_property
+    def end(self):
+        return date(self.start_year + 1, 4, 5)
+
+    @cached_property
+    def bounds(self):
+        return self.start, self.end
+
+    @cached_property
+    def quarters(self):
+        return tuple(quarter(self.start_year, number) for number in range(1, 5))
+
+    def quarter(self, number):
+        return quarter(self.start_year, number)
+
+    def __str__(self):
+        return self.label
+
+
+@dataclass(frozen=True)
+class Quarter:
+    """One quarter of a tax year, e.g. ``Quarter(2024, 3)`` for "2024-Q3"."""
+
+    tax_year: int
+    number: int
+
+    @classmethod
+    def for_date(cls, value):
+        year_offset, number = _DAY_TABLE[value.month][value.day]
+        return quarter(value.year + year_offset, number)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def from_code(code):
+        """Parse "2024-Q3"; raises ``ValueError`` for anything else."""
+        year, _, number = code.partition("-Q")
+        if not (year.isdigit() and number in ("1", "2", "3", "4")):
+            raise ValueError(f"Not a quarter code: {code!r}")
+        return quarter(int(year), int(number))
+
+    @cached_property
+    def code(self):
+        return f"{self.tax_year}-Q{self.number}"
+
+    @property
+    def tax_period(self):
+        return tax_period(self.tax_year)
+
+    @cached_property
+    def start(self):
+        month, day = QUARTER_STARTS[self.number - 1]
+        return date(self.tax_year + (self.number == 4), month, day)
+
+    @cached_property
+    def end(self):
+        if self.number == 4:
+            return self.tax_period.end
+        return self.tax_period.quarter(self.number + 1).start - timedelta(days=1)
+
+    @cached_property
+    def bounds(self):
+        return self.start, self.end
+
+    def __str__(self):
+        return self.code
+
+
+@lru_cache(maxsize=None)
+def tax_period(start_year):
+    return TaxPeriod(start_year)
+
+
+@lru_cache(maxsize=None)
+def quarter(tax_year, number):
+    return Quarter(tax_year, number)
+
+
+def month_start(value):
+    return value.replace(day=1)
+
+
+def previous_month_start(value):
+    return (month_start(value) - timedelta(days=1)).replace(day=1)
@@ -0,0 +1,326 @@
+# bookkeeping/report_jobs.py
+"""
+Reports rendered to files by a background worker.
+
+Large exports used to be built inside the web request, holding a gunicorn
+worker for as long as they took. A ``ReportJob`` row is now queued instead,
+and the ``report_worker`` command renders it to a file under
+``MEDIA_ROOT/reports/`` for the user to download once it is ready.
+
+The database is the queue, so no broker is needed. A worker claims the
+oldest queued job with a conditional UPDATE inside a transaction; with
+SQLite's IMMEDIATE transactions only one worker can hold the write lock, and
+on any database the ``status=queued`` condition means a job is only ever
+claimed once. While a job runs, a thread in its worker refreshes the job's
+``heartbeat_at`` every ``REPORT_JOB_HEARTBEAT`` seconds; a running job with
+no heartbeat for ``REPORT_JOB_STALE_AFTER`` seconds belongs to a worker that
+died and is queued again. A long report that is still being written is
+never handed to a second worker.
+"""
+
+import io
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from bookkeeping.export_formats import EXPORT_FORMATS, get_export_format
+from bookkeeping.exporting import (
+    EXPENSE_EXPORT_COLUMNS,
+    INCOME_EXPORT_COLUMNS,
+    expense_export_rows,
+    income_export_rows,
+)
+from bookkeeping.models import ReportJob
+from bookkeeping.reporting import (
+    build_yearly_report,
+    expense_print_context,
+    write_yearly_profit_csv,
+)
+
+logger = logging.getLogger(__name__)
+
+# Directory under MEDIA_ROOT that finished reports are written to
+REPORT_DIR = "reports"
+
+
+@dataclass(frozen=True)
+class ReportType:
+    """
+    A report the worker can render.
+
+    Exports give ``columns`` and ``rows(job)`` and can be written in any
+    export format. Other reports give a fixed ``extension`` and
+    ``render(job, out)``, which writes to a binary file.
+    """
+
+    label: str
+    # Download name, before the tax year suffix and extension
+    filename: str
+    columns: tuple = None
+    rows: Callable = None
+    extension: str = None
+    render: Callable = None
+    # Whether the report can cover every tax year ("all")
+    all_years: bool = False
+
+    @property
+    def is_export(self):
+        return self.columns is not None
+
+
+def render_yearly_profit_csv(job, out):
+    text = io.StringIO()
+    write_yearly_profit_csv(text, build_yearly_report(job.user, job.tax_year))
+    out.write(text.getvalue().encode())
+
+
+def render_expenses_print(job, out):
+    context = expense_print_context(job.user, job.tax_year)
+    context["user"] = job.user
+    out.write(
+        render_to_string(
+            "bookkeeping/reports/expenses_by_category_print.html", context
+        ).encode()
+    )
+
+
+REPORT_TYPES = {
+    "income_csv": ReportType(
+        "All income",
+        "income",
+        columns=INCOME_EXPORT_COLUMNS,
+        rows=lambda job: income_export_rows(job.user, job.tax_year),
+        all_years=True,
+    ),
+    "expense_csv": ReportType(
+        "All expenses",
+        "expenses",
+        columns=EXPENSE_EXPORT_COLUMNS,
+        rows=lambda job: expense_export_rows(job.user, job.tax_year),
+        all_years=True,
+    ),
+    "yearly_profit_csv": ReportType(
+        "Yearly profit report (CSV)",
+        "yearly_profit_report",
+        extension="csv",
+        render=render_yearly_profit_csv,
+    ),
+    "expenses_print": ReportType(
+        "Expenses by category (print)",
+        "expenses_by_category",
+        extension="html",
+        render=render_expenses_print,
+    ),
+}
+
+
+def report_choices():
+    return [(key, report.label) for key, report in REPORT_TYPES.items()]
+
+
+# ===========================================
+# QUEUE
+# ===========================================
+
+
+def enqueue_report(user, report, tax_year, export_format="csv"):
+    """
+    Queue ``report`` for ``user`` and ``tax_year`` ("2024-2025" or "all").
+
+    ``export_format`` names the format exports are written in; other reports
+    ignore it. An identical job that is still queued or running is returned
+    rather than queueing the same work twice. Raises ``ValueError`` for an
+    unknown report or format, or for "all" on a report that needs a single
+    tax year.
+    """
+    report_type = REPORT_TYPES.get(report)
+    if report_type is None:
+        raise ValueError(f"Unknown report: {report!r}")
+    if tax_year == "all" and not report_type.all_years:
+        raise ValueError(f"{report_type.label} needs a single tax year.")
+
+    if report_type.is_export:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format!r}")
+        extension = EXPORT_FORMATS[export_format].extension
+    else:
+        export_format = ""
+        extension = report_type.extension
+
+    pending = ReportJob.objects.filter(
+        user=user,
+        report=report,
+        tax_year=tax_year,
+        format=export_format,
+        status__in=(ReportJob.STATUS_QUEUED, ReportJob.STATUS_RUNNING),
+    ).first()
+    if pending is not None:
+        return pending
+
+    year_suffix = tax_year.replace("-", "_")
+    return ReportJob.objects.create(
+        user=user,
+        report=report,
+        tax_year=tax_year,
+        format=export_format,
+        filename=f"{report_type.filename}_{year_suffix}.{extension}",
+    )
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it, or ``None``."""
+    with transaction.atomic():
+        job = (
+            ReportJob.objects.filter(status=ReportJob.STATUS_QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        started_at = timezone.now()
+        claimed = ReportJob.objects.filter(
+            pk=job.pk, status=ReportJob.STATUS_QUEUED
+        ).update(
+            status=ReportJob.STATUS_RUNNING,
+            started_at=started_at,
+            heartbeat_at=started_at,
+        )
+
+    if not claimed:
+        return None
+
+    job.status = ReportJob.STATUS_RUNNING
+    job.started_at = job.heartbeat_at = started_at
+    return job
+
+
+def touch_job(job):
+    """Record that ``job`` is still being worked on."""
+    return ReportJob.objects.filter(
+        pk=job.pk, status=ReportJob.STATUS_RUNNING
+    ).update(heartbeat_at=timezone.now())
+
+
+@contextmanager
+def heartbeat(job, interval=None):
+    """
+    Refresh ``job``'s heartbeat from a daemon thread while the block runs.
+
+    A failed refresh (e.g. the database briefly locked) is logged and
+    retried on the next beat.
+    """
+    if interval is None:
+        interval = settings.REPORT_JOB_HEARTBEAT
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    touch_job(job)
+                except Exception:
+                    logger.warning(
+                        "Heartbeat for report job %s failed", job.pk, exc_info=True
+                    )
+        finally:
+            connection.close()
+
+    thread = threading.Thread(
+        target=beat, name=f"report-job-heartbeat-{job.pk}", daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """
+    Render a claimed job to its file and record the outcome.
+
+    The report is written to a temporary name and renamed into place, so a
+    download never sees a partly written file.
+    """
+    name = f"{REPORT_DIR}/{job.pk}.{job.filename.rpartition('.')[2]}"
+    path = Path(settings.MEDIA_ROOT) / name
+    partial = path.with_name(path.name + ".partial")
+
+    try:
+        report_type = REPORT_TYPES[job.report]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with heartbeat(job), open(partial, "wb") as out:
+            if report_type.is_export:
+                export_format = get_export_format(job.format)
+                for chunk in export_format.write(
+                    report_type.columns, report_type.rows(job)
+                ):
+                    out.write(chunk)
+            else:
+                report_type.render(job, out)
+        os.replace(partial, path)
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.pk)
+        partial.unlink(missing_ok=True)
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    else:
+        job.status = ReportJob.STATUS_DONE
+        job.file.name = name
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "file", "error", "finished_at"])
+    return job
+
+
+def run_pending_jobs(limit=None):
+    """Claim and run queued jobs until none are left; return those run."""
+    jobs = []
+    while limit is None or len(jobs) < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        jobs.append(run_job(job))
+    return jobs
+
+
+# ===========================================
+# HOUSEKEEPING
+# ===========================================
+
+
+def requeue_stale_jobs():
+    """Queue again any job whose worker stopped sending heartbeats."""
+    cutoff = timezone.now() - timedelta(seconds=settings.REPORT_JOB_STALE_AFTER)
+    return ReportJob.objects.filter(
+        status=ReportJob.STATUS_RUNNING, heartbeat_at__lt=cutoff
+    ).update(status=ReportJob.STATUS_QUEUED, started_at=None, heartbeat_at=None)
+
+
+def delete_expired_jobs():
+    """Delete finished jobs, and their files, past the retention period."""
+    cutoff = timezone.now() - timedelta(days=settings.REPORT_JOB_RETENTION_DAYS)
+    expired = ReportJob.objects.filter(
+        status__in=(ReportJob.STATUS_DONE, ReportJob.STATUS_FAILED),
+        finished_at__lt=cutoff,
+    )
+
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
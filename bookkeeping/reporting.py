@@ -0,0 +1,323 @@
+# bookkeeping/reporting.py
+"""
+Figures for the yearly profit report, and the CSV written from them.
+
+The quarterly breakdown, year-to-date totals and both category breakdowns
+are all derived in memory from one query: the user's PeriodTotal rows for
+the tax year, grouped by kind, quarter and category. The report therefore
+costs the same single query however many quarters or categories it shows.
+"""
+
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from bookkeeping.models import Expense, PeriodTotal
+from bookkeeping.periods import TaxPeriod
+
+ZERO = Decimal("0.00")
+
+
+@dataclass
+class PeriodFigures:
+    income: Decimal = ZERO
+    expenses: Decimal = ZERO
+    vat: Decimal = ZERO
+
+    @property
+    def profit(self):
+        return self.income - self.expenses
+
+
+@dataclass
+class CategoryFigures:
+    name: str
+    total: Decimal = ZERO
+    vat: Decimal = ZERO
+    count: int = 0
+
+    @property
+    def total_inc_vat(self):
+        return self.total + self.vat
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else ZERO
+
+
+@dataclass
+class YearlyReport:
+    tax_period: TaxPeriod
+    # Quarter code -> figures, for all four quarters in order
+    quarters: dict = field(default_factory=dict)
+    ytd: PeriodFigures = field(default_factory=PeriodFigures)
+    income_categories: list = field(default_factory=list)
+    expense_categories: list = field(default_factory=list)
+
+    @property
+    def income_count(self):
+        return sum(category.count for category in self.income_categories)
+
+    @property
+    def expense_count(self):
+        return sum(category.count for category in self.expense_categories)
+
+
+def build_yearly_report(user, tax_year):
+    """Build the ``YearlyReport`` for ``user`` in ``tax_year`` ("2024-2025")."""
+    period = TaxPeriod.from_label(tax_year)
+    report = YearlyReport(
+        tax_period=period,
+        quarters={quarter.code: PeriodFigures() for quarter in period.quarters},
+    )
+
+    rows = (
+        PeriodTotal.objects.filter(user=user, tax_year=period.label)
+        .values("kind", "quarter", "category__name")
+        .annotate(
+            total=Sum("amount_total"),
+            vat=Sum("vat_total"),
+            count=Sum("entry_count"),
+        )
+        .order_by()
+    )
+
+    categories = {"income": {}, "expense": {}}
+
+    for row in rows:
+        kind, total, vat = row["kind"], row["total"] or ZERO, row["vat"] or ZERO
+        quarter = report.quarters.setdefault(row["quarter"], PeriodFigures())
+
+        if kind == "income":
+            quarter.income += total
+            report.ytd.income += total
+        else:
+            quarter.expenses += total
+            quarter.vat += vat
+            report.ytd.expenses += total
+            report.ytd.vat += vat
+
+        name = row["category__name"]
+        category = categories[kind].setdefault(name, CategoryFigures(name))
+        category.total += total
+        category.vat += vat
+        category.count += row["count"] or 0
+
+    report.income_categories = sorted(
+        categories["income"].values(), key=lambda category: category.name
+    )
+    report.expense_categories = sorted(
+        categories["expense"].values(), key=lambda category: category.name
+    )
+
+    return report
+
+
+def write_yearly_profit_csv(out, report):
+    """
+    Write the yearly profit report CSV to ``out``, any object with ``write``:
+    an ``HttpResponse`` or an open text file.
+    """
+    writer = csv.writer(out)
+    tax_year_start, tax_year_end = report.tax_period.bounds
+
+    # =========================================
+    # SECTION 1: TAX YEAR SUMMARY
+    # =========================================
+    writer.writerow(["YEARLY PROFIT REPORT"])
+    writer.writerow(["MTDify Local Edition"])
+    writer.writerow(["Generated:", datetime.now().strftime("%d/%m/%Y %H:%M")])
+    writer.writerow([])
+
+    writer.writerow(["TAX YEAR SUMMARY"])
+    writer.writerow(["Tax Year:", report.tax_period.label])
+    writer.writerow(
+        [
+            "Period:",
+            f"{tax_year_start.strftime('%d/%m/%Y')} - {tax_year_end.strftime('%d/%m/%Y')}",
+        ]
+    )
+    writer.writerow([])
+
+    # =========================================
+    # SECTION 2: QUARTERLY BREAKDOWN
+    # =========================================
+    writer.writerow(["QUARTERLY BREAKDOWN"])
+    writer.writerow(
+        ["Quarter", "Income (£)", "Expenses (£)", "VAT (£)", "Net Profit (£)"]
+    )
+
+    for quarter, summary in report.quarters.items():
+        writer.writerow(
+            [
+                quarter,
+                f"{summary.income:.2f}",
+                f"{summary.expenses:.2f}",
+                f"{summary.vat:.2f}",
+                f"{summary.profit:.2f}",
+            ]
+        )
+
+    # Quarterly totals row; the quarters add up to the whole year
+    writer.writerow(
+        [
+            "TOTAL",
+            f"{report.ytd.income:.2f}",
+            f"{report.ytd.expenses:.2f}",
+            f"{report.ytd.vat:.2f}",
+            f"{report.ytd.profit:.2f}",
+        ]
+    )
+    writer.writerow([])
+
+    # =========================================
+    # SECTION 3: YEAR-TO-DATE TOTALS
+    # =========================================
+    ytd_income = report.ytd.income
+    ytd_expenses = report.ytd.expenses
+    ytd_vat = report.ytd.vat
+    ytd_profit = report.ytd.profit
+
+    writer.writerow(["YEAR-TO-DATE TOTALS"])
+    writer.writerow(["Description", "Amount (£)"])
+    writer.writerow(["Total Income", f"{ytd_income:.2f}"])
+    writer.writerow(["Total Expenses", f"{ytd_expenses:.2f}"])
+    writer.writerow(["Total VAT", f"{ytd_vat:.2f}"])
+    writer.writerow(["Net Profit", f"{ytd_profit:.2f}"])
+    writer.writerow([])
+
+    # =========================================
+    # SECTION 4: INCOME BY CATEGORY
+    # =========================================
+    writer.writerow(["INCOME BY CATEGORY"])
+    writer.writerow(["Category", "Total (£)", "Number of Entries", "Average (£)"])
+
+    for cat in report.income_categories:
+        writer.writerow(
+            [
+                cat.name,
+                f"{cat.total:.2f}",
+                cat.count,
+                f"{cat.average:.2f}",
+            ]
+        )
+
+    # Income category total
+    income_cat_total = report.ytd.income
+    income_cat_count = report.income_count
+    writer.writerow(
+        [
+            "TOTAL",
+            f"{income_cat_total:.2f}",
+            income_cat_count,
+            "",
+        ]
+    )
+    writer.writerow([])
+
+    # =========================================
+    # SECTION 5: EXPENSES BY CATEGORY
+    # =========================================
+    writer.writerow(["EXPENSES BY CATEGORY"])
+    writer.writerow(
+        [
+            "Category",
+            "Net Amount (£)",
+            "VAT (£)",
+            "Total Inc VAT (£)",
+            "Number of Entries",
+            "Average (£)",
+        ]
+    )
+
+    for cat in report.expense_categories:
+        writer.writerow(
+            [
+                cat.name,
+                f"{cat.total:.2f}",
+                f"{cat.vat:.2f}",
+                f"{cat.total_inc_vat:.2f}",
+                cat.count,
+                f"{cat.average:.2f}",
+            ]
+        )
+
+    # Expense category totals
+    expense_cat_net = report.ytd.expenses
+    expense_cat_vat = report.ytd.vat
+    expense_cat_total_inc = expense_cat_net + expense_cat_vat
+    expense_cat_count = report.expense_count
+    writer.writerow(
+        [
+            "TOTAL",
+            f"{expense_cat_net:.2f}",
+            f"{expense_cat_vat:.2f}",
+            f"{expense_cat_total_inc:.2f}",
+            expense_cat_count,
+            "",
+        ]
+    )
+    writer.writerow([])
+
+    # =========================================
+    # SECTION 6: REPORT FOOTER
+    # =========================================
+    writer.writerow(["REPORT SUMMARY"])
+    writer.writerow(["Total Transactions:", income_cat_count + expense_cat_count])
+    writer.writerow(["Income Entries:", income_cat_count])
+    writer.writerow(["Expense Entries:", expense_cat_count])
+    writer.writerow([])
+    writer.writerow(["Report generated by MTDify Local Edition"])
+    writer.writerow(["https://mtdify.uk"])
+
+
+def expense_print_context(user, tax_year, category=None):
+    """
+    Template context for the expenses print report.
+
+    ``category`` of ``None`` prints all expenses, grouped by category.
+    """
+    tax_year_start, tax_year_end = TaxPeriod.from_label(tax_year).bounds
+    expenses = Expense.objects.filter(
+        user=user, date__gte=tax_year_start, date__lte=tax_year_end
+    ).select_related("category")
+
+    if category is None:
+        expenses = expenses.order_by("category__name", "-date")
+        category_name = "All Expenses"
+    else:
+        expenses = expenses.filter(category=category).order_by("-date")
+        category_name = category.name
+
+    # Calculate totals
+    total_amount = expenses.aggregate(total=Sum("amount"))["total"] or 0
+    total_vat = expenses.aggregate(total=Sum("vat_amount"))["total"] or 0
+
+    # Group expenses by category for the "all-expenses" view
+    expenses_by_category = {}
+    if category is None:
+        for expense in expenses:
+            cat_name = expense.category.name if expense.category else "Uncategorised"
+            if cat_name not in expenses_by_category:
+                expenses_by_category[cat_name] = {
+                    "items": [],
+                    "total": 0,
+                    "vat_total": 0,
+                }
+            expenses_by_category[cat_name]["items"].append(expense)
+            expenses_by_category[cat_name]["total"] += expense.amount
+            expenses_by_category[cat_name]["vat_total"] += expense.vat_amount or 0
+
+    return {
+        "expenses": expenses,
+        "expenses_by_category": expenses_by_category,
+        "category_name": category_name,
+        "is_all_expenses": category is None,
+        "total_amount": total_amount,
+        "total_vat": total_vat,
+        "tax_year": tax_year,
+        "today": datetime.now(),
+    }
@@ -0,0 +1,75 @@
+# bookkeeping/search.py
+"""
+Transaction search for the income and expense lists.
+
+On SQLite the FTS5 tables created by migration 0006 are used, giving
+indexed, ranked, prefix-matching search. Elsewhere, or when FTS5 is not
+available, search falls back to ``icontains`` across the same fields.
+
+Either way the queryset is annotated with ``search_rank``, where lower is
+more relevant, so the lists can order results by relevance.
+"""
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+
+# Fields searched per model, matching the FTS5 tables in migration 0006
+SEARCH_FIELDS = {
+    "bookkeeping_income": ["description", "client_name", "invoice_number"],
+    "bookkeeping_expense": ["description", "supplier_name"],
+}
+
+_fts_tables = {}
+
+
+class ContainsSearchBackend:
+    """Case-insensitive substring match; needs no index but scans the table."""
+
+    def search(self, queryset, query):
+        fields = SEARCH_FIELDS[queryset.model._meta.db_table]
+        condition = reduce(or_, (Q(**{f"{field}__icontains": query}) for field in fields))
+        return queryset.filter(condition).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class SQLiteFTSSearchBackend:
+    """FTS5 match with bm25 ranking; every word is matched as a prefix."""
+
+    def search(self, queryset, query):
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return ContainsSearchBackend().search(queryset, query)
+
+        match = " ".join(f'"{term}"*' for term in terms)
+
+        # Joins the FTS5 table through the unmanaged *SearchEntry models
+        return queryset.filter(search_entry__document__match=match).annotate(
+            search_rank=F("search_entry__rank")
+        )
+
+
+def _has_fts_table(connection, table):
+    """Whether ``table`` has an FTS5 index, checked once per process."""
+    key = (connection.alias, table)
+    if key not in _fts_tables:
+        _fts_tables[key] = f"{table}_fts" in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+def get_search_backend(model, using="default"):
+    connection = connections[using]
+    if connection.vendor == "sqlite" and _has_fts_table(
+        connection, model._meta.db_table
+    ):
+        return SQLiteFTSSearchBackend()
+    return ContainsSearchBackend()
+
+
+def search_transactions(queryset, query):
+    """Filter an Income or Expense queryset to rows matching ``query``."""
+    return get_search_backend(queryset.model, queryset.db).search(queryset, query)
@@ -1,86 +1,177 @@
+from calendar import monthrange
 from datetime import date
-from bookkeeping.models import RecurringEntry, Income, Expense
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+from bookkeeping.models import RecurringEntry, RecurringRunLog, Income, Expense
+from bookkeeping.signals import transactions_created
+from bookkeeping.utils import chunked
 
 
-def run_recurring_for_user(user):
+# Entries claimed per UPDATE statement
+CLAIM_BATCH_SIZE = 200
+
+
+class ClaimLost(Exception):
+    """Another run advanced an entry between reading and claiming it."""
+
+
+def _next_due_date(current_due, day_of_month):
+    """Return the next monthly occurrence after ``current_due``."""
+    next_month = current_due.month + 1
+    next_year = current_due.year
+
+    if next_month > 12:
+        next_month = 1
+        next_year += 1
+
+    # Handle day_of_month validation (use last day of month if day doesn't exist)
+    try:
+        return date(next_year, next_month, day_of_month)
+    except ValueError:
+        last_day = monthrange(next_year, next_month)[1]
+        return date(next_year, next_month, last_day)
+
+
+def _due_dates(entry, today):
     """
-    Process recurring entries for a user, catching up on all missed entries
-    from start_date to today.
+    Return (due_dates, next_run) for an entry: every missed occurrence up to
+    today, and the date of the following occurrence.
     """
-    today = date.today()
+    due_dates = []
+    current_due = entry.next_run
+
+    while current_due <= today:
+        # Check if we've passed the end_date
+        if entry.end_date and current_due > entry.end_date:
+            break
+
+        due_dates.append(current_due)
+        current_due = _next_due_date(current_due, entry.day_of_month)
 
-    entries = RecurringEntry.objects.filter(
-        user=user,
-        is_active=True,
+    return due_dates, current_due
+
+
+def due_recurring_entries(today, since=None):
+    """
+    Active, running recurring entries with at least one date due by today.
+
+    With ``since``, only entries whose next run falls between ``since`` and
+    today (or that have never run) are returned.
+    """
+    due = Q(next_run__lte=today)
+    if since is not None:
+        due &= Q(next_run__gte=since)
+
+    return (
+        RecurringEntry.objects.filter(is_active=True, start_date__lte=today)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+        .filter(due | Q(next_run__isnull=True))
     )
 
+
+def run_recurring_for_user(user, today=None, since=None):
+    """
+    Process recurring entries for a user, catching up on all missed entries
+    from start_date to today. With ``since``, only entries whose next run is
+    on or after that date are selected; every due occurrence of a selected
+    entry is still created.
+
+    All due transactions for all entries are built in memory and written
+    with bulk_create inside a single transaction. The same transaction
+    claims the entries with ``_claim_entries``, a conditional UPDATE that
+    moves last_run/next_run forward only where next_run is still the value
+    read here. If a concurrent run advanced an entry first, ``ClaimLost``
+    rolls everything back and nothing is created twice.
+    """
+    today = today or timezone.localdate()
+
+    try:
+        with transaction.atomic():
+            # No row locks (SQLite has none); the claim detects a racing run
+            entries = list(due_recurring_entries(today, since).filter(user=user))
+            return _generate_recurring(user, entries, today)
+    except ClaimLost:
+        # Rolled back; whatever is still due is picked up by the next run
+        return []
+
+
+def _claim_entries(claims):
+    """
+    Move entries' last_run/next_run forward, but only where next_run is
+    still the value that was read. ``claims`` holds (entry, previous
+    next_run) pairs. Raises ``ClaimLost`` if any entry was already moved.
+    """
+    for chunk in chunked(claims, CLAIM_BATCH_SIZE):
+        condition = Q()
+        for entry, previous in chunk:
+            if previous is None:
+                condition |= Q(pk=entry.pk, next_run__isnull=True)
+            else:
+                condition |= Q(pk=entry.pk, next_run=previous)
+
+        claimed = RecurringEntry.objects.filter(condition).update(
+            last_run=Case(
+                *[When(pk=entry.pk, then=Value(entry.last_run)) for entry, _ in chunk],
+                output_field=models.DateField(),
+            ),
+            next_run=Case(
+                *[When(pk=entry.pk, then=Value(entry.next_run)) for entry, _ in chunk],
+                output_field=models.DateField(),
+            ),
+        )
+        if claimed != len(chunk):
+            raise ClaimLost
+
+
+def _generate_recurring(user, entries, today):
+    """Create the due transactions for ``entries`` and claim them."""
     results = []
+    incomes = []
+    expenses = []
+    claims = []
 
     for entry in entries:
-        # Skip if not started yet
-        if today < entry.start_date:
-            continue
-
-        # Skip if already ended
-        if entry.end_date and today > entry.end_date:
-            continue
+        previous_next_run = entry.next_run
 
         # Initialize next_run if it's None (first time processing)
         if entry.next_run is None:
             entry.next_run = entry.start_date
-            entry.save()
-
-        # Calculate all due dates from next_run up to today
-        due_dates = []
-        current_due = entry.next_run
-
-        # Catch up on all missed entries
-        while current_due <= today:
-            # Check if we've passed the end_date
-            if entry.end_date and current_due > entry.end_date:
-                break
 
-            due_dates.append(current_due)
+        due_dates, next_run = _due_dates(entry, today)
 
-            # Calculate next occurrence (monthly on specified day)
-            next_month = current_due.month + 1
-            next_year = current_due.year
+        if next_run != previous_next_run:
+            claims.append((entry, previous_next_run))
 
-            if next_month > 12:
-                next_month = 1
-                next_year += 1
-
-            # Handle day_of_month validation (use last day of month if day doesn't exist)
-            try:
-                current_due = date(next_year, next_month, entry.day_of_month)
-            except ValueError:
-                # Day doesn't exist in this month (e.g., Feb 30), use last day
-                from calendar import monthrange
+        if not due_dates:
+            continue
 
-                last_day = monthrange(next_year, next_month)[1]
-                current_due = date(next_year, next_month, last_day)
+        if entry.entry_type == "expense":
+            vat_amount = (
+                (entry.amount * entry.vat_rate / Decimal("100")).quantize(
+                    Decimal("0.01")
+                )
+                if entry.vat_rate
+                else Decimal("0.00")
+            )
 
-        # Create transactions for all due dates
         for due_date in due_dates:
             if entry.entry_type == "income":
-                Income.objects.create(
+                obj = Income(
                     user=user,
-                    category=entry.category,
+                    category_id=entry.category_id,
                     description=entry.description,
                     amount=entry.amount,
                     client_name=entry.client_name,
                     date=due_date,
                 )
-                results.append(f"Created income for {entry.description} on {due_date}")
+                incomes.append(obj)
             else:
-                # Calculate VAT amount
-                vat_amount = (
-                    (entry.amount * entry.vat_rate / 100) if entry.vat_rate else 0
-                )
-
-                Expense.objects.create(
+                obj = Expense(
                     user=user,
-                    category=entry.category,
+                    category_id=entry.category_id,
                     description=entry.description,
                     amount=entry.amount,
                     vat_rate=entry.vat_rate,
@@ -88,12 +179,71 @@ def run_recurring_for_user(user):
                     supplier_name=entry.supplier_name,
                     date=due_date,
                 )
-                results.append(f"Created expense for {entry.description} on {due_date}")
+                expenses.append(obj)
+
+            # bulk_create skips save(), so set the periods up front
+            obj.assign_periods()
+            results.append(
+                f"Created {entry.entry_type} for {entry.description} on {due_date}"
+            )
+
+        # Update entry's tracking fields
+        entry.last_run = due_dates[-1]  # Last processed date
+        entry.next_run = next_run  # Next scheduled date
 
-        # Update entry's tracking fields if we processed anything
-        if due_dates:
-            entry.last_run = due_dates[-1]  # Last processed date
-            entry.next_run = current_due  # Next scheduled date
-            entry.save()
+    if not claims:
+        return results
+
+    _claim_entries(claims)
+    Income.objects.bulk_create(incomes, batch_size=500)
+    Expense.objects.bulk_create(expenses, batch_size=500)
+
+    transactions_created(Income, incomes)
+    transactions_created(Expense, expenses)
 
     return results
+
+
+def users_with_due_recurring(today=None, since=None):
+    """
+    Return users that have at least one active recurring entry due by today,
+    optionally only counting entries whose next run is on or after ``since``.
+    """
+    today = today or timezone.localdate()
+
+    entries = due_recurring_entries(today, since)
+
+    return get_user_model().objects.filter(
+        pk__in=entries.values("user_id")
+    ).order_by("pk")
+
+
+def process_due_recurring(today=None):
+    """
+    Run recurring entries for every user with something due.
+
+    Each entry is claimed by moving its next_run forward in the same
+    transaction that creates its transactions, conditional on next_run not
+    having moved since it was read. A second worker racing for the same
+    entries loses the claim and creates nothing, so entries are never
+    created twice; an entry added or edited after an earlier run today is
+    still picked up by the next one. RecurringRunLog records when each
+    user was last processed, for the dashboard.
+
+    Returns:
+        list: (user, results) tuples for each user that had entries created.
+    """
+    today = today or timezone.localdate()
+    processed = []
+
+    for user in users_with_due_recurring(today):
+        results = run_recurring_for_user(user, today)
+        if not results:
+            continue
+
+        RecurringRunLog.objects.update_or_create(
+            user=user, defaults={"last_run_date": today}
+        )
+        processed.append((user, results))
+
+    return processed
@@ -0,0 +1,108 @@
+# bookkeeping/signals.py
+"""
+Keep derived data in step with Income and Expense writes: PeriodTotal, the
+cached tax year lists and the per-user ledger versions.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookkeeping.categories import invalidate_categories
+from bookkeeping.ledger import bump_ledger_versions
+from bookkeeping.models import Category, Expense, Income
+from bookkeeping.totals import apply_deltas, record_transactions, transaction_deltas
+from bookkeeping.utils import invalidate_tax_years
+
+TRACKED_FIELDS = ["user_id", "date", "quarter", "category_id", "amount"]
+
+
+class _Snapshot:
+    """Lightweight stand-in for the row as it was before an update."""
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+@receiver(pre_save, sender=Income)
+@receiver(pre_save, sender=Expense)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._period_previous = None
+
+    if raw or instance.pk is None:
+        return
+
+    fields = TRACKED_FIELDS + (["vat_amount"] if sender is Expense else [])
+    previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+    if previous:
+        instance._period_previous = _Snapshot(previous)
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+def update_period_totals_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    deltas = transaction_deltas(sender, [instance])
+
+    previous = getattr(instance, "_period_previous", None)
+    if previous is not None:
+        for key, (amount, vat, count) in transaction_deltas(
+            sender, [previous], sign=-1
+        ).items():
+            delta = deltas[key]
+            delta[0] += amount
+            delta[1] += vat
+            delta[2] += count
+
+    apply_deltas(deltas)
+
+    user_ids = {instance.user_id}
+    if previous is not None:
+        user_ids.add(previous.user_id)
+    ledger_changed(user_ids)
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def update_period_totals_on_delete(sender, instance, **kwargs):
+    record_transactions(sender, [instance], sign=-1)
+    ledger_changed({instance.user_id})
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    invalidate_categories()
+
+
+def transactions_created(model, objs):
+    """
+    Bring derived data up to date after a ``bulk_create``.
+
+    ``bulk_create`` does not send ``post_save``, so bulk insert paths must
+    call this once with the objects they created.
+    """
+    record_transactions(model, objs)
+    ledger_changed({obj.user_id for obj in objs})
+
+
+def ledger_changed(user_ids):
+    """
+    Invalidate per-user caches after their transactions changed.
+
+    The ledger version is a row in the same database transaction, so it
+    commits or rolls back with the change. The tax year cache is only
+    cleared once the change has committed; clearing it earlier would let a
+    concurrent request cache the list as it was before the commit.
+    """
+    user_ids = set(user_ids)
+    bump_ledger_versions(user_ids)
+
+    def invalidate():
+        for user_id in user_ids:
+            invalidate_tax_years(user_id)
+
+    transaction.on_commit(invalidate)
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from bookkeeping import backups
+from bookkeeping.backups import (
+    BACKUP_CHUNK_SIZE,
+    backup_lock,
+    collect_garbage,
+    copy_database,
+    restore_snapshot,
+    store_database,
+    store_snapshot,
+)
+
+
+class BackupTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def test_copy_includes_uncheckpointed_wal_writes(self):
+        source_path = self.dir / "db.sqlite3"
+        source = sqlite3.connect(source_path)
+        source.execute("PRAGMA journal_mode=WAL")
+        source.execute("CREATE TABLE item (value INTEGER)")
+        source.executemany("INSERT INTO item VALUES (?)", [(n,) for n in range(500)])
+        source.commit()
+
+        target = copy_database(source_path, self.dir / "copy.sqlite3")
+        source.close()
+
+        copied = sqlite3.connect(target)
+        self.assertEqual(copied.execute("SELECT COUNT(*) FROM item").fetchone(), (500,))
+        copied.close()
+        self.assertFalse(list(self.dir.glob("*.partial")))
+
+    def test_loading_the_app_does_not_start_a_backup(self):
+        # Only mtdify.wsgi starts the startup backup, never the test runner
+        self.assertFalse(backups._startup_backup_started)
+
+    def test_lock_is_exclusive(self):
+        with backup_lock(self.dir) as first:
+            with backup_lock(self.dir) as second:
+                self.assertTrue(first)
+                self.assertFalse(second)
+
+        with backup_lock(self.dir) as again:
+            self.assertTrue(again)
+
+    def test_store_deduplicates_and_restores(self):
+        monday = self.dir / "monday.sqlite3"
+        tuesday = self.dir / "tuesday.sqlite3"
+        monday.write_bytes(os.urandom(BACKUP_CHUNK_SIZE * 4))
+        data = bytearray(monday.read_bytes())
+        data[BACKUP_CHUNK_SIZE + 10] ^= 0xFF
+        tuesday.write_bytes(bytes(data))
+
+        manifests = self.dir / "manifests"
+        store_snapshot(monday, manifests / "db-2024-01-01.json")
+        chunks, _ = store_snapshot(tuesday, manifests / "db-2024-01-02.json")
+
+        # Only the chunk holding the changed byte is new
+        self.assertEqual(chunks, 1)
+
+        restored = restore_snapshot(
+            manifests / "db-2024-01-02.json", self.dir / "restored.sqlite3"
+        )
+        self.assertEqual(restored.read_bytes(), tuesday.read_bytes())
+
+        (manifests / "db-2024-01-01.json").unlink()
+        self.assertEqual(collect_garbage(self.dir), 1)
+        restore_snapshot(manifests / "db-2024-01-02.json", restored)
+
+    def wal_database(self, rows):
+        path = self.dir / "db.sqlite3"
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE item (value INTEGER)")
+        conn.executemany("INSERT INTO item VALUES (?)", [(n,) for n in range(rows)])
+        return path, conn
+
+    def restored_count(self, manifest):
+        restored = restore_snapshot(manifest, self.dir / "restored.sqlite3")
+        conn = sqlite3.connect(restored)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM item").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_wal_database_is_chunked_in_place(self):
+        path, conn = self.wal_database(500)
+        manifest = self.dir / "manifests" / "db-2024-01-01.json"
+
+        with patch("bookkeeping.backups.copy_database") as copy:
+            store_database(path, manifest)
+        conn.close()
+
+        copy.assert_not_called()
+        self.assertEqual(self.restored_count(manifest), 500)
+
+    def test_falls_back_to_a_copy_while_the_wal_cannot_be_emptied(self):
+        path, conn = self.wal_database(500)
+        # An open reader stops the checkpoint from emptying the WAL
+        reader = sqlite3.connect(path, isolation_level=None)
+        reader.execute("BEGIN")
+        reader.execute("SELECT COUNT(*) FROM item").fetchone()
+        conn.executemany("INSERT INTO item VALUES (?)", [(n,) for n in range(100)])
+
+        manifest = self.dir / "manifests" / "db-2024-01-01.json"
+        with patch(
+            "bookkeeping.backups.copy_database", wraps=copy_database
+        ) as copy:
+            store_database(path, manifest)
+        reader.close()
+        conn.close()
+
+        copy.assert_called_once()
+        self.assertEqual(self.restored_count(manifest), 600)
@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from bookkeeping.categories import (
+    CATEGORY_VERSION_KEY,
+    category_choices,
+    get_category,
+    allocate_slug,
+    get_category_by_slug,
+    import_categories,
+    invalidate_categories,
+)
+from bookkeeping.forms import IncomeForm
+from bookkeeping.models import Category
+
+
+class CategoryImportTests(TestCase):
+    def test_missing_categories_get_unique_slugs(self):
+        Category.objects.filter(name="Utilities").delete()
+        Category.objects.create(name="Other", category_type="expense", slug="utilities")
+
+        with self.assertNumQueries(2):
+            created = import_categories(
+                Category, [("Utilities", "expense"), ("Insurance", "expense")]
+            )
+            self.assertEqual(len(created), 1)
+
+        self.assertEqual(Category.objects.get(name="Utilities").slug, "utilities-1")
+
+    def test_allocate_slug_uses_one_query(self):
+        Category.objects.bulk_create(
+            Category(name="Fuel", category_type="expense", slug=slug)
+            for slug in ["fuel", "fuel-1", "fuel-2", "fuel-4", "fuel-levy"]
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_slug(Category, "Fuel"), "fuel-3")
+
+    def test_import_allocates_slugs_in_bulk(self):
+        rows = [
+            ("Fuel", "expense"),
+            ("Fuel", "expense"),
+            ("Fuel", "income"),
+            ("Utilities", "expense"),
+        ]
+
+        with self.assertNumQueries(2):
+            created = import_categories(Category, rows)
+
+        self.assertEqual(
+            [(c.name, c.category_type, c.slug) for c in created],
+            [("Fuel", "expense", "fuel"), ("Fuel", "income", "fuel-1")],
+        )
+
+
+class CategoryRegistryTests(TestCase):
+    def setUp(self):
+        invalidate_categories()
+
+    def test_lookups_load_once(self):
+        income_count = Category.objects.filter(category_type="income").count()
+
+        with self.assertNumQueries(1):
+            travel = get_category_by_slug("travel-subsistence")
+            self.assertEqual(get_category(travel.pk), travel)
+            self.assertEqual(len(category_choices("income")), income_count)
+
+    def test_forms_render_and_validate_from_registry(self):
+        income = category_choices("income")[0]
+        expense = category_choices("expense")[0]
+
+        with self.assertNumQueries(0):
+            rendered = str(IncomeForm()["category"])
+            self.assertIn(income.name, rendered)
+            self.assertNotIn(expense.name, rendered)
+
+            cleaned = IncomeForm().fields["category"].clean(str(income.pk))
+            self.assertEqual(cleaned, income)
+
+        form = IncomeForm(data={"category": str(expense.pk)})
+        form.is_valid()
+        self.assertIn("category", form.errors)
+
+    def test_save_invalidates(self):
+        category_choices("expense")
+        Category.objects.create(name="Subscriptions", category_type="expense")
+
+        self.assertIn(
+            "Subscriptions", [c.name for c in category_choices("expense")]
+        )
+
+    def test_version_change_from_another_process_reloads(self):
+        category_choices("expense")
+        Category.objects.filter(name="Utilities").update(is_active=False)
+        cache.set(CATEGORY_VERSION_KEY, "bumped-elsewhere", None)
+
+        names = [c.name for c in category_choices("expense", active_only=True)]
+        self.assertNotIn("Utilities", names)
+
+    def test_shared_version_moves_only_on_commit(self):
+        version = cache.get(CATEGORY_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Subscriptions", category_type="expense")
+            self.assertEqual(cache.get(CATEGORY_VERSION_KEY), version)
+
+        self.assertNotEqual(cache.get(CATEGORY_VERSION_KEY), version)
+
+    def test_registry_categories_are_read_only(self):
+        travel = get_category_by_slug("travel-subsistence")
+
+        with self.assertRaises(AttributeError):
+            travel.name = "Travel"
+        with self.assertRaises(AttributeError):
+            travel.save()
+
+        editable = Category.objects.get(pk=travel.pk)
+        editable.name = "Travel"
+        editable.save()
+        self.assertEqual(get_category(travel.pk).name, "Travel")
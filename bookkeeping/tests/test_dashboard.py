@@ -0,0 +1,69 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from bookkeeping.dashboard import build_dashboard_summary
+from bookkeeping.models import Category, Expense, Income
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+        self.other = Category.objects.create(name="Other", category_type="income")
+        self.travel = Category.objects.create(name="Travel", category_type="expense")
+
+        def income(day, amount, category):
+            Income.objects.create(
+                user=self.user,
+                date=day,
+                description="Income",
+                amount=Decimal(amount),
+                category=category,
+            )
+
+        def expense(day, amount):
+            Expense.objects.create(
+                user=self.user,
+                date=day,
+                description="Expense",
+                amount=Decimal(amount),
+                category=self.travel,
+            )
+
+        income(date(2024, 4, 10), "100.00", self.sales)  # 2024-Q1
+        income(date(2024, 10, 20), "200.00", self.sales)  # previous month
+        income(date(2024, 11, 2), "50.00", self.other)  # 2024-Q3, this month
+        income(date(2024, 11, 3), "80.00", self.sales)
+        income(date(2023, 12, 1), "999.00", self.sales)  # previous tax year
+        expense(date(2024, 11, 1), "30.00")
+        expense(date(2024, 5, 1), "20.00")
+        income(date(2024, 11, 20), "40.00", self.other)  # later this month
+
+    def test_summary_figures(self):
+        summary = build_dashboard_summary(self.user, "2024-2025", date(2024, 11, 4))
+
+        self.assertEqual(summary.income.ytd, Decimal("470.00"))
+        self.assertEqual(summary.expenses.ytd, Decimal("50.00"))
+        self.assertEqual(summary.income.month, Decimal("130.00"))
+        self.assertEqual(summary.income.previous_month, Decimal("200.00"))
+        self.assertEqual(summary.total_transactions, 3)
+        self.assertEqual(summary.income.top_category, "Sales")
+        self.assertEqual(summary.expenses.top_category, "Travel")
+        self.assertEqual(summary.avg_daily_income, Decimal("32.50"))
+
+    def test_historical_year_uses_q4(self):
+        summary = build_dashboard_summary(self.user, "2023-2024", date(2024, 11, 4))
+
+        self.assertEqual(summary.current_quarter, "2023-Q4")
+        self.assertEqual(summary.quarter_income, Decimal("0.00"))
+        self.assertEqual(summary.income.ytd, Decimal("999.00"))
+
+    def test_query_count(self):
+        # PeriodTotal, then this month so far for each table
+        with self.assertNumQueries(3):
+            build_dashboard_summary(self.user, "2024-2025", date(2024, 11, 4))
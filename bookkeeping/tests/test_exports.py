@@ -0,0 +1,108 @@
+import io
+import zipfile
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bookkeeping.categories import get_category_registry
+from bookkeeping.export_formats import pyarrow
+from bookkeeping.models import Category, Expense, Income
+
+
+class ExportQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+        self.travel = Category.objects.create(name="Travel", category_type="expense")
+        self.client.force_login(self.user)
+
+        session = self.client.session
+        session["selected_tax_year"] = "2024-2025"
+        session.save()
+
+    def add_transactions(self, count):
+        for index in range(count):
+            Income.objects.create(
+                user=self.user,
+                date=date(2024, 5, 1 + index % 28),
+                description=f"Invoice {index}",
+                amount=Decimal("100.00"),
+                category=self.sales,
+            )
+            Expense.objects.create(
+                user=self.user,
+                date=date(2024, 5, 1 + index % 28),
+                description=f"Train {index}",
+                amount=Decimal("12.00"),
+                vat_amount=Decimal("2.00"),
+                category=self.travel,
+            )
+
+    def export(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            content = b"".join(response.streaming_content).decode()
+        return content, len(queries)
+
+    def test_query_count_is_independent_of_size(self):
+        urls = [
+            "/bookkeeping/income/export/csv/",
+            "/bookkeeping/expense/export/csv/",
+            f"/bookkeeping/export/categories/{self.sales.slug}/",
+            "/bookkeeping/export/categories/all-expenses/",
+        ]
+
+        self.add_transactions(1)
+        # Load the category registry and create the ledger state up front
+        get_category_registry()
+        self.export(urls[0])
+        small = {url: self.export(url)[1] for url in urls}
+
+        self.add_transactions(25)
+        for url in urls:
+            content, queries = self.export(url)
+            self.assertEqual(queries, small[url], url)
+            self.assertEqual(len(content.splitlines()), 27, url)
+
+    def test_rows_include_category_name(self):
+        self.add_transactions(1)
+
+        content, _ = self.export("/bookkeeping/expense/export/csv/")
+
+        self.assertEqual(
+            content.splitlines()[1], "2024-05-01,Train 0,,12.00,2.00,Travel"
+        )
+
+    def test_formats_are_selected_with_query_parameter(self):
+        self.add_transactions(3)
+        url = "/bookkeeping/expense/export/csv/"
+
+        response = self.client.get(url, {"format": "xlsx"})
+        self.assertIn("expenses_2024_2025.xlsx", response["Content-Disposition"])
+        workbook = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn("Train 0", sheet)
+
+        self.assertEqual(self.client.get(url, {"format": "pdf"}).status_code, 404)
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_parquet_keeps_column_types(self):
+        self.add_transactions(3)
+
+        response = self.client.get(
+            "/bookkeeping/expense/export/csv/", {"format": "parquet"}
+        )
+        content = b"".join(response.streaming_content)
+        table = pyarrow.parquet.read_table(pyarrow.BufferReader(content))
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("Amount")[0].as_py(), Decimal("12.00"))
+        self.assertEqual(table.column("Date")[0].as_py(), date(2024, 5, 3))
@@ -0,0 +1,210 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from bookkeeping.importing import (
+    LineError,
+    StatementError,
+    import_statement,
+    parse_statement,
+)
+from bookkeeping.models import Category, Expense, Income, PeriodTotal
+
+CSV_STATEMENT = b"""\xef\xbb\xbfAccount,12345678
+Sort code,00-00-00
+
+Date,Description,Paid out,Paid in,Balance
+01/05/2024,INVOICE 42 ACME LTD,,"1,200.00",1200.00
+02/05/2024,SCREWFIX 9876 BRISTOL,45.99,,1154.01
+03/05/2024,GWR TRAVEL 0001,25.00,,1129.01
+03/05/2024,GWR TRAVEL 0001,25.00,,1104.01
+04/05/2024,CORNER SHOP,(3.50),,1100.51
+not a date,BROKEN LINE,1.00,,1099.51
+"""
+
+OFX_STATEMENT = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240601120000[0:GMT]
+<TRNAMT>250.00
+<NAME>ACME LTD
+<MEMO>Invoice 43
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240602
+<TRNAMT>-12.50
+<NAME>SCREWFIX
+<MEMO>5555 BRISTOL
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def statement(content, name="statement.csv", names=None):
+    stream = io.BytesIO(content)
+    stream.name = name
+    return parse_statement(stream, names)
+
+
+class StatementImportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+        self.other = Category.objects.create(name="Other", category_type="expense")
+        self.tools = Category.objects.create(name="Tools", category_type="expense")
+        self.travel = Category.objects.create(name="Travel", category_type="expense")
+
+        Expense.objects.create(
+            user=self.user,
+            date=date(2024, 4, 20),
+            description="Screwfix 1234 Bristol",
+            amount=Decimal("10.00"),
+            category=self.tools,
+        )
+
+    def run_import(self, content, name="statement.csv"):
+        return import_statement(
+            self.user, statement(content, name), self.sales, self.other
+        )
+
+    def test_csv_statement_is_imported_and_categorised(self):
+        result = self.run_import(CSV_STATEMENT)
+
+        self.assertEqual((result.income, result.expenses), (1, 4))
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(result.errors[0].line, 10)
+        # The invoice and the corner shop match no history or category name
+        self.assertEqual(result.uncategorised, 2)
+
+        income = Income.objects.get(user=self.user)
+        self.assertEqual(income.amount, Decimal("1200.00"))
+        self.assertEqual((income.tax_year, income.quarter_no), (2024, 1))
+
+        categories = dict(
+            Expense.objects.filter(date__gte=date(2024, 5, 1)).values_list(
+                "description", "category__name"
+            )
+        )
+        self.assertEqual(categories["SCREWFIX 9876 BRISTOL"], "Tools")
+        self.assertEqual(categories["GWR TRAVEL 0001"], "Travel")
+        self.assertEqual(categories["CORNER SHOP"], "Other")
+        self.assertEqual(
+            Expense.objects.get(description="CORNER SHOP").amount, Decimal("3.50")
+        )
+
+    def test_reimport_skips_existing_lines(self):
+        self.run_import(CSV_STATEMENT)
+        result = self.run_import(CSV_STATEMENT)
+
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.duplicates, 5)
+        # The two identical fares on the same day were both kept first time
+        self.assertEqual(
+            Expense.objects.filter(description="GWR TRAVEL 0001").count(), 2
+        )
+
+    def test_ofx_statement(self):
+        result = self.run_import(OFX_STATEMENT, "statement.ofx")
+
+        self.assertEqual((result.income, result.expenses), (1, 1))
+        income = Income.objects.get(user=self.user)
+        self.assertEqual(income.date, date(2024, 6, 1))
+        self.assertEqual(income.description, "ACME LTD Invoice 43")
+        self.assertEqual(
+            Expense.objects.get(date=date(2024, 6, 2)).category, self.tools
+        )
+
+    def test_amounts_too_large_to_store_are_line_errors(self):
+        lines = list(
+            statement(
+                b"Date,Description,Amount\n"
+                b"01/05/2024,FINE,99999999.99\n"
+                b"02/05/2024,TOO BIG,100000000.00\n"
+                b"03/05/2024,ROUNDS UP,99999999.999\n"
+                b"04/05/2024,HUGE," + b"9" * 40 + b"\n"
+            )
+        )
+
+        self.assertEqual(lines[0].amount, Decimal("99999999.99"))
+        self.assertTrue(all(isinstance(line, LineError) for line in lines[1:]))
+        self.assertIn("too large", lines[1].message)
+
+    def test_malformed_csv_is_a_statement_error(self):
+        content = b'Date,Description,Amount\n01/05/2024,"' + b"x" * 200_000 + b'",1\n'
+
+        with self.assertRaises(StatementError):
+            list(statement(content))
+
+    def test_named_money_in_and_out_columns(self):
+        content = (
+            b"Date,Details,Amount,Credits,Debits\n"
+            b"01/05/2024,INVOICE 42,1500.00,500.00,\n"
+            b"02/05/2024,SCREWFIX,1490.00,,10.00\n"
+        )
+        lines = list(
+            statement(content, names={"money_in": "Credits", "money_out": "Debits"})
+        )
+
+        self.assertEqual(
+            [line.amount for line in lines], [Decimal("500.00"), Decimal("-10.00")]
+        )
+
+    def test_period_totals_include_imported_lines(self):
+        self.run_import(CSV_STATEMENT)
+
+        expense_total = PeriodTotal.objects.filter(
+            user=self.user, kind="expense"
+        ).aggregate(total=Sum("amount_total"))["total"]
+        self.assertEqual(expense_total, Decimal("109.49"))
+
+    def test_upload_view(self):
+        self.client.force_login(self.user)
+        url = reverse("bookkeeping:import_statement")
+
+        response = self.client.post(
+            url,
+            {
+                "statement": SimpleUploadedFile("statement.csv", b"just,some\ntext,here\n"),
+                "income_category": self.sales.pk,
+                "expense_category": self.other.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("statement", response.context["form"].errors)
+
+        response = self.client.post(
+            url,
+            {
+                "statement": SimpleUploadedFile(
+                    "statement.csv",
+                    b'Date,Description,Amount\n01/05/2024,"' + b"x" * 200_000 + b'",1\n',
+                ),
+                "income_category": self.sales.pk,
+                "expense_category": self.other.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("statement", response.context["form"].errors)
+
+        response = self.client.post(
+            url,
+            {
+                "statement": SimpleUploadedFile("statement.ofx", OFX_STATEMENT),
+                "income_category": self.sales.pk,
+                "expense_category": self.other.pk,
+            },
+        )
+        self.assertRedirects(response, url)
+        self.assertEqual(Income.objects.filter(user=self.user).count(), 1)
@@ -0,0 +1,144 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from bookkeeping.ledger import _response_key
+from bookkeeping.models import Category, Income, LedgerState
+from bookkeeping.signals import transactions_created
+
+
+class LedgerVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+        self.client.force_login(self.user)
+
+        session = self.client.session
+        session["selected_tax_year"] = "2024-2025"
+        session.save()
+
+    def add_income(self, amount="100.00"):
+        return Income.objects.create(
+            user=self.user,
+            date=date(2024, 5, 1),
+            description="Invoice",
+            amount=Decimal(amount),
+            category=self.sales,
+        )
+
+    def version(self):
+        return LedgerState.objects.get(user=self.user).version
+
+    def test_writes_bump_version(self):
+        self.client.get(reverse("bookkeeping:income_category_csv"))
+        self.assertEqual(self.version(), 0)
+
+        income = self.add_income()
+        self.assertEqual(self.version(), 1)
+
+        income.amount = Decimal("50.00")
+        income.save()
+        income.delete()
+        self.assertEqual(self.version(), 3)
+
+        objs = Income.objects.bulk_create(
+            [
+                Income(
+                    user=self.user,
+                    date=date(2024, 6, 1),
+                    amount=Decimal("1.00"),
+                    category=self.sales,
+                )
+            ]
+        )
+        transactions_created(Income, objs)
+        self.assertEqual(self.version(), 4)
+
+    def test_user_with_transactions_can_be_deleted(self):
+        self.client.get(reverse("bookkeeping:income_category_csv"))
+        self.add_income()
+        self.user.delete()
+        self.assertFalse(LedgerState.objects.exists())
+
+    def test_repeat_download_is_not_modified_then_cached(self):
+        url = reverse("bookkeeping:income_category_csv")
+        self.add_income()
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        with self.assertNumQueries(3):
+            repeat = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(repeat.status_code, 304)
+
+        # No conditional headers: the cached body, without touching PeriodTotal
+        with self.assertNumQueries(3):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached["Content-Disposition"], first["Content-Disposition"])
+
+    def test_write_invalidates_etag_and_cache(self):
+        url = reverse("bookkeeping:combined_category_csv")
+        self.add_income()
+        first = self.client.get(url)
+
+        self.add_income("25.00")
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        self.assertIn(b"125.00", changed.content)
+
+    def test_rebuild_command_bumps_version(self):
+        self.client.get(reverse("bookkeeping:income_category_csv"))
+
+        call_command("rebuild_period_totals", stdout=StringIO())
+        self.assertEqual(self.version(), 1)
+
+        call_command("rebuild_period_totals", user=self.user.email, stdout=StringIO())
+        self.assertEqual(self.version(), 2)
+
+    def test_print_views_are_not_cached(self):
+        url = reverse("bookkeeping:income_category_print")
+        first = self.client.get(url)
+        self.assertFalse(first.has_header("ETag"))
+
+        self.user.first_name = "Ada"
+        self.user.save()
+        self.assertIn(b"Ada", self.client.get(url).content)
+
+    def test_pages_with_a_generation_time_are_not_cached(self):
+        for url in (
+            reverse("bookkeeping:export_by_category", args=["all-expenses"]),
+            reverse("bookkeeping:yearly_profit_csv"),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header("ETag"))
+
+    def test_key_uses_current_tax_year_when_none_selected(self):
+        def key(selected):
+            request = RequestFactory().get("/report/")
+            request.user = self.user
+            request.session = {"selected_tax_year": selected} if selected else {}
+            return _response_key(request)
+
+        with patch(
+            "bookkeeping.ledger.get_current_tax_year", return_value="2024-2025"
+        ):
+            self.assertEqual(key(None), key("2024-2025"))
+        with patch(
+            "bookkeeping.ledger.get_current_tax_year", return_value="2025-2026"
+        ):
+            self.assertNotEqual(key(None), key("2024-2025"))
@@ -0,0 +1,70 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bookkeeping.categories import invalidate_categories
+from bookkeeping.listing import filter_quarter, summarise_list
+from bookkeeping.models import Category, Expense
+
+
+class ListSummaryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.travel = Category.objects.create(name="Travel", category_type="expense")
+
+        for day, amount in [
+            (date(2024, 5, 1), "10.00"),
+            (date(2024, 5, 2), "20.00"),
+            (date(2024, 8, 1), "5.00"),
+        ]:
+            Expense.objects.create(
+                user=self.user,
+                date=day,
+                description="Train",
+                amount=Decimal(amount),
+                vat_amount=Decimal("1.00"),
+                category=self.travel,
+            )
+        invalidate_categories()
+
+    def test_summary_figures(self):
+        summary = summarise_list(Expense.objects.filter(user=self.user), vat=True)
+
+        self.assertEqual(summary.total, Decimal("35.00"))
+        self.assertEqual(summary.vat_total, Decimal("3.00"))
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(summary.quarter_counts, {"2024-Q2": 1, "2024-Q1": 2})
+
+    def test_list_view_queries(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["selected_tax_year"] = "all"
+        session.save()
+        self.client.get("/bookkeeping/expense/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/bookkeeping/expense/?search=train")
+
+        statements = [query["sql"] for query in queries.captured_queries]
+        self.assertEqual(response.context["total_expenses"], Decimal("35.00"))
+        self.assertEqual(response.context["quarters"], ["2024-Q2", "2024-Q1"])
+        # The page shows the summary's count rather than counting again
+        self.assertEqual(response.context["page_obj"].count, 3)
+        # Category choices are cached; the page query joins category itself
+        self.assertFalse(any('FROM "bookkeeping_category"' in sql for sql in statements))
+        self.assertEqual(
+            len([sql for sql in statements if "bookkeeping_expense" in sql]), 2
+        )
+
+    def test_filter_quarter(self):
+        qs = Expense.objects.filter(user=self.user)
+
+        self.assertEqual(filter_quarter(qs, "2024-Q1").count(), 2)
+        self.assertEqual(filter_quarter(qs, "2024-Q2").count(), 1)
+        self.assertEqual(filter_quarter(qs, "not-a-quarter").count(), 0)
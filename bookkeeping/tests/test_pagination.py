@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from bookkeeping.models import Category, Income
+from bookkeeping.pagination import KeysetPaginator
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        sales = Category.objects.create(name="Sales", category_type="income")
+
+        # Repeated dates and amounts so the id tie-breaker matters
+        for index in range(23):
+            Income.objects.create(
+                user=self.user,
+                date=date(2024, 5, 1) + timedelta(days=index // 3),
+                description=f"Invoice {index}",
+                amount=Decimal(index % 4),
+                category=sales,
+            )
+        self.queryset = Income.objects.filter(user=self.user)
+
+    def walk(self, ordering):
+        paginator = KeysetPaginator(self.queryset, 5, ordering=ordering)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_walk_matches_offset_ordering(self):
+        for ordering in ["-date", "date", "-amount", "amount"]:
+            _, pages = self.walk(ordering)
+            seen = [item.pk for page in pages for item in page]
+            tie_breaker = "-id" if ordering.startswith("-") else "id"
+            expected = list(
+                self.queryset.order_by(ordering, tie_breaker).values_list(
+                    "pk", flat=True
+                )
+            )
+            self.assertEqual(seen, expected, ordering)
+            self.assertEqual(len(pages), 5)
+
+    def test_previous_returns_the_same_page(self):
+        paginator, pages = self.walk("-date")
+
+        previous = paginator.get_page(pages[3].previous_cursor)
+
+        self.assertEqual(list(previous), list(pages[2]))
+        self.assertTrue(previous.has_next)
+        self.assertTrue(previous.has_previous)
+        self.assertFalse(paginator.get_page(pages[1].previous_cursor).has_previous)
+
+    def test_deep_page_is_one_query(self):
+        _, pages = self.walk("-date")
+
+        paginator = KeysetPaginator(self.queryset, 5)
+        with self.assertNumQueries(1):
+            paginator.get_page(pages[3].next_cursor)
+
+    def test_invalid_cursor_shows_first_page(self):
+        paginator = KeysetPaginator(self.queryset, 5, ordering="-amount")
+
+        self.assertEqual(
+            list(paginator.get_page("not-a-cursor")), list(paginator.get_page())
+        )
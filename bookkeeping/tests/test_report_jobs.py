@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookkeeping.models import Category, Income, ReportJob
+from bookkeeping.report_jobs import (
+    claim_next_job,
+    delete_expired_jobs,
+    enqueue_report,
+    heartbeat,
+    requeue_stale_jobs,
+    run_job,
+    run_pending_jobs,
+)
+
+
+class ReportJobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.client.force_login(self.user)
+
+        sales = Category.objects.create(name="Sales", category_type="income")
+        Income.objects.create(
+            user=self.user,
+            date=date(2024, 5, 1),
+            description="Invoice 42",
+            amount=Decimal("100.00"),
+            category=sales,
+        )
+
+    def test_queue_run_and_download(self):
+        response = self.client.post(
+            reverse("bookkeeping:report_jobs"),
+            {"report": "income_csv", "tax_year": "all", "format": "csv"},
+        )
+        self.assertRedirects(response, reverse("bookkeeping:report_jobs"))
+        job = ReportJob.objects.get(user=self.user)
+        self.assertEqual(job.status, ReportJob.STATUS_QUEUED)
+
+        status_url = reverse("bookkeeping:report_job_status", args=[job.pk])
+        self.assertIsNone(self.client.get(status_url).json()["download_url"])
+
+        self.assertEqual(len(run_pending_jobs()), 1)
+
+        status = self.client.get(status_url).json()
+        self.assertEqual(status["status"], ReportJob.STATUS_DONE)
+
+        response = self.client.get(status["download_url"])
+        content = b"".join(response.streaming_content).decode()
+        response.close()
+        self.assertIn("income_all.csv", response["Content-Disposition"])
+        self.assertIn("Invoice 42", content)
+
+    def test_identical_pending_job_is_reused(self):
+        first = enqueue_report(self.user, "yearly_profit_csv", "2024-2025")
+        second = enqueue_report(self.user, "yearly_profit_csv", "2024-2025")
+        self.assertEqual(first.pk, second.pk)
+
+        with self.assertRaises(ValueError):
+            enqueue_report(self.user, "yearly_profit_csv", "all")
+
+    def test_job_is_claimed_once(self):
+        enqueue_report(self.user, "income_csv", "all")
+
+        self.assertIsNotNone(claim_next_job())
+        self.assertIsNone(claim_next_job())
+
+    def test_other_users_cannot_see_jobs(self):
+        enqueue_report(self.user, "income_csv", "all")
+        job = run_job(claim_next_job())
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                email="other@example.com", password="secret"
+            )
+        )
+
+        for name in ("report_job_status", "report_job_download"):
+            response = self.client.get(reverse(f"bookkeeping:{name}", args=[job.pk]))
+            self.assertEqual(response.status_code, 404)
+
+    def test_failed_render_is_recorded(self):
+        # Not a real tax year, so the export query cannot be built
+        job = enqueue_report(self.user, "expense_csv", "2024-2030")
+        with self.assertLogs("bookkeeping.report_jobs", "ERROR"):
+            run_job(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+        self.assertIn("2024-2030", job.error)
+        self.assertFalse(job.file)
+
+    def test_housekeeping(self):
+        job = enqueue_report(self.user, "income_csv", "all")
+        claim_next_job()
+        # A long-running job that is still beating is left alone
+        ReportJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+        ReportJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale_jobs(), 1)
+
+        job = run_pending_jobs()[0]
+        path = job.file.path
+        ReportJob.objects.filter(pk=job.pk).update(
+            finished_at=timezone.now() - timedelta(days=30)
+        )
+
+        self.assertEqual(delete_expired_jobs(), 1)
+        self.assertFalse(ReportJob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+
+class HeartbeatTests(TransactionTestCase):
+    def test_running_job_refreshes_heartbeat(self):
+        user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        job = enqueue_report(user, "income_csv", "all")
+        claim_next_job()
+        stale = timezone.now() - timedelta(hours=1)
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=stale)
+
+        with heartbeat(job, interval=0.01):
+            time.sleep(0.2)
+
+        job.refresh_from_db()
+        self.assertGreater(job.heartbeat_at, stale)
+        self.assertEqual(requeue_stale_jobs(), 0)
@@ -0,0 +1,92 @@
+import csv
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bookkeeping.models import Category, Expense, Income, LedgerState
+from bookkeeping.reporting import build_yearly_report
+
+# Session, user and ledger state lookups plus the single report query
+YEARLY_REPORT_MAX_QUERIES = 4
+
+
+class YearlyProfitReportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.client.force_login(self.user)
+
+        session = self.client.session
+        session["selected_tax_year"] = "2024-2025"
+        session.save()
+
+        # As after the user's first report; every write then bumps it
+        LedgerState.objects.create(user=self.user, updated_at=timezone.now())
+
+    def add_transactions(self, categories):
+        for index in range(categories):
+            sales = Category.objects.create(
+                name=f"Sales {index}", category_type="income"
+            )
+            travel = Category.objects.create(
+                name=f"Travel {index}", category_type="expense"
+            )
+            for day in (date(2024, 5, 1), date(2024, 8, 1), date(2025, 2, 1)):
+                Income.objects.create(
+                    user=self.user,
+                    date=day,
+                    description="Invoice",
+                    amount=Decimal("100.00"),
+                    category=sales,
+                )
+                Expense.objects.create(
+                    user=self.user,
+                    date=day,
+                    description="Train",
+                    amount=Decimal("30.00"),
+                    vat_amount=Decimal("5.00"),
+                    category=travel,
+                )
+
+    def get_report(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("bookkeeping:yearly_profit_csv"))
+        self.assertEqual(response.status_code, 200)
+        return list(csv.reader(response.content.decode().splitlines())), queries
+
+    def test_query_count_is_fixed(self):
+        self.add_transactions(1)
+        _, small = self.get_report()
+
+        self.add_transactions(12)
+        rows, large = self.get_report()
+
+        self.assertLessEqual(len(large), YEARLY_REPORT_MAX_QUERIES)
+        self.assertEqual(len(large), len(small))
+        self.assertIn(["Net Profit", "2730.00"], rows)
+
+    def test_sections_agree(self):
+        self.add_transactions(2)
+
+        with self.assertNumQueries(1):
+            report = build_yearly_report(self.user, "2024-2025")
+
+        self.assertEqual(
+            list(report.quarters), ["2024-Q1", "2024-Q2", "2024-Q3", "2024-Q4"]
+        )
+        self.assertEqual(report.quarters["2024-Q3"].income, Decimal("0"))
+        self.assertEqual(report.quarters["2024-Q4"].vat, Decimal("10.00"))
+        self.assertEqual(report.ytd.income, Decimal("600.00"))
+        self.assertEqual(report.ytd.profit, Decimal("420.00"))
+        self.assertEqual(
+            [(c.name, c.total, c.count) for c in report.expense_categories],
+            [("Travel 0", Decimal("90.00"), 3), ("Travel 1", Decimal("90.00"), 3)],
+        )
+        self.assertEqual(report.income_count, 6)
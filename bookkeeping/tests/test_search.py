@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from bookkeeping.models import Category, Expense, Income
+from bookkeeping.search import (
+    ContainsSearchBackend,
+    SQLiteFTSSearchBackend,
+    get_search_backend,
+    search_transactions,
+)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        sales = Category.objects.create(name="Sales", category_type="income")
+
+        def income(description, client="", invoice=""):
+            return Income.objects.create(
+                user=self.user,
+                date=date(2024, 5, 1),
+                description=description,
+                client_name=client,
+                invoice_number=invoice,
+                amount=Decimal("10.00"),
+                category=sales,
+            )
+
+        self.website = income("Website redesign", client="Acme Widgets")
+        self.hosting = income("Hosting renewal", invoice="INV-2041")
+        self.both = income("Website hosting", client="Webster Ltd")
+
+    def search(self, query):
+        return list(search_transactions(Income.objects.all(), query))
+
+    def test_uses_fts_on_sqlite(self):
+        self.assertIsInstance(get_search_backend(Income), SQLiteFTSSearchBackend)
+        self.assertIsInstance(get_search_backend(Expense), SQLiteFTSSearchBackend)
+
+    def test_prefix_and_all_terms_match(self):
+        self.assertCountEqual(self.search("web"), [self.website, self.both])
+        self.assertEqual(self.search("website host"), [self.both])
+        self.assertEqual(self.search("inv-2041"), [self.hosting])
+        self.assertEqual(self.search("acme"), [self.website])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.hosting.description = "Domain transfer"
+        self.hosting.save()
+        self.website.delete()
+
+        self.assertEqual(self.search("hosting"), [self.both])
+        self.assertEqual(self.search("domain"), [self.hosting])
+        self.assertEqual(self.search("redesign"), [])
+
+    def test_ranking_prefers_better_matches(self):
+        results = search_transactions(Income.objects.all(), "hosting").order_by(
+            "search_rank"
+        )
+        ranks = [item.search_rank for item in results]
+
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(len(ranks), 2)
+
+    def test_contains_fallback_matches_same_rows(self):
+        results = ContainsSearchBackend().search(Income.objects.all(), "hosting")
+
+        self.assertCountEqual(results, [self.hosting, self.both])
@@ -0,0 +1,174 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bookkeeping.models import (
+    Category,
+    Expense,
+    Income,
+    PeriodTotal,
+    RecurringEntry,
+    RecurringRunLog,
+)
+from bookkeeping.services import (
+    ClaimLost,
+    _claim_entries,
+    process_due_recurring,
+    run_recurring_for_user,
+)
+
+
+class ProcessDueRecurringTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.rent = Category.objects.create(name="Rent", category_type="expense")
+        RecurringEntry.objects.create(
+            user=self.user,
+            entry_type="expense",
+            category=self.rent,
+            description="Office rent",
+            amount=Decimal("500.00"),
+            vat_rate=Decimal("20.00"),
+            start_date=date(2024, 1, 1),
+            day_of_month=1,
+        )
+
+    def test_catches_up_once(self):
+        today = date(2024, 3, 15)
+
+        processed = process_due_recurring(today)
+        self.assertEqual(len(processed), 1)
+        self.assertEqual(Expense.objects.count(), 3)
+        self.assertEqual(RecurringRunLog.objects.get().last_run_date, today)
+
+        # Every entry has moved past today, so nothing is created again
+        self.assertEqual(process_due_recurring(today), [])
+        self.assertEqual(Expense.objects.count(), 3)
+
+    def test_entry_added_after_a_run_is_processed_the_same_day(self):
+        today = date(2024, 3, 15)
+        process_due_recurring(today)
+
+        RecurringEntry.objects.create(
+            user=self.user,
+            entry_type="expense",
+            category=self.rent,
+            description="Storage unit",
+            amount=Decimal("40.00"),
+            start_date=date(2024, 3, 10),
+            day_of_month=10,
+        )
+
+        self.assertEqual(len(process_due_recurring(today)), 1)
+        self.assertTrue(Expense.objects.filter(description="Storage unit").exists())
+
+    def test_entry_moved_by_another_run_is_not_claimed(self):
+        entry = RecurringEntry.objects.get()
+        entry.next_run = date(2024, 1, 1)
+
+        # Another worker processed the entry after this one read it
+        RecurringEntry.objects.filter(pk=entry.pk).update(next_run=date(2024, 4, 1))
+
+        with self.assertRaises(ClaimLost):
+            _claim_entries([(entry, date(2024, 1, 1))])
+
+    @patch(
+        "bookkeeping.management.commands.run_recurring.timezone.localdate",
+        return_value=date(2024, 3, 25),
+    )
+    def test_since_selects_entries_but_creates_all_their_occurrences(self, localdate):
+        # Next due on 20 February; the January rent entry is older than --since
+        RecurringEntry.objects.create(
+            user=self.user,
+            entry_type="expense",
+            category=self.rent,
+            description="Storage unit",
+            amount=Decimal("40.00"),
+            start_date=date(2024, 2, 20),
+            day_of_month=20,
+        )
+
+        call_command(
+            "run_recurring",
+            user="owner@example.com",
+            since="2024-02-15",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            list(Expense.objects.order_by("date").values_list("date", flat=True)),
+            [date(2024, 2, 20), date(2024, 3, 20)],
+        )
+        # Not selected, so not advanced: a full run still creates every month
+        rent = RecurringEntry.objects.get(description="Office rent")
+        self.assertEqual(rent.next_run, date(2024, 1, 1))
+
+        call_command("run_recurring", stdout=StringIO())
+        self.assertEqual(
+            Expense.objects.filter(description="Office rent").count(), 3
+        )
+
+    def test_dashboard_does_not_create_entries(self):
+        self.client.force_login(self.user)
+        self.client.get("/dashboard/")
+
+        self.assertFalse(Expense.objects.exists())
+
+
+class RunRecurringForUserTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+        self.rent = Category.objects.create(name="Rent", category_type="expense")
+
+        for index in range(30):
+            income = index % 2 == 0
+            RecurringEntry.objects.create(
+                user=self.user,
+                entry_type="income" if income else "expense",
+                category=self.sales if income else self.rent,
+                description=f"Entry {index}",
+                amount=Decimal("9.99"),
+                vat_rate=Decimal("0.00") if income else Decimal("20.00"),
+                start_date=date(2024, 1, 1),
+                day_of_month=index % 28 + 1,
+            )
+
+    def test_year_catch_up_is_batched(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = run_recurring_for_user(self.user, today=date(2024, 12, 31))
+
+        statements = [
+            query
+            for query in queries.captured_queries
+            if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+        ]
+        self.assertEqual(len(results), 360)
+        self.assertLessEqual(len(statements), 14)
+
+        self.assertEqual(Income.objects.count(), 180)
+        expense = Expense.objects.first()
+        self.assertEqual(expense.vat_amount, Decimal("2.00"))
+        self.assertEqual(
+            expense.quarter, f"{expense.tax_year}-Q{expense.quarter_no}"
+        )
+
+        entry = RecurringEntry.objects.get(description="Entry 0")
+        self.assertEqual(entry.last_run, date(2024, 12, 1))
+        self.assertEqual(entry.next_run, date(2025, 1, 1))
+
+        income_totals = PeriodTotal.objects.filter(kind="income")
+        self.assertEqual(income_totals.aggregate(n=Sum("entry_count"))["n"], 180)
+        self.assertEqual(run_recurring_for_user(self.user, date(2024, 12, 31)), [])
@@ -0,0 +1,69 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from bookkeeping.models import Category, Expense, Income, PeriodTotal
+from bookkeeping.totals import rebuild_period_totals
+
+
+def snapshot():
+    return sorted(
+        PeriodTotal.objects.values_list(
+            "kind", "tax_year", "quarter", "month", "category_id",
+            "amount_total", "vat_total", "entry_count",
+        )
+    )
+
+
+class PeriodTotalTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+        self.fees = Category.objects.create(name="Fees", category_type="income")
+        self.travel = Category.objects.create(name="Travel", category_type="expense")
+
+    def test_incremental_matches_rebuild(self):
+        income = Income.objects.create(
+            user=self.user,
+            date=date(2024, 4, 3),
+            description="Invoice",
+            amount=Decimal("100.00"),
+            category=self.sales,
+        )
+        Income.objects.create(
+            user=self.user,
+            date=date(2024, 4, 20),
+            description="Invoice",
+            amount=Decimal("40.00"),
+            category=self.sales,
+        )
+        expense = Expense.objects.create(
+            user=self.user,
+            date=date(2024, 5, 1),
+            description="Train",
+            amount=Decimal("50.00"),
+            vat_amount=Decimal("10.00"),
+            category=self.travel,
+        )
+
+        # Move the first income into another period and category
+        income.date = date(2024, 6, 1)
+        income.category = self.fees
+        income.amount = Decimal("120.00")
+        income.save()
+
+        expense.delete()
+
+        incremental = snapshot()
+        rebuild_period_totals()
+
+        self.assertEqual(incremental, snapshot())
+        self.assertFalse(PeriodTotal.objects.filter(kind="expense").exists())
+        self.assertEqual(
+            PeriodTotal.objects.get(category=self.fees).amount_total,
+            Decimal("120.00"),
+        )
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from bookkeeping.models import Category, Income
+from bookkeeping.periods import Quarter, TaxPeriod
+from bookkeeping.utils import (
+    get_available_tax_years,
+    get_current_tax_year,
+    get_tax_period_from_date,
+)
+
+
+class TaxPeriodTests(TestCase):
+    def test_quarter_boundaries(self):
+        cases = {
+            date(2024, 4, 5): (2023, 4),
+            date(2024, 4, 6): (2024, 1),
+            date(2024, 7, 5): (2024, 1),
+            date(2024, 7, 6): (2024, 2),
+            date(2024, 10, 6): (2024, 3),
+            date(2025, 1, 5): (2024, 3),
+            date(2025, 1, 6): (2024, 4),
+        }
+        for day, period in cases.items():
+            self.assertEqual(get_tax_period_from_date(day), period, day)
+
+    def test_every_day_matches_quarter_bounds(self):
+        period = TaxPeriod.from_label("2023-2024")
+        self.assertIs(period, TaxPeriod.for_date(date(2023, 4, 6)))
+
+        day = period.start
+        while day <= period.end:
+            quarter = Quarter.for_date(day)
+            self.assertEqual(quarter.tax_period, period)
+            self.assertTrue(quarter.start <= day <= quarter.end, day)
+            day += timedelta(days=1)
+
+        self.assertEqual(
+            Quarter.from_code("2023-Q4").bounds, (date(2024, 1, 6), date(2024, 4, 5))
+        )
+        with self.assertRaises(ValueError):
+            TaxPeriod.from_label("2023-2025")
+
+    def test_save_stores_integer_periods(self):
+        income = Income.objects.create(
+            user=get_user_model().objects.create_user(email="p@example.com"),
+            date="2025-01-06",
+            description="Invoice",
+            amount=Decimal("10.00"),
+            category=Category.objects.create(name="Sales", category_type="income"),
+        )
+        self.assertEqual(
+            (income.quarter, income.tax_year, income.quarter_no), ("2024-Q4", 2024, 4)
+        )
+
+
+class AvailableTaxYearsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="owner@example.com", password="secret"
+        )
+        self.sales = Category.objects.create(name="Sales", category_type="income")
+
+    def add_income(self, day):
+        return Income.objects.create(
+            user=self.user,
+            date=day,
+            description="Invoice",
+            amount=Decimal("10.00"),
+            category=self.sales,
+        )
+
+    def test_defaults_to_current_tax_year(self):
+        self.assertEqual(get_available_tax_years(self.user), [get_current_tax_year()])
+
+    def test_cached_and_invalidated_on_write(self):
+        self.add_income(date(2023, 5, 1))
+        self.assertEqual(get_available_tax_years(self.user), ["2023-2024"])
+
+        with self.assertNumQueries(0):
+            get_available_tax_years(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            income = self.add_income(date(2024, 4, 5))
+        self.assertEqual(get_available_tax_years(self.user), ["2023-2024"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            income.date = date(2024, 4, 6)
+            income.save()
+            # Not cleared until the change commits
+            with self.assertNumQueries(0):
+                get_available_tax_years(self.user)
+        self.assertEqual(
+            get_available_tax_years(self.user), ["2024-2025", "2023-2024"]
+        )
@@ -0,0 +1,232 @@
+# bookkeeping/totals.py
+"""
+Incremental maintenance of the PeriodTotal table.
+
+Each Income/Expense row contributes its amount, VAT and a count of one to
+exactly one PeriodTotal bucket: (user, kind, tax year, quarter, month,
+category). Writes are applied as deltas so the cost of keeping the table
+up to date is independent of how many transactions a user has.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from bookkeeping.models import Expense, Income, PeriodTotal
+from bookkeeping.periods import Quarter, TaxPeriod, month_start
+
+KIND_BY_MODEL = {
+    Income: "income",
+    Expense: "expense",
+}
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+
+def bucket_for(kind, user_id, entry_date, quarter, category_id):
+    """Return the PeriodTotal lookup for a single transaction."""
+    entry_date = _as_date(entry_date)
+    return (
+        user_id,
+        kind,
+        TaxPeriod.for_date(entry_date).label,
+        quarter,
+        month_start(entry_date),
+        category_id,
+    )
+
+
+def transaction_deltas(model, objs, sign=1):
+    """
+    Collapse transactions into per-bucket deltas.
+
+    ``sign`` is 1 when the transactions are being added and -1 when they
+    are being removed.
+    """
+    kind = KIND_BY_MODEL[model]
+    deltas = defaultdict(lambda: [Decimal("0.00"), Decimal("0.00"), 0])
+
+    for obj in objs:
+        key = bucket_for(kind, obj.user_id, obj.date, obj.quarter, obj.category_id)
+        delta = deltas[key]
+        delta[0] += sign * Decimal(obj.amount)
+        delta[1] += sign * Decimal(getattr(obj, "vat_amount", 0) or 0)
+        delta[2] += sign
+
+    return deltas
+
+
+def _apply(deltas):
+    user_ids = {key[0] for key in deltas}
+    months = {key[4] for key in deltas}
+
+    existing = {
+        (
+            row.user_id,
+            row.kind,
+            row.tax_year,
+            row.quarter,
+            row.month,
+            row.category_id,
+        ): row
+        for row in PeriodTotal.objects.select_for_update().filter(
+            user_id__in=user_ids, month__in=months
+        )
+    }
+
+    to_create, to_update, to_delete = [], [], []
+
+    for key, (amount, vat, count) in deltas.items():
+        row = existing.get(key)
+
+        if row is None:
+            if count > 0:
+                user_id, kind, tax_year, quarter, month, category_id = key
+                to_create.append(
+                    PeriodTotal(
+                        user_id=user_id,
+                        kind=kind,
+                        tax_year=tax_year,
+                        quarter=quarter,
+                        month=month,
+                        category_id=category_id,
+                        amount_total=amount,
+                        vat_total=vat,
+                        entry_count=count,
+                    )
+                )
+            continue
+
+        row.amount_total += amount
+        row.vat_total += vat
+        row.entry_count += count
+
+        if row.entry_count <= 0:
+            to_delete.append(row.pk)
+        else:
+            to_update.append(row)
+
+    if to_update:
+        PeriodTotal.objects.bulk_update(
+            to_update, ["amount_total", "vat_total", "entry_count"], batch_size=500
+        )
+    if to_create:
+        PeriodTotal.objects.bulk_create(to_create, batch_size=500)
+    if to_delete:
+        PeriodTotal.objects.filter(pk__in=to_delete).delete()
+
+
+def apply_deltas(deltas):
+    """
+    Apply ``{bucket: [amount, vat, count]}`` deltas to PeriodTotal.
+
+    The affected buckets are locked and read in one query, then written back
+    with a bulk update, a bulk create and a delete for emptied buckets.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    try:
+        with transaction.atomic():
+            _apply(deltas)
+    except IntegrityError:
+        # Another process created one of the buckets first; apply against it
+        with transaction.atomic():
+            _apply(deltas)
+
+
+def record_transactions(model, objs, sign=1):
+    """Add (or with ``sign=-1`` remove) transactions from the totals."""
+    apply_deltas(transaction_deltas(model, objs, sign))
+
+
+def rebuild_period_totals(users=None):
+    """
+    Recalculate PeriodTotal from the Income and Expense tables.
+
+    Args:
+        users: Optional iterable of users to rebuild. All users when omitted.
+
+    Returns:
+        int: Number of PeriodTotal rows written.
+    """
+    created = 0
+
+    with transaction.atomic():
+        totals = PeriodTotal.objects.all()
+        if users is not None:
+            totals = totals.filter(user__in=users)
+        totals.delete()
+
+        for model, kind in KIND_BY_MODEL.items():
+            qs = model.objects.all()
+            if users is not None:
+                qs = qs.filter(user__in=users)
+
+            vat = Sum("vat_amount") if model is Expense else None
+            rows = (
+                qs.annotate(period_month=TruncMonth("date"))
+                .values(
+                    "user_id", "tax_year", "quarter_no", "period_month", "category_id"
+                )
+                .annotate(
+                    amount_sum=Sum("amount"),
+                    entries=Count("id"),
+                    **({"vat_sum": vat} if vat else {}),
+                )
+                .order_by()
+            )
+
+            # A calendar month can straddle two tax years (1-5 April), so the
+            # tax year is taken from the row's period columns, not the month.
+            objs = []
+            for row in rows.iterator():
+                row_quarter = Quarter(row["tax_year"], row["quarter_no"])
+                objs.append(
+                    PeriodTotal(
+                        user_id=row["user_id"],
+                        kind=kind,
+                        tax_year=row_quarter.tax_period.label,
+                        quarter=row_quarter.code,
+                        month=row["period_month"],
+                        category_id=row["category_id"],
+                        amount_total=row["amount_sum"] or 0,
+                        vat_total=row.get("vat_sum") or 0,
+                        entry_count=row["entries"],
+                    )
+                )
+
+            PeriodTotal.objects.bulk_create(objs, batch_size=500)
+            created += len(objs)
+
+    return created
+
+
+def category_totals(user, kind, tax_year=None):
+    """
+    Per-category totals for one kind, optionally limited to a tax year.
+
+    Rows are dicts with ``category__name``, ``total``, ``vat`` and ``count``.
+    """
+    qs = PeriodTotal.objects.filter(user=user, kind=kind)
+    if tax_year:
+        qs = qs.filter(tax_year=tax_year)
+
+    return (
+        qs.values("category__name")
+        .annotate(
+            total=Sum("amount_total"),
+            vat=Sum("vat_total"),
+            count=Sum("entry_count"),
+        )
+        .order_by("category__name")
+    )
@@ -5,6 +5,8 @@ from bookkeeping.views import (
     expense,
     recurring,
     exports,
+    imports,
+    jobs,
     reports,
 )
 
@@ -34,6 +36,14 @@ urlpatterns = [
     ),
     path("expense/export/csv/", expense.export_expense_csv, name="expense_export_csv"),
     # ------------------------------
+    # BANK STATEMENT IMPORT
+    # ------------------------------
+    path(
+        "import/statement/",
+        imports.import_bank_statement,
+        name="import_statement",
+    ),
+    # ------------------------------
     # RECURRING
     # ------------------------------
     path("recurring/", recurring.recurring_list, name="recurring_list"),
@@ -93,4 +103,18 @@ urlpatterns = [
         reports.yearly_profit_report_csv,
         name="yearly_profit_csv",
     ),
+    # ------------------------------
+    # BACKGROUND REPORTS
+    # ------------------------------
+    path("reports/jobs/", jobs.report_jobs, name="report_jobs"),
+    path(
+        "reports/jobs/<uuid:pk>/status/",
+        jobs.report_job_status,
+        name="report_job_status",
+    ),
+    path(
+        "reports/jobs/<uuid:pk>/download/",
+        jobs.report_job_download,
+        name="report_job_download",
+    ),
 ]
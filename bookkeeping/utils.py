@@ -1,9 +1,13 @@
 # bookkeeping/utils.py
 """
-Tax year utilities for UK tax year management (6 April - 5 April)
+Tax year utilities for UK tax year management (6 April - 5 April), and
+small generic helpers shared across the app.
 """
 
 from datetime import date
+from itertools import islice
+
+from bookkeeping.periods import TaxPeriod, period_for_date
 
 
 def get_current_tax_year():
@@ -21,45 +25,64 @@ def get_tax_year_from_date(input_date):
     """
     Calculate UK tax year from a given date.
     """
-    if input_date.month < 4 or (input_date.month == 4 and input_date.day < 6):
-        return f"{input_date.year - 1}-{input_date.year}"
-    else:
-        return f"{input_date.year}-{input_date.year + 1}"
+    return TaxPeriod.for_date(input_date).label
+
+
+def get_tax_period_from_date(input_date):
+    """
+    Return ``(tax_year, quarter_no)`` for a date.
+
+    ``tax_year`` is the year the tax year starts in (2024 for 2024-2025)
+    and ``quarter_no`` runs 1-4 from 6 April.
+    """
+    return period_for_date(input_date)
 
 
 def get_tax_year_bounds(tax_year_string):
     """
     Given '2024-2025', return the start and end dates for that tax year.
     """
-    start_year = int(tax_year_string.split("-")[0])
-    end_year = int(tax_year_string.split("-")[1])
+    return TaxPeriod.from_label(tax_year_string).bounds
 
-    return date(start_year, 4, 6), date(end_year, 4, 5)
+
+def tax_years_cache_key(user_id):
+    return f"bookkeeping:tax_years:{user_id}"
 
 
 def get_available_tax_years(user):
     """
     Get all tax years that contain data for this user.
-    """
-    from bookkeeping.models import Income, Expense
 
-    all_income_dates = Income.objects.filter(user=user).values_list("date", flat=True)
-    all_expense_dates = Expense.objects.filter(user=user).values_list("date", flat=True)
-
-    all_dates = list(all_income_dates) + list(all_expense_dates)
+    The list is read from the distinct PeriodTotal tax years and cached
+    per user; invalidate_tax_years() clears it when transactions change.
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+    from bookkeeping.models import PeriodTotal
+
+    key = tax_years_cache_key(user.pk)
+    tax_years = cache.get(key)
+
+    if tax_years is None:
+        tax_years = list(
+            PeriodTotal.objects.filter(user=user)
+            .values_list("tax_year", flat=True)
+            .distinct()
+            .order_by("-tax_year")
+        )
+        cache.set(key, tax_years, getattr(settings, "TAX_YEAR_CACHE_TIMEOUT", 300))
 
-    if not all_dates:
+    if not tax_years:
         return [get_current_tax_year()]
 
-    tax_years = set()
-    for d in all_dates:
-        if d:
-            tax_years.add(get_tax_year_from_date(d))
+    return tax_years
 
-    if not tax_years:
-        return [get_current_tax_year()]
 
-    return sorted(list(tax_years), reverse=True)
+def invalidate_tax_years(user_id):
+    """Forget the cached tax years for a user."""
+    from django.core.cache import cache
+
+    cache.delete(tax_years_cache_key(user_id))
 
 
 def format_tax_year_display(tax_year_string):
@@ -69,6 +92,11 @@ def format_tax_year_display(tax_year_string):
 def get_tax_year_label(tax_year_string):
     if not tax_year_string:
         return ""
-    start_year = tax_year_string.split("-")[0]
-    end_year = tax_year_string.split("-")[1][-2:]
-    return f"{start_year}/{end_year}"
+    return TaxPeriod.from_label(tax_year_string).short_label
+
+
+def chunked(rows, size):
+    """Split an iterable of rows into lists of at most ``size`` rows."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
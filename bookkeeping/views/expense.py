@@ -1,13 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q, Sum
-from django.http import HttpResponse
-import csv
 
-from bookkeeping.models import Expense, Category
+from bookkeeping.ledger import ledger_condition
+from bookkeeping.pagination import (
+    DEFAULT_ORDERING,
+    RELEVANCE_ORDERING,
+    KeysetPaginator,
+)
+from bookkeeping.search import search_transactions
+from bookkeeping.categories import category_choices
+from bookkeeping.listing import filter_quarter, summarise_list
+from bookkeeping.models import Expense
 from bookkeeping.forms import ExpenseForm
+from bookkeeping.exporting import (
+    EXPENSE_EXPORT_COLUMNS,
+    expense_export_rows,
+    export_response,
+)
 
 
 # ===========================
@@ -31,14 +41,12 @@ def expense_list(request):
     # Search
     search = request.GET.get("search")
     if search:
-        qs = qs.filter(
-            Q(description__icontains=search) | Q(supplier_name__icontains=search)
-        )
+        qs = search_transactions(qs, search)
 
     # Quarter
     quarter = request.GET.get("quarter")
     if quarter:
-        qs = qs.filter(quarter=quarter)
+        qs = filter_quarter(qs, quarter)
 
     # Category
     category_id = request.GET.get("category")
@@ -61,30 +69,27 @@ def expense_list(request):
     elif receipt_filter == "no":
         qs = qs.filter(receipt="")
 
-    # Ordering
-    order_by = request.GET.get("order_by", "-date")
-    qs = qs.order_by(order_by)
-
-    # Totals
-    totals = qs.aggregate(total=Sum("amount"), total_vat=Sum("vat_amount"))
-    total_expenses = totals["total"] or 0
-    total_vat = totals["total_vat"] or 0
+    # Totals, count and quarter options in one grouped query
+    summary = summarise_list(qs, vat=True)
 
-    paginator = Paginator(qs, 20)
-    page = paginator.get_page(request.GET.get("page"))
-
-    # ⚠️ FIX: Get quarters from the FILTERED queryset
-    quarters = qs.values_list("quarter", flat=True).distinct().order_by("-quarter")
+    # Ordering and keyset pagination
+    # Search results default to most relevant first
+    order_by = request.GET.get(
+        "order_by", RELEVANCE_ORDERING if search else DEFAULT_ORDERING
+    )
+    paginator = KeysetPaginator(qs, 20, ordering=order_by, count=summary.count)
+    page = paginator.get_page(request.GET.get("cursor"))
 
     return render(
         request,
         "bookkeeping/expense/expense_list.html",
         {
             "expense_list": page,
-            "total_expenses": total_expenses,
-            "total_vat": total_vat,
-            "expense_categories": Category.objects.filter(category_type="expense"),
-            "quarters": quarters,
+            "total_expenses": summary.total,
+            "total_vat": summary.vat_total,
+            "expense_categories": category_choices("expense"),
+            # ⚠️ FIX: Quarters come from the FILTERED queryset
+            "quarters": summary.quarters,
             # ⚠️ FIX: Pass selected_tax_year to template
             "selected_tax_year": selected_tax_year,
             # Filter persistence
@@ -94,7 +99,8 @@ def expense_list(request):
             "filter_category": category_id,
             "filter_quarter": quarter,
             "filter_has_receipt": receipt_filter,
-            "order_by": order_by,
+            "order_by": paginator.ordering,
+            "page_obj": page,
         },
     )
 
@@ -190,44 +196,20 @@ def expense_delete(request, pk):
 # EXPORT EXPENSE CSV
 # ===========================
 @login_required
+@ledger_condition
 def export_expense_csv(request):
-    from bookkeeping.utils import get_tax_year_bounds
-
     # Get selected tax year
     selected_tax_year = request.session.get("selected_tax_year", "all")
 
-    # Base queryset
-    expenses = Expense.objects.filter(user=request.user)
-
-    # Filter by tax year if selected and not "all"
-    if selected_tax_year and selected_tax_year != "all":
-        tax_year_start, tax_year_end = get_tax_year_bounds(selected_tax_year)
-        expenses = expenses.filter(date__gte=tax_year_start, date__lte=tax_year_end)
-
-    expenses = expenses.order_by("-date")
-
     # Create filename with tax year
     year_suffix = (
         selected_tax_year.replace("-", "_") if selected_tax_year != "all" else "all"
     )
-    filename = f"expenses_{year_suffix}.csv"
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-    writer.writerow(["Date", "Description", "Supplier", "Amount", "VAT", "Category"])
-
-    for item in expenses:
-        writer.writerow(
-            [
-                item.date,
-                item.description,
-                item.supplier_name or "",
-                item.amount,
-                item.vat_amount,
-                item.category.name if item.category else "",
-            ]
-        )
+    filename = f"expenses_{year_suffix}"
 
-    return response
+    return export_response(
+        request,
+        filename,
+        EXPENSE_EXPORT_COLUMNS,
+        expense_export_rows(request.user, selected_tax_year),
+    )
@@ -1,14 +1,26 @@
 # bookkeeping/views/exports.py
 
-from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
+from django.db.models import Value
+from django.http import Http404
+from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
-from datetime import datetime
-import csv
 
-from bookkeeping.models import Category, Income, Expense
-from bookkeeping.utils import get_current_tax_year, get_tax_year_bounds
+from bookkeeping.ledger import ledger_condition
+from bookkeeping.categories import get_category_by_slug, get_category_registry
+from bookkeeping.export_formats import DATE, DECIMAL, EXPORT_FORMATS, Column
+from bookkeeping.exporting import export_response, export_values
+from bookkeeping.models import Income, Expense
+from bookkeeping.reporting import expense_print_context
+from bookkeeping.utils import get_current_tax_year
+
+CATEGORY_EXPORT_COLUMNS = (
+    Column("Type"),
+    Column("Date", DATE, text_format="%d/%m/%Y"),
+    Column("Description"),
+    Column("Amount", DECIMAL),
+    Column("Category"),
+    Column("Supplier/Client"),
+)
 
 
 # ----------------------------------------------------
@@ -16,13 +28,14 @@ from bookkeeping.utils import get_current_tax_year, get_tax_year_bounds
 # ----------------------------------------------------
 @login_required
 def export_categories_screen(request):
-    categories = Category.objects.filter(is_active=True).order_by(
-        "category_type", "name"
+    categories = sorted(
+        (c for c in get_category_registry().all() if c.is_active),
+        key=lambda c: (c.category_type, c.name),
     )
     return render(
         request,
         "bookkeeping/export_categories.html",
-        {"categories": categories},
+        {"categories": categories, "export_formats": EXPORT_FORMATS.values()},
     )
 
 
@@ -30,6 +43,7 @@ def export_categories_screen(request):
 # EXPORT TRANSACTIONS FOR ONE CATEGORY (CSV)
 # ----------------------------------------------------
 @login_required
+@ledger_condition
 def export_category_csv(request, slug):
     user = request.user
 
@@ -37,78 +51,40 @@ def export_category_csv(request, slug):
     selected_tax_year = request.session.get("selected_tax_year")
     if not selected_tax_year:
         selected_tax_year = get_current_tax_year()
-    tax_year_start, tax_year_end = get_tax_year_bounds(selected_tax_year)
 
     # Handle special "all-expenses" case
     if slug == "all-expenses":
-        expenses = (
-            Expense.objects.filter(
-                user=user, date__gte=tax_year_start, date__lte=tax_year_end
-            )
-            .select_related("category")
-            .order_by("-date")
-        )
-        incomes = Income.objects.none()
-        filename = f"all-expenses-{selected_tax_year}.csv"
-        category_name = "All Expenses"
+        category = None
+        sources = [("Expense", Expense, "supplier_name")]
+        filename = f"all-expenses-{selected_tax_year}"
     else:
-        category = get_object_or_404(Category, slug=slug)
-        category_name = category.name
-
-        expenses = Expense.objects.filter(
-            user=user,
-            category=category,
-            date__gte=tax_year_start,
-            date__lte=tax_year_end,
-        ).order_by("-date")
-
-        incomes = Income.objects.filter(
-            user=user,
-            category=category,
-            date__gte=tax_year_start,
-            date__lte=tax_year_end,
-        ).order_by("-date")
-
-        filename = f"{category.slug}-{selected_tax_year}.csv"
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        ["Type", "Date", "Description", "Amount", "Category", "Supplier/Client"]
-    )
+        category = get_category_by_slug(slug)
+        if category is None:
+            raise Http404("No category matches the given query.")
+        sources = [
+            ("Income", Income, "client_name"),
+            ("Expense", Expense, "supplier_name"),
+        ]
+        filename = f"{category.slug}-{selected_tax_year}"
+
+    def rows():
+        for label, model, party in sources:
+            yield from export_values(
+                model,
+                user,
+                ("entry_type", "date", "description", "amount", "category__name", party),
+                selected_tax_year,
+                category,
+                entry_type=Value(label),
+            )
 
-    for item in incomes:
-        writer.writerow(
-            [
-                "Income",
-                item.date.strftime("%d/%m/%Y"),
-                item.description,
-                f"{item.amount:.2f}",
-                item.category.name if item.category else "",
-                item.client_name or "",
-            ]
-        )
-
-    for item in expenses:
-        writer.writerow(
-            [
-                "Expense",
-                item.date.strftime("%d/%m/%Y"),
-                item.description,
-                f"{item.amount:.2f}",
-                item.category.name if item.category else "",
-                item.supplier_name or "",
-            ]
-        )
-
-    return response
+    return export_response(request, filename, CATEGORY_EXPORT_COLUMNS, rows())
 
 
 # ----------------------------------------------------
 # EXPORT BY CATEGORY (PRINT VIEW)
 # ----------------------------------------------------
+# Not cached or conditional, like the other print views
 @login_required
 def export_by_category(request, slug):
     user = request.user
@@ -117,62 +93,17 @@ def export_by_category(request, slug):
     selected_tax_year = request.session.get("selected_tax_year")
     if not selected_tax_year:
         selected_tax_year = get_current_tax_year()
-    tax_year_start, tax_year_end = get_tax_year_bounds(selected_tax_year)
 
     # Handle special "all-expenses" case
     if slug == "all-expenses":
-        expenses = (
-            Expense.objects.filter(
-                user=user, date__gte=tax_year_start, date__lte=tax_year_end
-            )
-            .select_related("category")
-            .order_by("category__name", "-date")
-        )
-        category_name = "All Expenses"
+        category = None
     else:
-        category = get_object_or_404(Category, slug=slug)
-        expenses = (
-            Expense.objects.filter(
-                user=user,
-                category=category,
-                date__gte=tax_year_start,
-                date__lte=tax_year_end,
-            )
-            .select_related("category")
-            .order_by("-date")
-        )
-        category_name = category.name
-
-    # Calculate totals
-    total_amount = expenses.aggregate(total=Sum("amount"))["total"] or 0
-    total_vat = expenses.aggregate(total=Sum("vat_amount"))["total"] or 0
-
-    # Group expenses by category for the "all-expenses" view
-    expenses_by_category = {}
-    if slug == "all-expenses":
-        for expense in expenses:
-            cat_name = expense.category.name if expense.category else "Uncategorised"
-            if cat_name not in expenses_by_category:
-                expenses_by_category[cat_name] = {
-                    "items": [],
-                    "total": 0,
-                    "vat_total": 0,
-                }
-            expenses_by_category[cat_name]["items"].append(expense)
-            expenses_by_category[cat_name]["total"] += expense.amount
-            expenses_by_category[cat_name]["vat_total"] += expense.vat_amount or 0
+        category = get_category_by_slug(slug)
+        if category is None:
+            raise Http404("No category matches the given query.")
 
     return render(
         request,
         "bookkeeping/reports/expenses_by_category_print.html",
-        {
-            "expenses": expenses,
-            "expenses_by_category": expenses_by_category,
-            "category_name": category_name,
-            "is_all_expenses": slug == "all-expenses",
-            "total_amount": total_amount,
-            "total_vat": total_vat,
-            "tax_year": selected_tax_year,
-            "today": datetime.now(),
-        },
+        expense_print_context(user, selected_tax_year, category),
     )
@@ -0,0 +1,54 @@
+# bookkeeping/views/imports.py
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+
+from bookkeeping.forms import StatementImportForm
+from bookkeeping.importing import StatementError, import_statement, parse_statement
+
+
+def import_summary(result):
+    """One-line summary of an ``ImportResult`` for the messages banner."""
+    parts = [f"Imported {result.income} income and {result.expenses} expenses"]
+    if result.duplicates:
+        parts.append(f"{result.duplicates} already in your records were skipped")
+    if result.uncategorised:
+        parts.append(f"{result.uncategorised} were given the default categories")
+    return "; ".join(parts) + "."
+
+
+# ===========================
+# IMPORT BANK STATEMENT
+# ===========================
+@login_required
+def import_bank_statement(request):
+    result = None
+
+    if request.method == "POST":
+        form = StatementImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                result = import_statement(
+                    request.user,
+                    parse_statement(
+                        form.cleaned_data["statement"], form.column_names()
+                    ),
+                    form.cleaned_data["income_category"],
+                    form.cleaned_data["expense_category"],
+                )
+            except StatementError as e:
+                form.add_error("statement", str(e))
+            else:
+                messages.success(request, import_summary(result))
+                if not result.skipped:
+                    return redirect("bookkeeping:import_statement")
+    else:
+        form = StatementImportForm()
+
+    # Lines that could not be read are listed under the form
+    return render(
+        request,
+        "bookkeeping/import_statement.html",
+        {"form": form, "result": result},
+    )
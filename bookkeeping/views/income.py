@@ -1,12 +1,22 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q, Sum
-from bookkeeping.models import Income, Category
+from bookkeeping.ledger import ledger_condition
+from bookkeeping.pagination import (
+    DEFAULT_ORDERING,
+    RELEVANCE_ORDERING,
+    KeysetPaginator,
+)
+from bookkeeping.search import search_transactions
+from bookkeeping.categories import category_choices
+from bookkeeping.listing import filter_quarter, summarise_list
+from bookkeeping.models import Income
 from bookkeeping.forms import IncomeForm
-import csv
-from django.http import HttpResponse
+from bookkeeping.exporting import (
+    INCOME_EXPORT_COLUMNS,
+    income_export_rows,
+    export_response,
+)
 
 
 # ===========================
@@ -30,15 +40,11 @@ def income_list(request):
     # Additional filters
     search = request.GET.get("search")
     if search:
-        qs = qs.filter(
-            Q(description__icontains=search)
-            | Q(client_name__icontains=search)
-            | Q(invoice_number__icontains=search)
-        )
+        qs = search_transactions(qs, search)
 
     quarter = request.GET.get("quarter")
     if quarter:
-        qs = qs.filter(quarter=quarter)
+        qs = filter_quarter(qs, quarter)
 
     category_id = request.GET.get("category")
     if category_id:
@@ -52,22 +58,22 @@ def income_list(request):
     if date_to:
         qs = qs.filter(date__lte=date_to)
 
-    order_by = request.GET.get("order_by", "-date")
-    qs = qs.order_by(order_by)
+    # Totals, count and quarter options in one grouped query
+    summary = summarise_list(qs)
 
-    total_income = qs.aggregate(total=Sum("amount"))["total"] or 0
-
-    paginator = Paginator(qs, 20)
-    page = paginator.get_page(request.GET.get("page"))
-
-    # ⚠️ FIX: Get quarters from the FILTERED queryset, not all user income
-    quarters = qs.values_list("quarter", flat=True).distinct().order_by("-quarter")
+    # Search results default to most relevant first
+    order_by = request.GET.get(
+        "order_by", RELEVANCE_ORDERING if search else DEFAULT_ORDERING
+    )
+    paginator = KeysetPaginator(qs, 20, ordering=order_by, count=summary.count)
+    page = paginator.get_page(request.GET.get("cursor"))
 
     context = {
         "income_list": page,
-        "total_income": total_income,
-        "income_categories": Category.objects.filter(category_type="income"),
-        "quarters": quarters,
+        "total_income": summary.total,
+        "income_categories": category_choices("income"),
+        # ⚠️ FIX: Quarters come from the FILTERED queryset, not all user income
+        "quarters": summary.quarters,
         # ⚠️ FIX: Pass selected_tax_year to template
         "selected_tax_year": selected_tax_year,
         # Filter values for form persistence
@@ -76,7 +82,8 @@ def income_list(request):
         "filter_date_to": date_to,
         "filter_category": category_id,
         "filter_quarter": quarter,
-        "order_by": order_by,
+        "order_by": paginator.ordering,
+        "page_obj": page,
     }
 
     return render(request, "bookkeeping/income/income_list.html", context)
@@ -155,46 +162,20 @@ def income_delete(request, pk):
 # EXPORT INCOME CSV
 # ===========================
 @login_required
+@ledger_condition
 def export_income_csv(request):
-    from bookkeeping.utils import get_tax_year_bounds
-
     # Get selected tax year
     selected_tax_year = request.session.get("selected_tax_year", "all")
 
-    # Base queryset
-    incomes = Income.objects.filter(user=request.user)
-
-    # Filter by tax year if selected and not "all"
-    if selected_tax_year and selected_tax_year != "all":
-        tax_year_start, tax_year_end = get_tax_year_bounds(selected_tax_year)
-        incomes = incomes.filter(date__gte=tax_year_start, date__lte=tax_year_end)
-
-    incomes = incomes.order_by("-date")
-
     # Create filename with tax year
     year_suffix = (
         selected_tax_year.replace("-", "_") if selected_tax_year != "all" else "all"
     )
-    filename = f"income_{year_suffix}.csv"
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    filename = f"income_{year_suffix}"
 
-    writer = csv.writer(response)
-    writer.writerow(
-        ["Date", "Description", "Client", "Net Amount", "VAT Amount", "Category"]
+    return export_response(
+        request,
+        filename,
+        INCOME_EXPORT_COLUMNS,
+        income_export_rows(request.user, selected_tax_year),
     )
-
-    for item in incomes:
-        writer.writerow(
-            [
-                item.date,
-                item.description,
-                item.client_name or "",
-                item.amount,
-                item.vat_amount if hasattr(item, "vat_amount") else 0,
-                item.category.name if item.category else "",
-            ]
-        )
-
-    return response
@@ -0,0 +1,101 @@
+# bookkeeping/views/jobs.py
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+
+from bookkeeping.forms import ReportJobForm
+from bookkeeping.models import ReportJob
+from bookkeeping.report_jobs import enqueue_report
+
+# Most recent jobs shown on the background reports page
+RECENT_JOBS = 20
+
+
+def job_status(job):
+    """JSON-ready summary of a job, as polled by the background reports page."""
+    data = {
+        "id": str(job.pk),
+        "report": job.report,
+        "tax_year": job.tax_year,
+        "format": job.format,
+        "status": job.status,
+        "filename": job.filename,
+        "error": job.error,
+        "download_url": None,
+    }
+    if job.status == ReportJob.STATUS_DONE:
+        data["download_url"] = reverse(
+            "bookkeeping:report_job_download", args=[job.pk]
+        )
+    return data
+
+
+# ===========================
+# LIST + QUEUE REPORTS
+# ===========================
+@login_required
+def report_jobs(request):
+    if request.method == "POST":
+        form = ReportJobForm(request.user, request.POST)
+        if form.is_valid():
+            job = enqueue_report(
+                request.user,
+                form.cleaned_data["report"],
+                form.cleaned_data["tax_year"],
+                form.cleaned_data["format"],
+            )
+            messages.success(
+                request, f"{job.filename} is being prepared. It will appear below."
+            )
+            return redirect("bookkeeping:report_jobs")
+    else:
+        form = ReportJobForm(
+            request.user,
+            initial={"tax_year": request.session.get("selected_tax_year")},
+        )
+
+    jobs = list(request.user.report_jobs.all()[:RECENT_JOBS])
+
+    return render(
+        request,
+        "bookkeeping/report_jobs.html",
+        {
+            "form": form,
+            "jobs": jobs,
+            "pending_ids": [str(job.pk) for job in jobs if job.is_pending],
+        },
+    )
+
+
+# ===========================
+# JOB STATUS (JSON)
+# ===========================
+@login_required
+def report_job_status(request, pk):
+    job = get_object_or_404(ReportJob, pk=pk, user=request.user)
+    return JsonResponse(job_status(job))
+
+
+# ===========================
+# DOWNLOAD FINISHED REPORT
+# ===========================
+@login_required
+def report_job_download(request, pk):
+    job = get_object_or_404(
+        ReportJob, pk=pk, user=request.user, status=ReportJob.STATUS_DONE
+    )
+
+    try:
+        handle = job.file.open("rb")
+    except (FileNotFoundError, ValueError):
+        raise Http404("This report has expired.")
+
+    # Print reports open in the browser, ready to print; CSVs download
+    return FileResponse(
+        handle,
+        as_attachment=not job.filename.endswith(".html"),
+        filename=job.filename,
+    )
@@ -3,7 +3,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
 
-from bookkeeping.models import RecurringEntry, Category
+from bookkeeping.categories import get_category_registry
+from bookkeeping.models import RecurringEntry
 from bookkeeping.forms import RecurringEntryForm
 from bookkeeping.services import run_recurring_for_user
 
@@ -41,7 +42,7 @@ def recurring_list(request):
             "filter_entry_type": entry_type,
             "filter_category": category_id,
             "filter_active": is_active,
-            "categories": Category.objects.all(),
+            "categories": get_category_registry().all(),
         },
     )
 
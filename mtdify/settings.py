@@ -80,16 +80,68 @@ TEMPLATES = [
 WSGI_APPLICATION = "mtdify.wsgi.application"
 
 # Database - SQLite
+# The pragmas run on every new connection. WAL lets readers carry on while a
+# write is in progress, and IMMEDIATE transactions take the write lock up
+# front so concurrent writers wait out the busy timeout instead of failing
+# with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": env("SQLITE_JOURNAL_MODE", default="WAL"),
+    "synchronous": env("SQLITE_SYNCHRONOUS", default="NORMAL"),
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024),
+    "cache_size": env.int("SQLITE_CACHE_SIZE", default=-20000),
+    "temp_store": env("SQLITE_TEMP_STORE", default="MEMORY"),
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "data" / "db" / "db.sqlite3",
+        "OPTIONS": {
+            "init_command": ";".join(
+                f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+            ),
+            # Seconds to wait for a lock before raising "database is locked"
+            "timeout": env.int("SQLITE_BUSY_TIMEOUT", default=20),
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
 # Ensure data directory exists
 (BASE_DIR / "data").mkdir(exist_ok=True)
 
+# Take the daily database backup in a background thread when the web server
+# (mtdify/wsgi.py) starts. Disable to rely on `python manage.py
+# backup_database` instead.
+BACKUP_ON_STARTUP = env.bool("BACKUP_ON_STARTUP", default=True)
+
+# Cache
+# The default in-memory cache is per process. With several gunicorn workers,
+# point CACHE_URL at a shared backend (e.g. filecache:///app/data/cache)
+# so invalidations are seen by every worker.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Seconds a user's list of available tax years is cached for
+TAX_YEAR_CACHE_TIMEOUT = env.int("TAX_YEAR_CACHE_TIMEOUT", default=300)
+
+# Seconds a rendered report is cached for; entries are keyed by the user's
+# ledger version, so a write makes them stale straight away
+REPORT_CACHE_TIMEOUT = env.int("REPORT_CACHE_TIMEOUT", default=3600)
+
+# Background report jobs (see bookkeeping.report_jobs): days a finished
+# report file is kept, seconds between heartbeats from the worker running a
+# job, and seconds without a heartbeat after which a running job is assumed
+# abandoned by its worker and queued again
+REPORT_JOB_RETENTION_DAYS = env.int("REPORT_JOB_RETENTION_DAYS", default=7)
+REPORT_JOB_HEARTBEAT = env.int("REPORT_JOB_HEARTBEAT", default=60)
+REPORT_JOB_STALE_AFTER = env.int("REPORT_JOB_STALE_AFTER", default=300)
+
+# Largest bank statement accepted for import (see bookkeeping.importing), in
+# bytes; uploads above Django's in-memory limit are spooled to a temp file
+STATEMENT_IMPORT_MAX_SIZE = env.int(
+    "STATEMENT_IMPORT_MAX_SIZE", default=20 * 1024 * 1024
+)
+
 # Authentication
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
@@ -14,3 +14,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mtdify.settings')
 
 application = get_wsgi_application()
+
+# Back up once when the web server starts, without holding up the worker.
+# Only the server loads this module, so management commands and the test
+# suite never write backups; the lock in bookkeeping.backups keeps several
+# gunicorn workers from backing up at once.
+from django.conf import settings  # noqa: E402
+
+if settings.BACKUP_ON_STARTUP:
+    from bookkeeping.backups import start_background_backup  # noqa: E402
+
+    start_background_backup()